@@ -8,13 +8,14 @@ import discord
 from discord import utils
 from discord.ext import commands
 
-from database import errors, guilds
+from database import errors, guilds, reminders
 from database import settings as settings_db
 from resources import functions, settings
 
 
 startup_time = datetime.isoformat(utils.utcnow().replace(microsecond=0), sep=' ')
 functions.await_coroutine(settings_db.update_setting('startup_time', startup_time))
+functions.await_coroutine(reminders.create_unique_key())
 
 intents = discord.Intents.none()
 intents.guilds = True   # for on_guild_join() and all guild objects
@@ -0,0 +1,33 @@
+# edits.py
+"""Contains the cache of the last handled state of Tree messages. Used to skip edits that don't change anything.
+Only the fingerprint of each message is kept, so the cache doesn't keep any messages alive.
+"""
+
+from collections import OrderedDict
+from typing import Optional
+
+from resources import parsing, settings
+
+
+_HANDLED_FINGERPRINTS: 'OrderedDict[int, int]' = OrderedDict()
+
+
+async def get_handled_fingerprint(message_id: int) -> Optional[int]:
+    """Returns the fingerprint of the last handled state of a message. Returns None if the message isn't in the
+    cache."""
+    fingerprint = _HANDLED_FINGERPRINTS.get(message_id, None)
+    if fingerprint is not None: _HANDLED_FINGERPRINTS.move_to_end(message_id)
+    return fingerprint
+
+
+async def store_handled_message(embed_data: parsing.ParsedMessage) -> int:
+    """Stores the fingerprint of the parsed message as the last handled state of the message and returns it.
+    If the cache is full, the least recently used message is removed.
+    """
+    message_id = embed_data.message.id
+    fingerprint = embed_data.fingerprint()
+    _HANDLED_FINGERPRINTS[message_id] = fingerprint
+    _HANDLED_FINGERPRINTS.move_to_end(message_id)
+    while len(_HANDLED_FINGERPRINTS) > settings.HANDLED_MESSAGES_CACHE_SIZE:
+        _HANDLED_FINGERPRINTS.popitem(last=False)
+    return fingerprint
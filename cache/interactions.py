@@ -0,0 +1,85 @@
+# interactions.py
+"""Contains the cache of message interactions. Used to resolve message references without an API call.
+Cache is populated by cogs.cache and resources.functions.get_interaction.
+"""
+
+import asyncio
+from collections import OrderedDict
+import time
+from typing import Dict, Optional, Tuple
+
+import discord
+
+from resources import settings
+
+
+_INTERACTION_CACHE: 'OrderedDict[int, Tuple[float, Optional[discord.MessageInteraction]]]' = OrderedDict()
+_PENDING_FETCHES: Dict[int, asyncio.Future] = {}
+_MISSING = object()
+
+
+def _get_cached_interaction(message_id: int) -> object:
+    """Returns the cached interaction of a message (can be None). Returns _MISSING if the message is not cached or
+    the entry expired."""
+    entry = _INTERACTION_CACHE.get(message_id, None)
+    if entry is None: return _MISSING
+    expires_at, interaction = entry
+    if expires_at < time.monotonic():
+        del _INTERACTION_CACHE[message_id]
+        return _MISSING
+    _INTERACTION_CACHE.move_to_end(message_id)
+    return interaction
+
+
+async def store_interaction(message_id: int, interaction: Optional[discord.MessageInteraction]) -> None:
+    """Adds the interaction of a message to the cache. Messages without interaction are stored as None.
+    If the cache is full, the least recently used entry is removed.
+    """
+    _INTERACTION_CACHE[message_id] = (time.monotonic() + settings.INTERACTION_CACHE_TTL, interaction)
+    _INTERACTION_CACHE.move_to_end(message_id)
+    while len(_INTERACTION_CACHE) > settings.INTERACTION_CACHE_SIZE:
+        _INTERACTION_CACHE.popitem(last=False)
+
+
+async def get_message_interaction(channel: discord.abc.Messageable,
+                                  message_id: int) -> Optional[discord.MessageInteraction]:
+    """Returns the interaction of a message. If the message is not cached, it is fetched from the channel.
+    Concurrent lookups of the same message share one API call.
+
+    Returns
+    -------
+    The interaction of the message or None if the message wasn't triggered by a slash command.
+
+    Raises
+    ------
+    discord.HTTPException (or subclasses) if fetching the message fails.
+    """
+    interaction = _get_cached_interaction(message_id)
+    if interaction is not _MISSING: return interaction
+    pending_fetch = _PENDING_FETCHES.get(message_id, None)
+    if pending_fetch is not None:
+        try:
+            return await asyncio.shield(pending_fetch)
+        except asyncio.CancelledError:
+            if not pending_fetch.cancelled(): raise
+    pending_fetch = _PENDING_FETCHES[message_id] = asyncio.get_running_loop().create_future()
+    try:
+        message = await channel.fetch_message(message_id)
+    except asyncio.CancelledError:
+        pending_fetch.cancel()
+        raise
+    except Exception as error:
+        pending_fetch.set_exception(error)
+        pending_fetch.exception()
+        raise
+    else:
+        await store_interaction(message_id, message.interaction)
+        pending_fetch.set_result(message.interaction)
+        return message.interaction
+    finally:
+        if _PENDING_FETCHES.get(message_id, None) is pending_fetch: del _PENDING_FETCHES[message_id]
+
+
+async def get_cache_size() -> int:
+    """Returns the amount of cached interactions"""
+    return len(_INTERACTION_CACHE)
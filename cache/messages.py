@@ -3,23 +3,237 @@
 
 import asyncio
 from argparse import ArgumentError
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field, replace
 from datetime import timedelta
 import re
-from typing import Optional, Union
+import sys
+import time
+from typing import Deque, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple, Union
 
 import discord
 from discord import utils
 
-from resources import functions, logs, settings
+from resources import functions, regex as regex_patterns, settings
 
 
-_MESSAGE_CACHE = {}
+_TREE_MENTION = re.compile(rf'<@!?{settings.GAME_ID}>')
+# All command patterns. The patterns a cached message matches are stored as a bit mask.
+COMMAND_PATTERNS = tuple(
+    pattern for name, pattern in vars(regex_patterns).items() if name.startswith('COMMAND_')
+)
+_COMMAND_BITS = {pattern: 1 << bit for bit, pattern in enumerate(COMMAND_PATTERNS)}
+# Bytes of the references to a message in the channel deque and the two author indexes
+_INDEX_REFERENCES_SIZE = 3 * 8
+
+
+# Containers
+class CachedMessage():
+    """Compact record of a user command in the message cache.
+    Everything that is needed to find a command is prepared when the message is stored. Discord objects (author,
+    mentions, the message itself) are only looked up when a caller needs them.
+
+    Arguments
+    ---------
+    id, channel_id, guild_id, author_id: IDs of the message and its channel, guild and author
+    author_name: Encoded author name, see functions.encode_text
+    content: Lowercase message content without Tree mentions
+    created_at: Creation time as UTC timestamp
+    commands: Bit mask of the patterns in COMMAND_PATTERNS the content matches
+    mention_ids: IDs of the mentioned users without Tree
+    size: Approximate deep size in bytes, including the references in the channel and its indexes
+    """
+    __slots__ = ('author_id', 'author_name', 'channel_id', 'commands', 'content', 'created_at', 'guild_id', 'id',
+                 'mention_ids', 'size')
+
+    def __init__(self, message: discord.Message, author_name: str) -> None:
+        self.id: int = message.id
+        self.channel_id: int = message.channel.id
+        self.guild_id: Optional[int] = message.guild.id if message.guild is not None else None
+        self.author_id: int = message.author.id
+        self.author_name = author_name
+        self.content: str = _TREE_MENTION.sub('', message.content.lower())
+        self.created_at = int(message.created_at.timestamp())
+        self.commands = 0
+        for bit, pattern in enumerate(COMMAND_PATTERNS):
+            if pattern.search(self.content): self.commands |= 1 << bit
+        self.mention_ids: Tuple[int, ...] = tuple(user.id for user in message.mentions if user.id != settings.GAME_ID)
+        self.size: int = (
+            sys.getsizeof(self) + sys.getsizeof(self.content) + sys.getsizeof(self.author_name)
+            + sys.getsizeof(self.mention_ids) + _INDEX_REFERENCES_SIZE
+            + sum(sys.getsizeof(value) for value in (self.id, self.channel_id, self.guild_id, self.author_id,
+                                                     self.created_at, self.commands, *self.mention_ids))
+        )
+
+    def matches(self, regex: Union[str, re.Pattern]) -> bool:
+        """Checks if the content matches a regex. Uses the bit mask for the patterns in COMMAND_PATTERNS."""
+        bit = _COMMAND_BITS.get(regex, None)
+        if bit is not None: return bool(self.commands & bit)
+        return re.search(regex, self.content) is not None
+
+    async def get_author(self, guild: discord.Guild) -> Optional[discord.Member]:
+        """Returns the author as a member of the guild. Returns None if the author isn't in the guild anymore."""
+        return await _get_member(guild, self.author_id)
+
+    async def get_mentions(self, guild: discord.Guild) -> List[discord.Member]:
+        """Returns the mentioned users that are still in the guild"""
+        mentions = []
+        for user_id in self.mention_ids:
+            member = await _get_member(guild, user_id)
+            if member is not None: mentions.append(member)
+        return mentions
+
+    async def fetch_message(self, channel: discord.abc.Messageable) -> discord.Message:
+        """Returns the discord message. Makes an API call.
+
+        Raises
+        ------
+        discord.NotFound if the message was deleted.
+        """
+        return await channel.fetch_message(self.id)
+
+
+class MessageWaiter(NamedTuple):
+    """Object that represents a caller of find_message that waits for a matching message to be stored"""
+    future: asyncio.Future
+    regex: Optional[Union[str, re.Pattern]]
+    user_id: Optional[int]
+    author_name: Optional[str]
+
+    def matches(self, cached_message: CachedMessage) -> bool:
+        """Checks if a cached message is the one the caller waits for"""
+        if self.user_id is not None and cached_message.author_id != self.user_id: return False
+        if self.author_name is not None and cached_message.author_name != self.author_name: return False
+        return self.regex is None or cached_message.matches(self.regex)
+
+
+@dataclass()
+class CacheStats():
+    """Counters of the message cache.
+
+    Arguments
+    ---------
+    hits: Calls of find_message that returned a message
+    misses: Calls of find_message that didn't find a message
+    evictions: Messages removed because their channel or the cache was full
+    expirations: Messages removed because they were too old
+    bytes: Approximate deep size of all cached messages
+    guild_bytes: Approximate deep size of the cached messages per guild ID
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    bytes: int = 0
+    guild_bytes: Dict[Optional[int], int] = field(default_factory=dict)
+
+
+class ChannelMessages():
+    """Cached messages of a channel, oldest first. Also keeps indexes of the messages by author ID and author name.
+    The channel keeps at most limit messages. The limit can change, the channel shrinks on the next append.
+    """
+    __slots__ = ('by_author_id', 'by_author_name', 'limit', 'messages')
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.messages: Deque[CachedMessage] = deque()
+        self.by_author_id: Dict[int, Deque[CachedMessage]] = {}
+        self.by_author_name: Dict[str, Deque[CachedMessage]] = {}
+
+    def __len__(self) -> int:
+        return len(self.messages)
+
+    def append(self, cached_message: CachedMessage) -> None:
+        """Adds a message. If the channel is full, the oldest messages are removed."""
+        while self.messages and len(self.messages) >= self.limit:
+            self.popleft()
+            _STATS.evictions += 1
+        self.messages.append(cached_message)
+        _STATS.bytes += cached_message.size
+        _STATS.guild_bytes[cached_message.guild_id] = (
+            _STATS.guild_bytes.get(cached_message.guild_id, 0) + cached_message.size
+        )
+        self.by_author_id.setdefault(cached_message.author_id, deque()).append(cached_message)
+        self.by_author_name.setdefault(cached_message.author_name, deque()).append(cached_message)
+
+    def popleft(self) -> CachedMessage:
+        """Removes and returns the oldest message"""
+        cached_message = self.messages.popleft()
+        _remove_from_index(self.by_author_id, cached_message.author_id)
+        _remove_from_index(self.by_author_name, cached_message.author_name)
+        _STATS.bytes -= cached_message.size
+        guild_bytes = _STATS.guild_bytes[cached_message.guild_id] - cached_message.size
+        if guild_bytes > 0:
+            _STATS.guild_bytes[cached_message.guild_id] = guild_bytes
+        else:
+            del _STATS.guild_bytes[cached_message.guild_id]
+        return cached_message
+
+
+# Channels in least recently used order. The first channel is the one that is evicted first if the cache is full.
+_MESSAGE_CACHE: 'OrderedDict[int, ChannelMessages]' = OrderedDict()
+_STATS = CacheStats()
+_WAITERS: Dict[int, List[MessageWaiter]] = {}
+# Expiry buckets. Key is the creation minute (timestamp // 60), value are the channels that got messages in that minute.
+# Buckets are added in time order, so the oldest bucket is always the first one.
+_EXPIRY_BUCKETS: Dict[int, Set[int]] = {}
+# Decaying counter of Tree messages per channel. Value is (score, monotonic time of the last update).
+_CHANNEL_ACTIVITY: Dict[int, Tuple[float, float]] = {}
+
+
+async def _get_member(guild: discord.Guild, user_id: int) -> Optional[discord.Member]:
+    """Returns a guild member from the member cache and makes an additional API call if not found.
+    Returns None if the user isn't in the guild."""
+    member = guild.get_member(user_id)
+    if member is None:
+        try:
+            member = await guild.fetch_member(user_id)
+        except discord.NotFound:
+            pass
+    return member
+
+
+def _get_activity_score(channel_id: int, now: float) -> float:
+    """Returns the decayed Tree activity score of a channel. Halves every settings.MESSAGE_CACHE_ACTIVITY_HALF_LIFE."""
+    activity = _CHANNEL_ACTIVITY.get(channel_id, None)
+    if activity is None: return 0.0
+    score, updated_at = activity
+    return score * 0.5 ** ((now - updated_at) / settings.MESSAGE_CACHE_ACTIVITY_HALF_LIFE)
+
+
+def _get_channel_limit(channel_id: int) -> int:
+    """Returns the amount of messages a channel can keep. Channels Tree was recently active in get the full
+    size, all other channels get the much smaller cold size."""
+    if _get_activity_score(channel_id, time.monotonic()) >= settings.MESSAGE_CACHE_ACTIVITY_MIN_SCORE:
+        return settings.MESSAGE_CACHE_CHANNEL_SIZE
+    return settings.MESSAGE_CACHE_COLD_CHANNEL_SIZE
+
+
+def _enforce_memory_budget() -> None:
+    """Evicts the oldest messages of the least recently used channels until the cache fits into
+    settings.MESSAGE_CACHE_MAX_BYTES. The newest message is never evicted."""
+    while _STATS.bytes > settings.MESSAGE_CACHE_MAX_BYTES:
+        channel_id, channel_messages = next(iter(_MESSAGE_CACHE.items()))
+        if len(_MESSAGE_CACHE) == 1 and len(channel_messages) == 1: return
+        channel_messages.popleft()
+        _STATS.evictions += 1
+        if not channel_messages: del _MESSAGE_CACHE[channel_id]
+
+
+def _remove_from_index(index: Dict, key: Union[int, str]) -> None:
+    """Removes the oldest message of a key from an index. Messages are always removed oldest first, so this is
+    always the message that is removed from the channel."""
+    index_messages = index[key]
+    index_messages.popleft()
+    if not index_messages: del index[key]
 
 
 async def find_message(channel_id: int, regex: Union[str, re.Pattern] = None,
-                      user: Optional[discord.User] = None, user_name: Optional[str] = None) -> discord.Message:
-    """Looks through the last 50 messages in the channel history. If a message that matches regex is found, it returns
-    the message. If user and/or user_name are defined, only messages from that user are returned.
+                      user: Optional[discord.User] = None, user_name: Optional[str] = None,
+                      timeout: Optional[float] = None) -> CachedMessage:
+    """Looks through the cached messages of the channel, newest first. If a message that matches regex is found, it
+    returns the message. If user and/or user_name are defined, only messages from that user are returned.
+    If no message is found, waits until a matching message is stored or the timeout runs out.
 
     Arguments
     ---------
@@ -29,66 +243,144 @@ async def find_message(channel_id: int, regex: Union[str, re.Pattern] = None,
     user: User object the message author has to match.
     user_name: User name the message author has to match. If user is also defined, this is ignored.
     If both user and user_name are None, this function returns the first message that matches the regex is not from a bot.
+    timeout: Seconds to wait for a matching message. Defaults to settings.MESSAGE_CACHE_WAIT_TIMEOUT. 0 doesn't wait.
 
     Returns
     -------
-    The found message. Returns None if no matching message was found.
+    The found message as CachedMessage. Returns None if no matching message was found.
 
     Raises
     ------
     ArgumentError if regex, user AND user_name are None.
     """
-    attempts = 1
-    while attempts <= 2:
-        if regex is None and user is None and user_name is None:
-            raise ArgumentError('At least one of these arguments has to be defined: regex, user, user_name.')
-        channel_messages = _MESSAGE_CACHE.get(channel_id, None)
-        if channel_messages is None: return None
-        for message in channel_messages:
-            if user is not None and message.author != user: continue
-            if (user_name is not None
-                and await functions.encode_text(user_name) != await functions.encode_text(message.author.name)):
-                continue
-            if regex is None:
-                return message
-            else:
-                message_content = re.sub(rf'<@!?{settings.GAME_ID}>', '', message.content.lower())
-                match = re.search(regex, message_content)
-                if match: return message
-        await asyncio.sleep(0.5)
-        logs.logger.info('Required a second attempt for getting a message from the message cache.')
-        attempts += 1
-    return None
-
-
-async def store_message(message: discord.Message) -> discord.Message:
-    """Adds a message to the message cache.
-    Also keeps the maximum amount of messages stored per channel at 50."""
-    channel_message_list = _MESSAGE_CACHE.get(message.channel.id, None)
-    if channel_message_list is None:
-        channel_message_list = [message,]
+    if regex is None and user is None and user_name is None:
+        raise ArgumentError('At least one of these arguments has to be defined: regex, user, user_name.')
+    if timeout is None: timeout = settings.MESSAGE_CACHE_WAIT_TIMEOUT
+    user_id = user.id if user is not None else None
+    author_name = await functions.encode_text(user_name) if user is None and user_name is not None else None
+    channel_messages = _MESSAGE_CACHE.get(channel_id, None)
+    if channel_messages is not None:
+        candidates: Iterable[CachedMessage]
+        if user_id is not None:
+            candidates = channel_messages.by_author_id.get(user_id, ())
+        elif author_name is not None:
+            candidates = channel_messages.by_author_name.get(author_name, ())
+        else:
+            candidates = channel_messages.messages
+        for cached_message in reversed(candidates):
+            if regex is None or cached_message.matches(regex):
+                _STATS.hits += 1
+                return cached_message
+    if timeout <= 0:
+        _STATS.misses += 1
+        return None
+    waiter = MessageWaiter(asyncio.get_running_loop().create_future(), regex, user_id, author_name)
+    channel_waiters = _WAITERS.setdefault(channel_id, [])
+    channel_waiters.append(waiter)
+    try:
+        cached_message = await asyncio.wait_for(waiter.future, timeout)
+        _STATS.hits += 1
+        return cached_message
+    except asyncio.TimeoutError:
+        _STATS.misses += 1
+        return None
+    finally:
+        channel_waiters.remove(waiter)
+        if not channel_waiters and _WAITERS.get(channel_id, None) is channel_waiters: del _WAITERS[channel_id]
+
+
+async def record_tree_activity(channel_id: int) -> None:
+    """Counts a Tree message in a channel. Channels are admitted to the full cache size on their first Tree message."""
+    now = time.monotonic()
+    _CHANNEL_ACTIVITY[channel_id] = (_get_activity_score(channel_id, now) + 1, now)
+    channel_messages = _MESSAGE_CACHE.get(channel_id, None)
+    if channel_messages is not None: channel_messages.limit = _get_channel_limit(channel_id)
+
+
+async def delete_cold_channel_activity() -> int:
+    """Deletes the activity of channels whose score decayed below settings.MESSAGE_CACHE_ACTIVITY_MIN_SCORE.
+
+    Returns
+    -------
+    Amount of channels deleted: int
+    """
+    now = time.monotonic()
+    cold_channel_ids = [
+        channel_id for channel_id in _CHANNEL_ACTIVITY
+        if _get_activity_score(channel_id, now) < settings.MESSAGE_CACHE_ACTIVITY_MIN_SCORE
+    ]
+    for channel_id in cold_channel_ids:
+        del _CHANNEL_ACTIVITY[channel_id]
+    return len(cold_channel_ids)
+
+
+async def store_message(message: discord.Message) -> None:
+    """Adds a message to the message cache and hands it to all callers of find_message that wait for it.
+    Also keeps the maximum amount of messages stored per channel at settings.MESSAGE_CACHE_CHANNEL_SIZE for channels
+    with recent Tree activity and at settings.MESSAGE_CACHE_COLD_CHANNEL_SIZE for all other channels.
+    If the cache is larger than settings.MESSAGE_CACHE_MAX_BYTES afterwards, the oldest messages of the least recently
+    used channels are evicted."""
+    channel_limit = _get_channel_limit(message.channel.id)
+    channel_messages = _MESSAGE_CACHE.get(message.channel.id, None)
+    if channel_messages is None:
+        channel_messages = _MESSAGE_CACHE[message.channel.id] = ChannelMessages(channel_limit)
     else:
-        channel_message_list.insert(0, message)
-    if len(channel_message_list) > 50:
-        channel_message_list = channel_message_list[:50]
-    _MESSAGE_CACHE[message.channel.id] = channel_message_list
+        channel_messages.limit = channel_limit
+        _MESSAGE_CACHE.move_to_end(message.channel.id)
+    cached_message = CachedMessage(message, await functions.encode_text(message.author.name))
+    channel_messages.append(cached_message)
+    _enforce_memory_budget()
+    minute = cached_message.created_at // 60
+    bucket = _EXPIRY_BUCKETS.get(minute, None)
+    if bucket is None:
+        bucket = _EXPIRY_BUCKETS[minute] = set()
+    bucket.add(cached_message.channel_id)
+    for waiter in _WAITERS.get(message.channel.id, ()):
+        if not waiter.future.done() and waiter.matches(cached_message): waiter.future.set_result(cached_message)
 
 
-async def delete_old_messages(timespan: timedelta) -> int:
+async def delete_old_messages(timespan: timedelta, slice_size: Optional[int] = None) -> int:
     """Deletes messages older than the specified timeframe.
+    Only the channels in the expired minute buckets are visited, so the work depends on the amount of expired messages,
+    not on the size of the cache. Yields to the event loop after every slice_size channels.
+
+    Arguments
+    ---------
+    timespan: Age after which messages are deleted
+    slice_size: Amount of channels that are cleaned up before yielding. Defaults to settings.MESSAGE_CACHE_EXPIRY_SLICE.
 
     Returns
     -------
     Amount of messages deleted: int
     """
-    current_time = utils.utcnow()
+    if slice_size is None: slice_size = settings.MESSAGE_CACHE_EXPIRY_SLICE
+    min_created_at = int((utils.utcnow() - timespan).timestamp())
     message_count = 0
-    for channel_id, channel_messages in _MESSAGE_CACHE.items():
-        for message in channel_messages:
-            if message.created_at < (current_time - timespan):
-                _MESSAGE_CACHE[channel_id].remove(message)
+    channel_count = 0
+    while _EXPIRY_BUCKETS:
+        minute = next(iter(_EXPIRY_BUCKETS))
+        if (minute + 1) * 60 > min_created_at: break
+        bucket = _EXPIRY_BUCKETS[minute]
+        while bucket:
+            channel_id = bucket.pop()
+            channel_messages = _MESSAGE_CACHE.get(channel_id, None)
+            if channel_messages is None: continue
+            while channel_messages.messages and channel_messages.messages[0].created_at < min_created_at:
+                channel_messages.popleft()
                 message_count += 1
-    if message_count > 0:
-        for key in list(_MESSAGE_CACHE.keys()):
-            if not _MESSAGE_CACHE[key]: del _MESSAGE_CACHE[key]
-    return message_count
\ No newline at end of file
+                _STATS.expirations += 1
+            if not channel_messages: del _MESSAGE_CACHE[channel_id]
+            channel_count += 1
+            if channel_count % slice_size == 0: await asyncio.sleep(0)
+        if _EXPIRY_BUCKETS.get(minute, None) is bucket: del _EXPIRY_BUCKETS[minute]
+    return message_count
+
+
+async def get_cache_stats() -> CacheStats:
+    """Returns a copy of the counters of the message cache"""
+    return replace(_STATS, guild_bytes=dict(_STATS.guild_bytes))
+
+
+async def get_message_count() -> Tuple[int, int]:
+    """Returns the amount of cached channels and messages"""
+    return (len(_MESSAGE_CACHE), sum(len(channel_messages) for channel_messages in _MESSAGE_CACHE.values()))
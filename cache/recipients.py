@@ -0,0 +1,112 @@
+# recipients.py
+"""Contains the cache of reminder recipients (channels and Discord users).
+Cache is populated by cogs.tasks for all reminders that are due soon, so sending a reminder doesn't have to look
+them up on Discord. User settings are not cached, they are loaded when the reminders are sent.
+"""
+
+import asyncio
+import time
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+import discord
+
+from database import users
+from resources import functions, settings
+
+
+# Containers
+class Recipient(NamedTuple):
+    """Discord user and user settings of a reminder recipient"""
+    user: discord.User
+    user_settings: users.User
+
+
+_CHANNELS: Dict[int, Tuple[float, Optional[discord.abc.Messageable]]] = {}
+_USERS: Dict[int, Tuple[float, Optional[discord.User]]] = {}
+_MISSING = object()
+
+
+def _get_cached(cache: Dict[int, Tuple[float, object]], key: int) -> object:
+    """Returns a cached value (can be None). Returns _MISSING if the key is not cached or the entry expired."""
+    entry = cache.get(key, None)
+    if entry is None: return _MISSING
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        del cache[key]
+        return _MISSING
+    return value
+
+
+# Functions
+async def prefetch(bot: discord.Bot, reminders_list: Iterable) -> None:
+    """Looks up the channels and Discord users of reminders that are not cached yet. Lookups run concurrently.
+    Channels and users that don't exist anymore are cached as None.
+    """
+    channel_ids = set()
+    user_ids = set()
+    for reminder in reminders_list:
+        if _get_cached(_CHANNELS, reminder.channel_id) is _MISSING: channel_ids.add(reminder.channel_id)
+        if _get_cached(_USERS, reminder.user_id) is _MISSING: user_ids.add(reminder.user_id)
+    if not channel_ids and not user_ids: return
+    expires_at = time.monotonic() + settings.REMINDER_PREFETCH_TTL
+    channel_ids = list(channel_ids)
+    user_ids = list(user_ids)
+    channels = await asyncio.gather(
+        *[functions.get_discord_channel(bot, channel_id) for channel_id in channel_ids], return_exceptions=True
+    )
+    for channel_id, channel in zip(channel_ids, channels):
+        if isinstance(channel, discord.errors.Forbidden): channel = None
+        if isinstance(channel, Exception): continue
+        _CHANNELS[channel_id] = (expires_at, channel)
+    discord_users = await asyncio.gather(
+        *[functions.get_discord_user(bot, user_id) for user_id in user_ids], return_exceptions=True
+    )
+    for user_id, user in zip(user_ids, discord_users):
+        if isinstance(user, Exception): continue
+        _USERS[user_id] = (expires_at, user)
+
+
+async def get_channel(bot: discord.Bot, channel_id: int) -> Optional[discord.abc.Messageable]:
+    """Returns the channel of a reminder. Looks it up if it is not cached. Returns None if the channel is gone.
+
+    Raises
+    ------
+    discord.errors.Forbidden if the channel is not cached and the bot can't see it.
+    """
+    channel = _get_cached(_CHANNELS, channel_id)
+    if channel is not _MISSING: return channel
+    return await functions.get_discord_channel(bot, channel_id)
+
+
+async def get_recipients(bot: discord.Bot, user_ids: Iterable[int]) -> Dict[int, Recipient]:
+    """Returns the Discord users and the current user settings of reminder recipients.
+    Discord users are looked up if they are not cached. User settings are always loaded, with one query.
+    Users that are gone or not registered are left out.
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    """
+    user_ids = list(set(user_ids))
+    discord_users = {}
+    for user_id in user_ids:
+        user = _get_cached(_USERS, user_id)
+        if user is _MISSING: user = await functions.get_discord_user(bot, user_id)
+        if user is not None: discord_users[user_id] = user
+    if not discord_users: return {}
+    return {
+        user_settings.user_id: Recipient(discord_users[user_settings.user_id], user_settings)
+        for user_settings in await users.get_users(discord_users.keys())
+    }
+
+
+async def delete_expired() -> int:
+    """Removes expired entries from the cache. Returns the amount of removed entries."""
+    now = time.monotonic()
+    deleted_count = 0
+    for cache in (_CHANNELS, _USERS):
+        expired_keys = [key for key, (expires_at, _) in cache.items() if expires_at < now]
+        for key in expired_keys:
+            del cache[key]
+        deleted_count += len(expired_keys)
+    return deleted_count
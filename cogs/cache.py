@@ -1,10 +1,10 @@
 # cache.py
-"""Collects messages containing rpg and mention commands for the local cache"""
+"""Collects messages containing rpg and mention commands and message interactions for the local cache"""
 
 import discord
 from discord.ext import commands
 
-from cache import messages
+from cache import interactions, messages
 from resources import settings
 
 
@@ -16,6 +16,13 @@ class CacheCog(commands.Cog):
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
         """Runs when a message is sent in a channel."""
+        if message.author.id in [settings.GAME_ID, settings.TESTY_ID]:
+            await messages.record_tree_activity(message.channel.id)
+            await interactions.store_interaction(message.id, message.interaction)
+            if message.reference is not None and message.reference.cached_message is not None:
+                await interactions.store_interaction(message.reference.message_id,
+                                                     message.reference.cached_message.interaction)
+            return
         if message.author.bot: return
         if message.embeds or message.content is None: return
         correct_mention = False
@@ -30,6 +37,12 @@ class CacheCog(commands.Cog):
             if correct_mention:
                 await messages.store_message(message)
 
+    @commands.Cog.listener()
+    async def on_interaction(self, interaction: discord.Interaction) -> None:
+        """Runs when an interaction is received. Stores the interaction of the message the interaction belongs to."""
+        if interaction.message is None: return
+        await interactions.store_interaction(interaction.message.id, interaction.message.interaction)
+
 # Initialization
 def setup(bot):
     bot.add_cog(CacheCog(bot))
\ No newline at end of file
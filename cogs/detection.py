@@ -1,186 +1,176 @@
 # detection.py
 """Collects and parses Tree messages"""
 
-import re
-from typing import Dict, Union
+import asyncio
+import traceback
+from types import ModuleType
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Tuple, Union
 
 import discord
 from discord.ext import commands
 
-from database import users
+from cache import edits
+from database import errors, users
 from processing import bonuses, chests, chips, clean, cooldowns, daily, fusion, hive, inventory, laboratory, patreon
 from processing import profile, prune, quests, raid, rebirth, shop, tool, tracking, use, vote
-from resources import exceptions, functions, regex, settings
+from resources import correlation, functions, locks, parsing, settings, triggers
+
+
+# Containers
+class Processor(NamedTuple):
+    """Object that describes a processing module and the user settings that enable it.
+    If enabled_by is empty, the module always runs. Otherwise it runs if at least one of the settings is enabled.
+
+    Every module defines TRIGGERS, a tuple of lowercase strings. The module is only called for messages that contain
+    at least one of them (see the trigger index in DetectionCog). Every module also defines COMMANDS, a tuple of
+    correlation.Command that describes how the command user of its messages is found.
+
+    Processors without a group are independent and run concurrently. Processors that share state (e.g. they update
+    the user settings) have to be in the same group. Processors of a group run one after another in the order of
+    PROCESSORS, so a group is also the opt-out for processors that need to run in order.
+    """
+    module: ModuleType
+    enabled_by: Tuple[str, ...]
+    group: Optional[str] = None
+
+
+# Processor groups
+GROUP_USER_SETTINGS = 'user_settings' # Processors that update the user settings
+
+
+# Processors in the order they are called
+PROCESSORS = (
+    Processor(bonuses, ('reminder_boosts',), GROUP_USER_SETTINGS),
+    Processor(cooldowns, ()),
+    Processor(chests, ('reminder_chests', 'helper_context_enabled')),
+    Processor(chips, ('helper_context_enabled',)),
+    Processor(clean, ('reminder_clean', 'tracking_enabled')),
+    Processor(daily, ('reminder_daily',)),
+    Processor(fusion, ('reminder_fusion',)),
+    Processor(hive, ('reminder_hive_energy',)),
+    Processor(inventory, ()),
+    Processor(prune, ('reminder_prune', 'helper_prune_enabled'), GROUP_USER_SETTINGS),
+    Processor(laboratory, ('reminder_research', 'helper_context_enabled'), GROUP_USER_SETTINGS),
+    Processor(patreon, (), GROUP_USER_SETTINGS),
+    Processor(profile, ('reminder_research', 'reminder_upgrade', 'helper_prune_enabled'), GROUP_USER_SETTINGS),
+    Processor(quests, ('reminder_quests',)),
+    Processor(raid, ('helper_context_enabled',)),
+    Processor(rebirth, ('helper_prune_enabled',), GROUP_USER_SETTINGS),
+    Processor(tool, ('reminder_upgrade', 'helper_context_enabled')),
+    Processor(tracking, ('tracking_enabled',)),
+    Processor(use, ('reminder_boosts', 'helper_prune_enabled'), GROUP_USER_SETTINGS),
+    Processor(vote, ('reminder_vote',), GROUP_USER_SETTINGS),
+    Processor(shop, ('reminder_boosts',), GROUP_USER_SETTINGS),
+)
+
+# Texts of a message that are searched for processor triggers
+TRIGGER_TEXT_KEYS = (
+    'content', 'author.name', 'title', 'description',
+    'field0.name', 'field0.value', 'field1.name', 'field1.value', 'field2.name', 'field2.value',
+    'field3.name', 'field3.value', 'field4.name', 'field4.value', 'field5.name', 'field5.value',
+)
 
 
 class DetectionCog(commands.Cog):
     """Cog that contains the detection events"""
     def __init__(self, bot):
         self.bot = bot
+        self.trigger_index = triggers.TriggerIndex(
+            {processor.module: processor.module.TRIGGERS for processor in PROCESSORS}
+        )
 
     @commands.Cog.listener()
     async def on_message_edit(self, message_before: discord.Message, message_after: discord.Message) -> None:
         """Runs when a message is edited in a channel."""
         if message_after.author.id not in [settings.GAME_ID, settings.TESTY_ID]: return
-        embed_data_before = await parse_embed(message_before)
         embed_data = await parse_embed(message_after)
-        if (message_before.content == message_after.content and embed_data_before == embed_data
-            and message_before.components == message_after.components): return
+        triggered_modules = self.trigger_index.search(await get_trigger_text(embed_data))
+        if not triggered_modules: return
+        fingerprint_before = await edits.get_handled_fingerprint(message_after.id)
+        if fingerprint_before is None: fingerprint_before = (await parse_embed(message_before)).fingerprint()
+        if embed_data.fingerprint() == fingerprint_before: return
         if await check_edited_message_never_allowed(message_before, message_after, embed_data): return
         if await check_edited_message_always_allowed(message_before, message_after, embed_data):
-            await self.on_message(message_after)
+            await self.handle_message(message_after, embed_data, triggered_modules, edited=True)
             return
         if message_before.components and not message_after.components: return
         if await check_message_for_active_components(message_after):
-            await self.on_message(message_after)
+            await self.handle_message(message_after, embed_data, triggered_modules, edited=True)
 
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message) -> None:
-        """Runs when a message is sent in a channel."""
+        """Runs when a message is sent in a channel.
+        Only the processors with at least one trigger in the message are called.
+        """
         if message.author.id not in [settings.GAME_ID, settings.TESTY_ID]: return
-        user_settings = None
         embed_data = await parse_embed(message)
-        embed_data['embed_user'] = None
-        embed_data['embed_user_settings'] = None
+        triggered_modules = self.trigger_index.search(await get_trigger_text(embed_data))
+        if not triggered_modules: return
+        await self.handle_message(message, embed_data, triggered_modules)
+
+    async def handle_message(self, message: discord.Message, embed_data: parsing.ParsedMessage,
+                             triggered_modules: FrozenSet[ModuleType], edited: bool = False) -> None:
+        """Resolves the users of a parsed message and runs the triggered processors while the users are locked.
+        Stores the message as handled first, so later edits that don't change anything are skipped.
+        The command of an edited message was sent before the message itself, so it is not waited for if it isn't cached.
+        """
+        await edits.store_handled_message(embed_data)
         interaction_user = await functions.get_interaction_user(message)
-        user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
-        if user_id_match:
-            embed_data['embed_user'] = message.guild.get_member(int(user_id_match.group(1)))
+        module_commands = {processor.module: processor.module.COMMANDS for processor in PROCESSORS
+                           if processor.module in triggered_modules}
+        module_embed_data = await correlation.correlate_message(message, embed_data, interaction_user,
+                                                                module_commands, wait=not edited)
+        lock_user_ids = {user.id for module_data in module_embed_data.values()
+                         for user in (module_data['command_user'], module_data['embed_user']) if user is not None}
+        async with locks.user_locks.lock_many(lock_user_ids):
+            await self.process_message(message, embed_data, module_embed_data, triggered_modules, interaction_user)
+
+    async def process_message(self, message: discord.Message, embed_data: parsing.ParsedMessage,
+                              module_embed_data: Dict[ModuleType, parsing.ParsedMessage],
+                              triggered_modules: FrozenSet[ModuleType],
+                              interaction_user: Optional[discord.User]) -> None:
+        """Loads the user settings and runs all triggered processors.
+        Runs while the involved users are locked, so the user settings can't change in between.
+        Every processor gets the parsed message of its module (see correlation.correlate_message).
+        """
+        # Modules share parsed messages (__hash__ is None), so the settings of each one are only loaded once
+        for module_data in {id(module_data): module_data for module_data in module_embed_data.values()}.values():
+            await correlation.load_user_settings(module_data)
+        user_settings = None
         if interaction_user is not None:
-            try:
-                user_settings: users.User = await users.get_user(interaction_user.id)
-            except exceptions.FirstTimeUserError:
-                if not 'fusion results' in embed_data['field0']['name'].lower(): return
-            if user_settings is not None:
-                if not user_settings.bot_enabled: return
-        if embed_data['embed_user'] is not None:
-            if interaction_user is not None and embed_data['embed_user'] == interaction_user:
-                embed_user_settings = user_settings
-            else:
-                try:
-                    embed_user_settings: users.User = await users.get_user(embed_data['embed_user'].id)
-                except exceptions.FirstTimeUserError:
-                    embed_user_settings = None
-            embed_data['embed_user_settings'] = embed_user_settings
-        return_values = []
-        helper_context_enabled = getattr(user_settings, 'helper_context_enabled', True)
-        helper_prune_enabled = getattr(user_settings, 'helper_prune_enabled', True)
-        reminder_boosts_enabled = getattr(getattr(user_settings, 'reminder_boosts', None), 'enabled', True)
-        reminder_chests_enabled = getattr(getattr(user_settings, 'reminder_chests', None), 'enabled', True)
-        reminder_clean_enabled = getattr(getattr(user_settings, 'reminder_clean', None), 'enabled', True)
-        reminder_daily_enabled = getattr(getattr(user_settings, 'reminder_daily', None), 'enabled', True)
-        reminder_fusion_enabled = getattr(getattr(user_settings, 'reminder_fusion', None), 'enabled', True)
-        reminder_hive_enabled = getattr(getattr(user_settings, 'reminder_hive_energy', None), 'enabled', True)
-        reminder_prune_enabled = getattr(getattr(user_settings, 'reminder_prune', None), 'enabled', True)
-        reminder_quests_enabled = getattr(getattr(user_settings, 'reminder_quests', None), 'enabled', True)
-        reminder_research_enabled = getattr(getattr(user_settings, 'reminder_research', None), 'enabled', True)
-        reminder_upgrade_enabled = getattr(getattr(user_settings, 'reminder_upgrade', None), 'enabled', True)
-        reminder_vote_enabled = getattr(getattr(user_settings, 'reminder_vote', None), 'enabled', True)
-        tracking_enabled = getattr(user_settings, 'tracking_enabled', True)
-
-        # Bonuses
-        if reminder_boosts_enabled:
-            add_reaction = await bonuses.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-
-        # Cooldowns
-        add_reaction = await cooldowns.process_message(message, embed_data, interaction_user, user_settings)
-        return_values.append(add_reaction)
-            
-        # Chests
-        if reminder_chests_enabled or helper_context_enabled:
-            add_reaction = await chests.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Chips
-        if helper_context_enabled:
-            add_reaction = await chips.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-
-        # Clean
-        if reminder_clean_enabled or tracking_enabled:
-            add_reaction = await clean.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Daily
-        if reminder_daily_enabled:
-            add_reaction = await daily.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-
-        # Fusion
-        if reminder_fusion_enabled:
-            add_reaction = await fusion.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Hive
-        if reminder_hive_enabled:
-            add_reaction = await hive.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Inventory
-        add_reaction = await inventory.process_message(message, embed_data, interaction_user, user_settings)
-        return_values.append(add_reaction)
-            
-        # Prune
-        if reminder_prune_enabled or helper_prune_enabled:
-            add_reaction = await prune.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Laboratory
-        if reminder_research_enabled or helper_context_enabled:
-            add_reaction = await laboratory.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Patreon
-        add_reaction = await patreon.process_message(message, embed_data, interaction_user, user_settings)
-        return_values.append(add_reaction)
-            
-        # Profile & Stats
-        if reminder_research_enabled or reminder_upgrade_enabled or helper_prune_enabled:
-            add_reaction = await profile.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-
-        # Quests
-        if reminder_quests_enabled:
-            add_reaction = await quests.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Raid
-        if helper_context_enabled:
-            add_reaction = await raid.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Rebirth
-        if helper_prune_enabled:
-            add_reaction = await rebirth.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Tool upgrade
-        if reminder_upgrade_enabled or helper_context_enabled:
-            add_reaction = await tool.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Tracking
-        if tracking_enabled:
-            add_reaction = await tracking.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-
-        # Use items
-        if reminder_boosts_enabled or helper_prune_enabled:
-            add_reaction = await use.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Vote
-        if reminder_vote_enabled:
-            add_reaction = await vote.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-            
-        # Shop
-        if reminder_boosts_enabled:
-            add_reaction = await shop.process_message(message, embed_data, interaction_user, user_settings)
-            return_values.append(add_reaction)
-
-        if any(return_values): await functions.add_logo_reaction(message)
+            user_settings = embed_data['command_user_settings']
+            if user_settings is None:
+                if not 'fusion results' in embed_data.lower('field0.name'): return
+            elif not user_settings.bot_enabled:
+                return
+        processor_groups = {}
+        for processor in PROCESSORS:
+            if processor.module not in triggered_modules: continue
+            if processor.enabled_by and not any(
+                get_setting_enabled(user_settings, setting) for setting in processor.enabled_by
+            ):
+                continue
+            group = processor.group if processor.group is not None else processor.module
+            processor_groups.setdefault(group, []).append(processor)
+        if not processor_groups: return
+        return_values = await asyncio.gather(
+            *[run_processors(processors, message, module_embed_data, interaction_user, user_settings)
+              for processors in processor_groups.values()],
+            return_exceptions=True
+        )
+        group_errors = [return_value for return_value in return_values if isinstance(return_value, BaseException)]
+        if not group_errors:
+            if any(return_value is True for return_value in return_values):
+                await functions.add_logo_reaction(message)
+            return
+        # A failed message gets no logo reaction. The first error goes to on_error, the others are logged here.
+        for error in group_errors[1:]:
+            if not isinstance(error, Exception) or isinstance(error, discord.errors.Forbidden): continue
+            traceback_str = ''.join(traceback.format_tb(error.__traceback__))
+            await errors.log_error(
+                f'- Event: process_message\n- Error: {error}\n- Traceback:\n{traceback_str}', message
+            )
+        raise group_errors[0]
 
 # Initialization
 def setup(bot):
@@ -188,70 +178,40 @@ def setup(bot):
 
 
 # Functions
-async def parse_embed(message: discord.Message) -> Dict[str, str]:
-    """Parses all data from an embed into a dictionary.
+async def parse_embed(message: discord.Message) -> parsing.ParsedMessage:
+    """Returns the parsed message. Texts are only read from the message when they are accessed.
     All keys are guaranteed to exist and have an empty string as value if not set in the embed.
-    """    
-    embed_data = {
-        'author': {'icon_url': '', 'name': ''},
-        'description': '',
-        'field0': {'name': '', 'value': ''},
-        'field1': {'name': '', 'value': ''},
-        'field2': {'name': '', 'value': ''},
-        'field3': {'name': '', 'value': ''},
-        'field4': {'name': '', 'value': ''},
-        'field5': {'name': '', 'value': ''},
-        'footer': {'icon_url': '', 'text': ''},
-        'title': '',
-    }
-    if message.embeds:
-        embed = message.embeds[0]
-        if embed.author:
-            if embed.author.icon_url is not None:
-                embed_data['author']['icon_url'] = embed.author.icon_url
-            if embed.author.name is not None:
-                embed_data['author']['name'] = embed.author.name
-        if embed.description is not None:
-            embed_data['description'] = embed.description
-        if embed.fields:
-            try:
-                embed_data['field0']['name'] = embed.fields[0].name
-                embed_data['field0']['value'] = embed.fields[0].value
-            except IndexError:
-                pass
-            try:
-                embed_data['field1']['name'] = embed.fields[1].name
-                embed_data['field1']['value'] = embed.fields[1].value
-            except IndexError:
-                pass
-            try:
-                embed_data['field2']['name'] = embed.fields[2].name
-                embed_data['field2']['value'] = embed.fields[2].value
-            except IndexError:
-                pass
-            try:
-                embed_data['field3']['name'] = embed.fields[3].name
-                embed_data['field3']['value'] = embed.fields[3].value
-            except IndexError:
-                pass
-            try:
-                embed_data['field4']['name'] = embed.fields[4].name
-                embed_data['field4']['value'] = embed.fields[4].value
-            except IndexError:
-                pass
-            try:
-                embed_data['field5']['name'] = embed.fields[5].name
-                embed_data['field5']['value'] = embed.fields[5].value
-            except IndexError:
-                pass
-        if embed.footer is not None:
-            if embed.footer.icon_url is not None:
-                embed_data['footer']['icon_url'] = embed.footer.icon_url
-            if embed.footer.text is not None:
-                embed_data['footer']['text'] = embed.footer.text
-        if embed.title is not None:
-            embed_data['title'] = embed.title
-    return embed_data
+    """
+    return parsing.ParsedMessage(message)
+
+
+async def run_processors(processors: List[Processor], message: discord.Message,
+                         module_embed_data: Dict[ModuleType, parsing.ParsedMessage], user: Optional[discord.User],
+                         user_settings: Optional[users.User]) -> bool:
+    """Runs the processors of one group one after another. Every processor gets the parsed message of its module.
+
+    Returns
+    -------
+    True if at least one processor wants a logo reaction, False if not.
+    """
+    add_reaction = False
+    for processor in processors:
+        embed_data = module_embed_data[processor.module]
+        if await processor.module.process_message(message, embed_data, user, user_settings): add_reaction = True
+    return add_reaction
+
+
+async def get_trigger_text(embed_data: parsing.ParsedMessage) -> str:
+    """Returns all text of a message that can contain processor triggers as one lowercase string."""
+    return '\n'.join(embed_data.lower(key) for key in TRIGGER_TEXT_KEYS)
+
+
+def get_setting_enabled(user_settings: Optional[users.User], setting: str) -> bool:
+    """Returns the state of a user setting. Reminder settings return their enabled state.
+    If user_settings is None, all settings count as enabled.
+    """
+    value = getattr(user_settings, setting, True)
+    return getattr(value, 'enabled', value)
 
 
 async def check_message_for_active_components(message: discord.Message) -> Union[bool, None]:
@@ -273,7 +233,8 @@ async def check_message_for_active_components(message: discord.Message) -> Union
 
 
 async def check_edited_message_always_allowed(message_before: discord.Message,
-                                             message_after: discord.Message, embed_data: Dict) -> Union[bool, None]:
+                                             message_after: discord.Message,
+                                             embed_data: parsing.ParsedMessage) -> Union[bool, None]:
     """Check if the edited message should be allowed to process regardless of its components.
     
     Returns
@@ -284,7 +245,7 @@ async def check_edited_message_always_allowed(message_before: discord.Message,
     search_strings = [
         'captcha', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         captcha_solved = False
         for component in message_after.components[0].children:
             if component.style == discord.ButtonStyle.success:
@@ -294,13 +255,14 @@ async def check_edited_message_always_allowed(message_before: discord.Message,
     search_strings = [
         'fusion results', #English
     ]
-    if any(search_string in embed_data['field0']['name'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('field0.name') for search_string in search_strings):
         return True
     return False
 
 
 async def check_edited_message_never_allowed(message_before: discord.Message,
-                                             message_after: discord.Message, embed_data: Dict) -> Union[bool, None]:
+                                             message_after: discord.Message,
+                                             embed_data: parsing.ParsedMessage) -> Union[bool, None]:
     """Check if the edited message should never be allowed to process.
     
     Returns
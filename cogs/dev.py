@@ -168,20 +168,36 @@ class DevCog(commands.Cog):
             await ctx.respond(MSG_NOT_DEV, ephemeral=True)
             return
         from cache import messages
-        cache_size = sys.getsizeof(messages._MESSAGE_CACHE)
-        channel_count = len(messages._MESSAGE_CACHE)
-        message_count = 0
-        for channel_messages in messages._MESSAGE_CACHE.values():
-            message_count += len(channel_messages)
-            cache_size += sys.getsizeof(channel_messages)
-            for message in channel_messages:
-                cache_size += sys.getsizeof(message)
+        channel_count, message_count = await messages.get_message_count()
+        cache_stats = await messages.get_cache_stats()
+        find_count = cache_stats.hits + cache_stats.misses
+        hit_rate = cache_stats.hits / find_count * 100 if find_count > 0 else 0
+        guild_sizes = sorted(cache_stats.guild_bytes.items(), key=lambda guild_size: guild_size[1], reverse=True)
+        guild_lines = ''
+        for guild_id, guild_bytes in guild_sizes[:10]:
+            guild = self.bot.get_guild(guild_id) if guild_id is not None else None
+            guild_name = guild.name if guild is not None else guild_id
+            guild_lines = f'{guild_lines}\n{emojis.BP} {guild_name}: {guild_bytes / 1024:,.2f} KB'
         await ctx.respond(
-            f'Cache size: {cache_size / 1024:,.2f} KB\n'
+            f'Cache size: {cache_stats.bytes / 1024:,.2f} KB / {settings.MESSAGE_CACHE_MAX_BYTES / 1024:,.2f} KB\n'
             f'Channel count: {channel_count:,}\n'
             f'Message count: {message_count:,}\n'
+            f'Hits: {cache_stats.hits:,} ({hit_rate:,.1f}%)\n'
+            f'Misses: {cache_stats.misses:,}\n'
+            f'Evictions: {cache_stats.evictions:,}\n'
+            f'Expirations: {cache_stats.expirations:,}\n'
+            f'Largest guilds:{guild_lines if guild_lines else " -"}'
         )
 
+    @dev.command(name='reminder-stats')
+    async def reminder_stats(self, ctx: discord.ApplicationContext):
+        """Shows how late reminders are delivered"""
+        if ctx.author.id not in settings.DEV_IDS:
+            await ctx.respond(MSG_NOT_DEV, ephemeral=True)
+            return
+        from resources import delivery
+        await ctx.respond(f'**Reminder delivery since startup**\n{await delivery.get_report()}'[:2000])
+
     @dev.command(name='server-list')
     async def server_list(self, ctx: discord.ApplicationContext):
         """Lists the servers the bot is in by name"""
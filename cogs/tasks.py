@@ -5,138 +5,203 @@ import asyncio
 from datetime import datetime, timedelta
 from humanfriendly import format_timespan
 import sqlite3
-from typing import List
+from typing import List, Tuple
 
 import discord
 from discord import utils
 from discord.ext import commands, tasks
 
-from cache import messages
-from database import errors, reminders, tracking, users
-from resources import emojis, exceptions, functions, logs, settings, strings
-
-
-running_tasks = {}
+from cache import messages, recipients
+from database import errors, executor, reminders, tracking, users
+from resources import delivery, emojis, exceptions, locks, logs, outbound, settings
 
 
 class TasksCog(commands.Cog):
     """Cog with tasks"""
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.catch_up_task = None
 
-    # Task management
-    async def background_task(self, reminders_list: List[reminders.Reminder]) -> None:
-        """Background task for scheduling reminders"""
-        first_reminder = reminders_list[0]
-        current_time = utils.utcnow().replace(microsecond=0)
-        def get_time_left() -> timedelta:
-            time_left = first_reminder.end_time - current_time
-            if time_left.total_seconds() < 0: time_left = timedelta(seconds=0)
-            return time_left
+    # Reminders
+    async def fire_reminders(self, due_reminders: List[reminders.Reminder]) -> None:
+        """Marks all reminders up to the latest due reminder as triggered and sends them.
+        Called by the reminder scheduler. All reminders of a channel are sent together.
+        """
+        end_time = max(reminder.end_time for reminder in due_reminders)
+        try:
+            triggered_reminders = await reminders.mark_due_reminders_triggered(end_time)
+        except Exception as error:
+            await errors.log_error(
+                f'Error marking reminders as triggered.\nFunction: fire_reminders\nError: {error}'
+            )
+            return
+        try:
+            await recipients.prefetch(self.bot, triggered_reminders)
+        except Exception as error:
+            await errors.log_error(error)
+        channel_reminders = {}
+        for reminder in triggered_reminders:
+            channel_reminders.setdefault(reminder.channel_id, []).append(reminder)
+        await asyncio.gather(
+            *[self.send_reminders(channel_id, reminders_list)
+              for channel_id, reminders_list in channel_reminders.items()]
+        )
+
+    async def send_reminders(self, channel_id: int, reminders_list: List[reminders.Reminder]) -> int:
+        """Sends the reminders of a channel in as few messages as possible.
+        Reminders are ordered by user and activity. A message never exceeds settings.REMINDER_MESSAGE_MAX_LENGTH and
+        only mentions the users it contains. Reminder lines that are too long on their own are truncated.
+        If a message can't be sent, its reminders are recorded as failed and the remaining messages are still sent.
 
+        Returns
+        -------
+        Amount of delivered reminders: int
+        """
+        dispatched_at = utils.utcnow()
+        undelivered_reminders = list(reminders_list)
+        failed_reminders = []
+        failed = False
         try:
-            channel = await functions.get_discord_channel(self.bot, first_reminder.channel_id)
-            if channel is None: return
-            user = await functions.get_discord_user(self.bot, first_reminder.user_id)
-            user_settings = await users.get_user(user.id)
-            message_no = 1
-            messages = {message_no: ('', '')}
-            for reminder in reminders_list:
-                if reminder.activity == 'custom':
-                    reminder_message = strings.DEFAULT_MESSAGE_CUSTOM_REMINDER.format(message=reminder.message)
-                    if user_settings.dnd_mode_enabled:
-                        message = f'**{user.global_name}** {reminder_message}\n'
-                    else:
-                        message = f'{user.mention} {reminder_message}\n'
-                else:
-                    reminder_message = reminder.message
-                    if user_settings.dnd_mode_enabled:
-                        message = f'{reminder_message.replace("{name}", f"**{user.global_name}**")}\n'
-                    else:
-                        message = f'{reminder_message.replace("{name}", user.mention)}\n'
-                if len(f'{messages[message_no][1]}{message}') > 1900:
-                    message_no += 1
-                    messages[message_no] = (reminder.activity, '')
-                messages[message_no] = (reminder.activity, f'{messages[message_no][1]}{message}')
-            time_left = get_time_left()
-            try:
-                await asyncio.sleep(time_left.total_seconds())
-                allowed_mentions = discord.AllowedMentions(users=[user,])
-                for activity_message in messages.values():
-                    activity, message = activity_message
-                    if activity == 'sweet-apple':
-                        await user_settings.update(xp_gain_average=0)
-                    await channel.send(message.strip(), allowed_mentions=allowed_mentions)
-            except asyncio.CancelledError:
-                return
-            except discord.errors.Forbidden:
-                return
-            running_tasks.pop(first_reminder.task_name, None)
+            channel = await recipients.get_channel(self.bot, channel_id)
+            if channel is None: return 0
+            user_reminders = {}
+            for reminder in sorted(reminders_list, key=lambda reminder: (reminder.user_id, reminder.activity)):
+                user_reminders.setdefault(reminder.user_id, []).append(reminder)
+            channel_recipients = await recipients.get_recipients(self.bot, user_reminders.keys())
+            messages = [('', [], []),]
+            for user_id, user_reminders_list in user_reminders.items():
+                recipient = channel_recipients.get(user_id, None)
+                if recipient is None: continue
+                user, user_settings = recipient
+                for reminder in user_reminders_list:
+                    if reminder.activity == 'sweet-apple':
+                        # Prune updates xp_gain_average while it holds the user lock
+                        async with locks.user_locks(reminder.user_id):
+                            await user_settings.refresh()
+                            await user_settings.update(xp_gain_average=0)
+                    message = await get_reminder_message(reminder, user, user_settings)
+                    if len(message) > settings.REMINDER_MESSAGE_MAX_LENGTH:
+                        message = f'{message[:settings.REMINDER_MESSAGE_MAX_LENGTH - 2]}…\n'
+                    content, mentioned_users, message_reminders = messages[-1]
+                    if len(f'{content}{message}') > settings.REMINDER_MESSAGE_MAX_LENGTH:
+                        content, mentioned_users, message_reminders = '', [], []
+                        messages.append((content, mentioned_users, message_reminders))
+                    if not user_settings.dnd_mode_enabled and user not in mentioned_users:
+                        mentioned_users.append(user)
+                    message_reminders.append(reminder)
+                    messages[-1] = (f'{content}{message}', mentioned_users, message_reminders)
+            for content, mentioned_users, message_reminders in messages:
+                if not content: continue
+                allowed_mentions = discord.AllowedMentions(users=mentioned_users)
+                try:
+                    await outbound.send(channel, content.strip(), allowed_mentions=allowed_mentions,
+                                        priority=outbound.PRIORITY_REMINDER, wait=True)
+                except discord.errors.Forbidden:
+                    failed_reminders += message_reminders
+                    continue
+                except Exception as error:
+                    failed_reminders += message_reminders
+                    await errors.log_error(error)
+                    continue
+                completed_at = utils.utcnow()
+                for reminder in message_reminders:
+                    await delivery.record_delivery(reminder.activity, reminder.end_time, dispatched_at, completed_at)
+                    undelivered_reminders.remove(reminder)
         except discord.errors.Forbidden:
-            return
+            failed = True
         except Exception as error:
+            failed = True
             await errors.log_error(error)
+        finally:
+            for reminder in undelivered_reminders:
+                if failed or reminder in failed_reminders:
+                    await delivery.record_failed(reminder.activity)
+                else:
+                    await delivery.record_missed(reminder.activity)
+        return len(reminders_list) - len(undelivered_reminders)
 
-    async def create_task(self, reminders_list: List[reminders.Reminder]) -> None:
-        """Creates a new background task"""
-        await self.delete_task(reminders_list[0].task_name)
-        task = self.bot.loop.create_task(self.background_task(reminders_list))
-        running_tasks[reminders_list[0].task_name] = task
+    async def catch_up_reminders(self) -> None:
+        """Delivers the reminders that came due while the bot was offline.
+        Reminders that are overdue by more than settings.REMINDER_CATCH_UP_HORIZON seconds are skipped. All overdue
+        reminders are marked as triggered right away, so the scheduler doesn't pick them up. They are then sent in
+        batches of settings.REMINDER_CATCH_UP_BATCH_SIZE channels in the background.
+        """
+        current_time = utils.utcnow().replace(microsecond=0)
+        try:
+            stale_reminders = await reminders.mark_due_reminders_triggered(
+                current_time - timedelta(seconds=settings.REMINDER_CATCH_UP_HORIZON)
+            )
+            overdue_reminders = await reminders.mark_due_reminders_triggered(current_time)
+        except Exception as error:
+            await errors.log_error(
+                f'Error marking overdue reminders as triggered.\nFunction: catch_up_reminders\nError: {error}'
+            )
+            return
+        for reminder in stale_reminders:
+            await delivery.record_missed(reminder.activity)
+        if not overdue_reminders:
+            if stale_reminders:
+                logs.logger.info(f'Reminder catch-up: Skipped {len(stale_reminders):,} stale reminders.')
+            return
+        self.catch_up_task = asyncio.get_running_loop().create_task(
+            self.send_overdue_reminders(overdue_reminders, len(stale_reminders))
+        )
 
-    async def delete_task(self, task_name: str) -> None:
-        """Stops and deletes a running task if it exists"""
-        if task_name in running_tasks:
-            running_tasks[task_name].cancel()
-            running_tasks.pop(task_name, None)
-        return
+    async def send_overdue_reminders(self, overdue_reminders: Tuple[reminders.Reminder],
+                                     stale_reminders_count: int) -> None:
+        """Sends overdue reminders in batches of channels and logs the result"""
+        start_time = utils.utcnow().replace(microsecond=0)
+        channel_reminders = {}
+        for reminder in overdue_reminders:
+            channel_reminders.setdefault(reminder.channel_id, []).append(reminder)
+        channel_items = list(channel_reminders.items())
+        delivered_reminders_count = 0
+        for batch_start in range(0, len(channel_items), settings.REMINDER_CATCH_UP_BATCH_SIZE):
+            if batch_start > 0: await asyncio.sleep(settings.REMINDER_CATCH_UP_BATCH_DELAY)
+            batch = channel_items[batch_start:batch_start + settings.REMINDER_CATCH_UP_BATCH_SIZE]
+            try:
+                await recipients.prefetch(
+                    self.bot, [reminder for _, reminders_list in batch for reminder in reminders_list]
+                )
+            except Exception as error:
+                await errors.log_error(error)
+            delivered_counts = await asyncio.gather(
+                *[self.send_reminders(channel_id, reminders_list) for channel_id, reminders_list in batch]
+            )
+            delivered_reminders_count += sum(delivered_counts)
+        time_passed = utils.utcnow().replace(microsecond=0) - start_time
+        logs.logger.info(
+            f'Reminder catch-up: Delivered {delivered_reminders_count:,} of {len(overdue_reminders):,} overdue '
+            f'reminders in {len(channel_items):,} channels in {format_timespan(time_passed)}. '
+            f'Skipped {stale_reminders_count:,} stale reminders.'
+        )
 
     # Events
     @commands.Cog.listener()
     async def on_ready(self) -> None:
         """Fires when bot has finished starting"""
-        reminders.schedule_reminders.start()
+        await self.catch_up_reminders()
+        await reminders.schedule_active_reminders()
+        reminders.reminder_scheduler.start(self.fire_reminders)
         self.delete_old_reminders.start()
-        self.schedule_tasks.start()
         self.consolidate_tracking_log.start()
         self.delete_old_messages_from_cache.start()
+        self.log_reminder_stats.start()
+        self.prefetch_reminder_recipients.start()
 
     # Tasks
-    @tasks.loop(seconds=0.5)
-    async def schedule_tasks(self):
-        """Task that creates or deletes tasks from scheduled reminders.
-        Reminders that fire at the same second for the same user in the same channel are combined into one task.
-        """
-        user_reminders = {}
-        for reminder in reminders.scheduled_for_tasks.copy().values():
-            reminders.scheduled_for_tasks.pop(reminder.task_name, None)
-            reminder_user_channel = f'{reminder.user_id}-{reminder.channel_id}-{reminder.end_time}'
-            if reminder_user_channel in user_reminders:
-                user_reminders[reminder_user_channel].append(reminder)
-            else:
-                user_reminders[reminder_user_channel] = [reminder,]
-        for reminder in reminders.scheduled_for_deletion.copy().values():
-            reminders.scheduled_for_deletion.pop(reminder.task_name, None)
-            await self.delete_task(reminder.task_name)
-        if user_reminders:
-            for reminders_list in user_reminders.values():
-                reminders_list.sort(key=lambda reminder: reminder.activity)
-                await self.create_task(reminders_list)
-
     @tasks.loop(minutes=2.0)
     async def delete_old_reminders(self) -> None:
         """Task that deletes all old reminders"""
         try:
-            old_reminders = await reminders.get_old_reminders()
-        except:
-            old_reminders = ()
-        for reminder in old_reminders:
-            try:
-                await reminder.delete()
-            except Exception as error:
-                await errors.log_error(
-                    f'Error deleting old reminder.\nFunction: delete_old_reminders\n'
-                    f'Reminder: {reminder}\nError: {error}'
+            deleted_reminders_count = await reminders.delete_old_reminders()
+        except Exception as error:
+            await errors.log_error(
+                f'Error deleting old reminders.\nFunction: delete_old_reminders\nError: {error}'
             )
+            return
+        if settings.DEBUG_MODE:
+            logs.logger.debug(f'Deleted {deleted_reminders_count} old reminders.')
 
     @tasks.loop(seconds=60)
     async def consolidate_tracking_log(self) -> None:
@@ -163,13 +228,12 @@ class TasksCog(commands.Cog):
                 date_time_max = date_time.replace(hour=23, minute=59, second=59, microsecond=999999)
                 await tracking.delete_log_entries(user_id, guild_id, command, date_time_min, date_time_max)
                 await asyncio.sleep(0.01)
-            cur = settings.DATABASE.cursor()
             date_time = utils.utcnow() - timedelta(days=366)
             date_time = date_time.replace(hour=0, minute=0, second=0)
             sql = 'DELETE FROM tracking_log WHERE date_time<?'
             try:
-                cur.execute(sql, (date_time,))
-                cur.execute('VACUUM')
+                await executor.execute(sql, (date_time,))
+                await executor.vacuum()
             except sqlite3.Error as error:
                 logs.logger.error(f'Error while consolidating: {error}')
                 raise
@@ -177,13 +241,41 @@ class TasksCog(commands.Cog):
             time_passed = end_time - start_time
             logs.logger.info(f'Consolidated {log_entry_count:,} log entries in {format_timespan(time_passed)}.')
 
-    @tasks.loop(minutes=10)
+    @tasks.loop(seconds=settings.MESSAGE_CACHE_EXPIRY_INTERVAL)
     async def delete_old_messages_from_cache(self) -> None:
-        """Task that deletes messages from the message cache that are older than 10 minutes"""
+        """Task that continuously deletes messages from the message cache that are older than 6 minutes"""
         deleted_messages_count = await messages.delete_old_messages(timedelta(minutes=6))
-        if settings.DEBUG_MODE:
+        await messages.delete_cold_channel_activity()
+        if settings.DEBUG_MODE and deleted_messages_count > 0:
             logs.logger.debug(f'Deleted {deleted_messages_count} messages from message cache.')
 
+    @tasks.loop(minutes=settings.REMINDER_STATS_LOG_INTERVAL)
+    async def log_reminder_stats(self) -> None:
+        """Task that logs the reminder delivery statistics"""
+        logs.logger.info(f'Reminder delivery since startup:\n{await delivery.get_report()}')
+
+    @tasks.loop(seconds=settings.REMINDER_PREFETCH_INTERVAL)
+    async def prefetch_reminder_recipients(self) -> None:
+        """Task that looks up the channels and recipients of all reminders that are due soon"""
+        await recipients.delete_expired()
+        upcoming_reminders = reminders.reminder_scheduler.get_upcoming(settings.REMINDER_PREFETCH_WINDOW)
+        try:
+            await recipients.prefetch(self.bot, upcoming_reminders)
+        except Exception as error:
+            await errors.log_error(
+                f'Error prefetching reminder recipients.\nFunction: prefetch_reminder_recipients\nError: {error}'
+            )
+
+
+# Functions
+async def get_reminder_message(reminder: reminders.Reminder, user: discord.User,
+                               user_settings: users.User) -> str:
+    """Returns the line of a reminder in a reminder message. Users with DND mode enabled are not mentioned."""
+    if user_settings.dnd_mode_enabled:
+        return f'{reminder.render(f"**{user.global_name}**")}\n'
+    return f'{reminder.render(user.mention)}\n'
+
+
 # Initialization
 def setup(bot):
     bot.add_cog(TasksCog(bot))
\ No newline at end of file
@@ -8,7 +8,7 @@ from typing import List, Optional
 import discord
 from discord import utils
 
-from database import guilds, reminders, tracking, users
+from database import executor, guilds, reminders, tracking, users
 from resources import emojis, exceptions, functions, settings, strings, views
 
 
@@ -157,18 +157,17 @@ async def command_purge_data(bot: discord.Bot, ctx: discord.ApplicationContext)
                 interaction, content=answer_timeout, view=None
             )
         elif view.value == 'confirm':
-            cur = settings.DATABASE.cursor()
             await functions.edit_interaction(
                 interaction, content='Purging user settings...',
                 view=None
             )
-            cur.execute('DELETE FROM users WHERE user_id=?', (ctx.author.id,))
+            await executor.execute('DELETE FROM users WHERE user_id=?', (ctx.author.id,), durable=True)
             await asyncio.sleep(1)
             await functions.edit_interaction(
                 interaction, content='Purging reminders...',
                 view=None
             )
-            cur.execute('DELETE FROM reminders WHERE user_id=?', (ctx.author.id,))
+            await executor.execute('DELETE FROM reminders WHERE user_id=?', (ctx.author.id,), durable=True)
             await asyncio.sleep(1)
             await functions.edit_interaction(
                 interaction, content='Purging tracking data... (this can take a while)',
@@ -7,7 +7,7 @@ from math import ceil
 import sqlite3
 from typing import Tuple
 
-from database import errors
+from database import errors, executor
 from resources import exceptions, settings, strings
 
 
@@ -104,9 +104,7 @@ async def get_cooldown(activity: str) -> Cooldown:
     function_name = 'get_cooldown'
     sql = f'SELECT * FROM {table} WHERE activity=?'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (activity,))
-        record = cur.fetchone()
+        record = await executor.fetchone(sql, (activity,))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -140,9 +138,7 @@ async def get_all_cooldowns() -> Tuple[Cooldown]:
     function_name = 'get_all_cooldowns'
     sql = f'SELECT * FROM {table} ORDER BY activity ASC'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql)
-        records = cur.fetchall()
+        records = await executor.fetchall(sql)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -189,14 +185,13 @@ async def _update_cooldown(activity: str, **kwargs) -> None:
         )
         raise exceptions.NoArgumentsError('You need to specify at least one keyword argument.')
     try:
-        cur = settings.DATABASE.cursor()
         sql = f'UPDATE {table} SET'
         for kwarg in kwargs:
             sql = f'{sql} {kwarg} = :{kwarg},'
         sql = sql.strip(",")
         kwargs['activity'] = activity
         sql = f'{sql} WHERE activity = :activity'
-        cur.execute(sql, kwargs)
+        await executor.execute(sql, kwargs)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
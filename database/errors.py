@@ -9,6 +9,7 @@ import discord
 from discord import utils
 from discord.ext import commands
 
+from database import executor
 from resources import exceptions, logs, settings, strings
 
 
@@ -73,8 +74,7 @@ async def log_error(error: Union[Exception, str], ctx: Optional[Union[commands.C
         jump_url = 'N/A'
         user_settings = 'N/A'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (date_time, error_message, user_settings, jump_url))
+        await executor.execute(sql, (date_time, error_message, user_settings, jump_url))
         logs.logger.error(f'\n{error_message}\n>> Jump URL: {jump_url}')
     except sqlite3.Error as error:
         if ctx is not None:
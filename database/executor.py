@@ -0,0 +1,317 @@
+# executor.py
+"""Runs all database access on a dedicated thread that owns the connection, so queries never block the event loop.
+
+Requests are queued and run one after another in the order they were submitted. Coroutines await their results.
+Outside of a running event loop (e.g. in bot.py before the bot is started), the caller blocks until the result is
+there instead.
+
+Heavy reads can be routed to a pool of read-only connections with read_only=True. Thanks to WAL mode, they read a
+consistent snapshot and neither wait for the database thread nor block it.
+"""
+
+import asyncio
+import atexit
+import concurrent.futures
+import queue
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.request import pathname2url
+
+from resources import logs, settings
+
+
+# Containers
+class QueryResult(NamedTuple):
+    """Result of a statement. Rows are fetched on the database thread."""
+    rows: List[sqlite3.Row]
+    rowcount: int
+    lastrowid: Optional[int]
+
+
+class DatabaseExecutor():
+    """Thread that runs functions with the connection as their first argument.
+    The thread is started with the first request.
+
+    If settings.DATABASE_GROUP_COMMIT is enabled, requests run in a shared transaction that is committed after
+    settings.DATABASE_GROUP_COMMIT_SIZE requests or settings.DATABASE_GROUP_COMMIT_INTERVAL seconds, whichever comes
+    first. Results are handed out right away, except for durable requests, which only get their result once the
+    transaction is committed. The read pool only sees committed writes.
+    """
+    __slots__ = ('_connection', '_lock', '_requests', '_thread')
+
+    def __init__(self, connection: sqlite3.Connection) -> None:
+        self._connection = connection
+        self._lock = threading.Lock()
+        self._requests: queue.SimpleQueue = queue.SimpleQueue()
+        self._thread: Optional[threading.Thread] = None
+
+    def submit(self, function: Optional[Callable[..., Any]], *args, durable: bool = False,
+               exclusive: bool = False) -> concurrent.futures.Future:
+        """Queues a function and returns a future for its result.
+
+        Arguments
+        ---------
+        function: Function to run. If None, only the pending transaction is committed.
+        durable: If True, the result is only set once it is committed.
+        exclusive: If True, the pending transaction is committed first and the function runs outside of a
+        transaction. Needed for statements like VACUUM.
+        """
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='database', daemon=True)
+                    self._thread.start()
+        future = concurrent.futures.Future()
+        self._requests.put((future, function, args, durable, exclusive))
+        return future
+
+    async def run(self, function: Optional[Callable[..., Any]], *args, durable: bool = False,
+                  exclusive: bool = False) -> Any:
+        """Runs a function on the database thread and returns its result. See submit() for the arguments.
+
+        Raises
+        ------
+        All exceptions that function raises.
+        sqlite3.Error if the result was durable and the commit failed.
+        """
+        return await _get_result(self.submit(function, *args, durable=durable, exclusive=exclusive))
+
+    def _run(self) -> None:
+        """Runs the queued requests"""
+        unacknowledged: List[Tuple[concurrent.futures.Future, Any]] = [] # Durable results waiting for the commit
+        commit_at = None
+        request_count = 0
+        while True:
+            timeout = None if commit_at is None else max(commit_at - time.monotonic(), 0)
+            try:
+                future, function, args, durable, exclusive = self._requests.get(timeout=timeout)
+            except queue.Empty:
+                future = None
+            if future is not None and future.set_running_or_notify_cancel():
+                if function is None or exclusive:
+                    self._commit(unacknowledged)
+                    commit_at = None
+                    request_count = 0
+                if function is None:
+                    future.set_result(None)
+                else:
+                    if settings.DATABASE_GROUP_COMMIT and not exclusive and not self._connection.in_transaction:
+                        self._connection.execute('BEGIN')
+                        commit_at = time.monotonic() + settings.DATABASE_GROUP_COMMIT_INTERVAL
+                    try:
+                        result = function(self._connection, *args)
+                    except BaseException as error:
+                        future.set_exception(error)
+                    else:
+                        if durable and self._connection.in_transaction:
+                            unacknowledged.append((future, result))
+                        else:
+                            future.set_result(result)
+                    request_count += 1
+            if commit_at is None: continue
+            if not self._connection.in_transaction:
+                self._fail(unacknowledged, sqlite3.OperationalError('Group commit transaction was rolled back.'))
+                commit_at = None
+                request_count = 0
+            elif request_count >= settings.DATABASE_GROUP_COMMIT_SIZE or time.monotonic() >= commit_at:
+                self._commit(unacknowledged)
+                commit_at = None
+                request_count = 0
+
+    def _commit(self, unacknowledged: List[Tuple[concurrent.futures.Future, Any]]) -> None:
+        """Commits the pending transaction and hands out the durable results"""
+        if not self._connection.in_transaction: return
+        try:
+            self._connection.execute('COMMIT')
+        except sqlite3.Error as error:
+            if self._connection.in_transaction: self._connection.execute('ROLLBACK')
+            self._fail(unacknowledged, error)
+            return
+        for future, result in unacknowledged:
+            future.set_result(result)
+        unacknowledged.clear()
+
+    def _fail(self, unacknowledged: List[Tuple[concurrent.futures.Future, Any]], error: Exception) -> None:
+        """Hands out an error to all durable requests of a transaction that was lost"""
+        logs.logger.error(f'Database group commit failed: {error}')
+        for future, _ in unacknowledged:
+            future.set_exception(error)
+        unacknowledged.clear()
+
+
+class ReadPool():
+    """Threads with one read-only connection each. The threads are started with the first requests."""
+    __slots__ = ('_connections', '_pool')
+
+    def __init__(self, size: int) -> None:
+        self._connections = threading.local()
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=size, thread_name_prefix='database-read')
+
+    def _get_connection(self) -> sqlite3.Connection:
+        connection = getattr(self._connections, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(f'file:{pathname2url(settings.DB_FILE)}?mode=ro', uri=True,
+                                         detect_types=sqlite3.PARSE_DECLTYPES)
+            connection.row_factory = sqlite3.Row
+            self._connections.connection = connection
+        return connection
+
+    async def run(self, function: Callable[..., Any], *args) -> Any:
+        """Runs a function on a pool thread with a read-only connection and returns its result.
+
+        Raises
+        ------
+        All exceptions that function raises.
+        """
+        return await _get_result(self._pool.submit(lambda: function(self._get_connection(), *args)))
+
+
+async def _get_result(future: concurrent.futures.Future) -> Any:
+    """Waits for the result of a future. Blocks if there is no running event loop."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return future.result()
+    return await asyncio.wrap_future(future)
+
+
+def _execute(connection: sqlite3.Connection, sql: str, parameters: Any) -> QueryResult:
+    cur = connection.cursor()
+    cur.execute(sql, parameters)
+    return QueryResult(cur.fetchall(), cur.rowcount, cur.lastrowid)
+
+
+def _executemany(connection: sqlite3.Connection, sql: str, seq_of_parameters: Iterable[Any]) -> QueryResult:
+    cur = connection.cursor()
+    cur.executemany(sql, seq_of_parameters)
+    return QueryResult(cur.fetchall(), cur.rowcount, cur.lastrowid)
+
+
+def _execute_transaction(connection: sqlite3.Connection,
+                         statements: Sequence[Tuple[str, Any, bool]]) -> Tuple[QueryResult, ...]:
+    # A savepoint works as a transaction of its own and also inside a group commit transaction
+    cur = connection.cursor()
+    results = []
+    try:
+        cur.execute('SAVEPOINT execute_transaction')
+        for sql, parameters, many in statements:
+            if many:
+                cur.executemany(sql, parameters)
+            else:
+                cur.execute(sql, parameters)
+            results.append(QueryResult(cur.fetchall(), cur.rowcount, cur.lastrowid))
+        cur.execute('RELEASE execute_transaction')
+    except sqlite3.Error:
+        if connection.in_transaction:
+            cur.execute('ROLLBACK TO execute_transaction')
+            cur.execute('RELEASE execute_transaction')
+        raise
+    return tuple(results)
+
+
+# Executor that owns settings.DATABASE. Pending writes are committed on shutdown.
+executor = DatabaseExecutor(settings.DATABASE)
+atexit.register(lambda: executor.submit(None).result(timeout=5) if settings.DATABASE_GROUP_COMMIT else None)
+# Pool for reads with read_only=True, None if disabled
+read_pool = ReadPool(settings.DATABASE_READ_POOL_SIZE) if settings.DATABASE_READ_POOL_SIZE > 0 else None
+
+
+# Functions
+async def execute(sql: str, parameters: Any = (), durable: bool = False) -> QueryResult:
+    """Executes a statement on the database thread.
+    With durable=True, this only returns once the statement is committed (see DatabaseExecutor).
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    """
+    return await executor.run(_execute, sql, parameters, durable=durable)
+
+
+async def fetchone(sql: str, parameters: Any = (), read_only: bool = False,
+                   durable: bool = False) -> Optional[sqlite3.Row]:
+    """Executes a statement on the database thread and returns the first row or None.
+    Statements with read_only=True run on the read pool instead. Only use this for pure reads.
+    With durable=True, this only returns once the statement is committed (see DatabaseExecutor).
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    """
+    if read_only and read_pool is not None:
+        result = await read_pool.run(_execute, sql, parameters)
+    else:
+        result = await executor.run(_execute, sql, parameters, durable=durable)
+    return result.rows[0] if result.rows else None
+
+
+async def fetchall(sql: str, parameters: Any = (), read_only: bool = False,
+                   durable: bool = False) -> List[sqlite3.Row]:
+    """Executes a statement on the database thread and returns all rows.
+    Statements with read_only=True run on the read pool instead. Only use this for pure reads.
+    With durable=True, this only returns once the statement is committed (see DatabaseExecutor).
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    """
+    if read_only and read_pool is not None:
+        result = await read_pool.run(_execute, sql, parameters)
+    else:
+        result = await executor.run(_execute, sql, parameters, durable=durable)
+    return result.rows
+
+
+async def executemany(sql: str, seq_of_parameters: Iterable[Any], durable: bool = False) -> QueryResult:
+    """Executes a statement for all parameters on the database thread.
+    With durable=True, this only returns once the statement is committed (see DatabaseExecutor).
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    """
+    return await executor.run(_executemany, sql, list(seq_of_parameters), durable=durable)
+
+
+async def execute_transaction(statements: Sequence[Tuple[str, Any, bool]],
+                              durable: bool = False) -> Tuple[QueryResult, ...]:
+    """Executes several statements in one transaction on the database thread. The transaction is rolled back if a
+    statement fails.
+
+    Arguments
+    ---------
+    statements: Tuples of (sql, parameters, many). If many is True, the statement is run with executemany and
+    parameters is a list of parameters.
+    durable: If True, this only returns once the statements are committed (see DatabaseExecutor).
+
+    Returns
+    -------
+    Tuple with the result of every statement
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    """
+    return await executor.run(_execute_transaction, statements, durable=durable)
+
+
+async def flush() -> None:
+    """Commits all pending writes. Returns once they are committed. Does nothing if group commit is disabled.
+
+    Raises
+    ------
+    sqlite3.Error if the commit failed.
+    """
+    await executor.run(None)
+
+
+async def vacuum() -> None:
+    """Commits all pending writes and runs VACUUM.
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    """
+    await executor.run(_execute, 'VACUUM', (), exclusive=True)
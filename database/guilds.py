@@ -10,7 +10,7 @@ from typing import List, Tuple, Union
 import discord
 from discord.ext import commands
 
-from database import errors
+from database import errors, executor
 from resources import exceptions, settings, strings
 
 
@@ -91,9 +91,7 @@ async def get_prefix(ctx_or_message: Union[commands.Context, discord.Message]) -
     sql = f'SELECT prefix FROM {table} WHERE guild_id=?'
     guild_id = ctx_or_message.guild.id
     try:
-        cur=settings.DATABASE.cursor()
-        cur.execute(sql, (guild_id,))
-        record = cur.fetchone()
+        record = await executor.fetchone(sql, (guild_id,))
         prefix = record['prefix'].replace('"','') if record else settings.DEFAULT_PREFIX
     except sqlite3.Error as error:
         await errors.log_error(
@@ -120,9 +118,7 @@ async def get_all_prefixes(bot: commands.Bot, ctx: commands.Context) -> Tuple:
     sql = f'SELECT prefix FROM {table} WHERE guild_id=?'
     guild_id = ctx.guild.id
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (guild_id,))
-        record = cur.fetchone()
+        record = await executor.fetchone(sql, (guild_id,))
         prefixes = []
         if record:
             prefix_db = record['prefix'].replace('"','')
@@ -131,7 +127,7 @@ async def get_all_prefixes(bot: commands.Bot, ctx: commands.Context) -> Tuple:
                 prefixes.append(prefix)
         else:
             sql = f'INSERT INTO {table} (guild_id, prefix) VALUES (?, ?)'
-            cur.execute(sql, (guild_id, settings.DEFAULT_PREFIX))
+            await executor.execute(sql, (guild_id, settings.DEFAULT_PREFIX))
             prefix_default_mixed_case = await _get_mixed_case_prefixes(settings.DEFAULT_PREFIX)
             for prefix in prefix_default_mixed_case:
                 prefixes.append(prefix)
@@ -163,9 +159,7 @@ async def get_guild(guild_id: int) -> Guild:
     function_name = 'get_guild'
     sql_select = f'SELECT * FROM {table} WHERE guild_id=?'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql_select, (guild_id,))
-        record = cur.fetchone()
+        record = await executor.fetchone(sql_select, (guild_id,))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql_select)
@@ -174,10 +168,9 @@ async def get_guild(guild_id: int) -> Guild:
     if not record:
         sql = f'INSERT INTO {table} (guild_id, prefix) VALUES (?, ?)'
         try:
-            cur.execute(sql, (guild_id, settings.DEFAULT_PREFIX))
+            await executor.execute(sql, (guild_id, settings.DEFAULT_PREFIX))
             sql = sql_select
-            cur.execute(sql, (guild_id,))
-            record = cur.fetchone()
+            record = await executor.fetchone(sql, (guild_id,))
         except sqlite3.Error as error:
             await errors.log_error(
                 strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -211,14 +204,13 @@ async def _update_guild(guild_id: int, **kwargs) -> None:
         )
         raise exceptions.NoArgumentsError('You need to specify at least one keyword argument.')
     try:
-        cur = settings.DATABASE.cursor()
         sql = f'UPDATE {table} SET'
         for kwarg in kwargs:
             sql = f'{sql} {kwarg} = :{kwarg},'
         sql = sql.strip(",")
         kwargs['guild_id'] = guild_id
         sql = f'{sql} WHERE guild_id = :guild_id'
-        cur.execute(sql, kwargs)
+        await executor.execute(sql, kwargs)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -4,18 +4,12 @@
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 import sqlite3
-from typing import Optional, Tuple
+from typing import Iterable, Optional, Tuple
 
 from discord import utils
-from discord.ext import tasks
 
-from database import errors
-from resources import exceptions, settings, strings
-
-
-# Reminders scheduled for task creation / deletion
-scheduled_for_tasks = {}
-scheduled_for_deletion = {}
+from database import errors, executor
+from resources import exceptions, logs, scheduler, settings, strings
 
 
 # Containers
@@ -29,13 +23,14 @@ class Reminder():
     end_time: datetime
     message: str
     task_name: str # Unique Task name for scheduling tasks (<user_id>-<activity>)
+    template: Tuple[str, ...] # Rendered reminder message, split at the name slots
     triggered: bool
     user_id: int
     record_exists: bool = True
 
     async def delete(self) -> None:
         """Deletes the reminder record from the database. Also calls refresh().
-        Also cancels and deletes an active task for this reminder.
+        Also removes the reminder from the reminder scheduler.
 
         Raises
         ------
@@ -66,11 +61,12 @@ class Reminder():
         self.end_time = new_settings.end_time
         self.message = new_settings.message
         self.task_name = new_settings.task_name
+        self.template = new_settings.template
         self.triggered = new_settings.triggered
         self.user_id = new_settings.user_id
 
     async def update(self, **kwargs) -> None:
-        """Updates the clan record in the database. Also calls refresh().
+        """Updates the clan record in the database. Also calls refresh() and reschedules the reminder.
 
         Arguments
         ---------
@@ -84,29 +80,50 @@ class Reminder():
             triggered: bool
             user_id: int
         """
+        old_task_name = self.task_name
         await _update_reminder(self, **kwargs)
         await self.refresh()
+        if self.task_name != old_task_name or not self.record_exists: reminder_scheduler.unschedule(old_task_name)
+        if self.record_exists: reminder_scheduler.schedule(self)
+
+    def render(self, name: str) -> str:
+        """Returns the reminder message with the name slots filled in"""
+        return name.join(self.template)
+
 
+# Scheduler that fires all reminders that are not triggered yet. Started by cogs.tasks.
+reminder_scheduler = scheduler.ReminderScheduler(settings.REMINDER_COALESCE_WINDOW)
 
-# Tasks
-@tasks.loop(seconds=10.0)
-async def schedule_reminders():
-    """Task that reads all due reminders from the database and schedules them for task creation"""
+
+async def schedule_active_reminders() -> int:
+    """Adds all active reminders that are not triggered yet to the reminder scheduler.
+
+    Returns
+    -------
+    Amount of scheduled reminders: int
+    """
     try:
-        due_reminders = await get_due_reminders()
+        active_reminders = await get_active_reminders()
     except exceptions.NoDataFoundError:
-        due_reminders = ()
-    for reminder in due_reminders:
-        try:
-            scheduled_for_tasks[reminder.task_name] = reminder
-            await reminder.update(triggered=True)
-        except Exception as error:
-            await errors.log_error(
-                f'Error scheduling a reminder.\nFunction: schedule_reminders\nReminder: {reminder}\nError: {error}'
-        )
+        return 0
+    for reminder in active_reminders:
+        reminder_scheduler.schedule(reminder)
+    return len(reminder_scheduler)
 
 
 # Miscellaneous functions
+def _render_template(activity: str, message: str) -> Tuple[str, ...]:
+    """Renders the message of a reminder once, so sending it only has to fill in the name.
+
+    Returns
+    -------
+    The message split at the name slots: Tuple[str, ...]
+    """
+    if activity == 'custom':
+        return ('', f' {strings.DEFAULT_MESSAGE_CUSTOM_REMINDER.format(message=message)}')
+    return tuple(message.split('{name}'))
+
+
 async def _dict_to_reminder(record: dict) -> Reminder:
     """Creates a Reminder object from a database record
 
@@ -138,6 +155,7 @@ async def _dict_to_reminder(record: dict) -> Reminder:
             end_time = datetime.fromisoformat(record['end_time'], ),
             message = record['message'],
             task_name = task_name,
+            template = _render_template(record['activity'], record['message']),
             triggered = bool(record['triggered']),
             user_id = record.get('user_id', None),
             record_exists = True,
@@ -151,6 +169,40 @@ async def _dict_to_reminder(record: dict) -> Reminder:
     return reminder
 
 
+def _get_upsert_sql(custom: bool, overwrite_message: bool) -> str:
+    """Returns the statement that inserts a reminder or updates the existing reminder of the user and activity.
+    Custom reminders get the lowest free custom id and never conflict.
+
+    Arguments
+    ---------
+    custom: bool - If True, the statement allocates a custom id
+    overwrite_message: bool - If a reminder exists, this controls if the message gets updated or not.
+
+    Returns
+    -------
+    SQL statement with the named parameters user_id, activity, end_time, channel_id, message and triggered
+    """
+    table = 'reminders'
+    if custom:
+        custom_id_sql = (
+            f'(SELECT MIN(used_ids.custom_id + 1) FROM '
+            f'(SELECT 0 AS custom_id UNION ALL SELECT custom_id FROM {table} '
+            f'WHERE activity = :activity AND user_id = :user_id) AS used_ids '
+            f'WHERE NOT EXISTS (SELECT 1 FROM {table} WHERE activity = :activity AND user_id = :user_id '
+            f'AND custom_id = used_ids.custom_id + 1))'
+        )
+    else:
+        custom_id_sql = 'NULL'
+    message_sql = 'excluded.message' if overwrite_message else 'message'
+    return (
+        f'INSERT INTO {table} (user_id, activity, end_time, channel_id, message, custom_id, triggered) '
+        f'VALUES (:user_id, :activity, :end_time, :channel_id, :message, {custom_id_sql}, :triggered) '
+        f'ON CONFLICT (user_id, activity, IFNULL(custom_id, 0)) DO UPDATE SET '
+        f'end_time = excluded.end_time, channel_id = excluded.channel_id, message = {message_sql}, '
+        f'triggered = excluded.triggered'
+    )
+
+
 # Read Data
 async def get_reminder(user_id: int, activity: str, custom_id: Optional[int] = None) -> Reminder:
     """Gets all settings for a reminder from a user id and an activity.
@@ -180,9 +232,8 @@ async def get_reminder(user_id: int, activity: str, custom_id: Optional[int] = N
     sql = f'SELECT * FROM {table} WHERE user_id=? AND activity=?'
     if custom_id is not None: sql = f'{sql} AND custom_id=?'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (user_id, activity)) if custom_id is None else cur.execute(sql, (user_id, activity, custom_id))
-        record = cur.fetchone()
+        queries = (user_id, activity) if custom_id is None else (user_id, activity, custom_id)
+        record = await executor.fetchone(sql, queries)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -235,9 +286,7 @@ async def get_active_reminders(user_id: Optional[int] = None, activity: Optional
         queries.append(f'{activity}%')
     sql = f'{sql} ORDER BY end_time'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, queries)
-        records = cur.fetchall()
+        records = await executor.fetchall(sql, queries, read_only=True)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -256,107 +305,10 @@ async def get_active_reminders(user_id: Optional[int] = None, activity: Optional
     return tuple(reminders)
 
 
-async def get_due_reminders(user_id: Optional[int] = None) -> Tuple[Reminder]:
-    """Gets all reminders for all users or - if the argument user_id is set - for one user that are due within
-    the next 15 seconds.
-
-    Returns
-    -------
-    Tuple[Reminder]
-
-    Raises
-    ------
-    sqlite3.Error if something happened within the database.
-    exceptions.NoDataFoundError if no cooldown was found.
-    LookupError if something goes wrong reading the dict.
-    Also logs all errors to the database.
-    """
-    table = 'reminders'
-    function_name = 'get_due_reminders'
-    if user_id is None:
-        sql = f'SELECT * FROM {table} WHERE triggered=? AND end_time BETWEEN ? AND ?'
-    else:
-        sql = f'SELECT * FROM {table} WHERE user_id=? AND triggered=? AND end_time BETWEEN ? AND ?'
-    try:
-        cur = settings.DATABASE.cursor()
-        current_time = utils.utcnow().replace(microsecond=0)
-        end_time = current_time + timedelta(seconds=15)
-        current_time_str = current_time.isoformat(sep=' ')
-        end_time_str = end_time.isoformat(sep=' ')
-        triggered = False
-        if user_id is None:
-            cur.execute(sql, (triggered, current_time_str, end_time_str))
-        else:
-            cur.execute(sql, (user_id, triggered, current_time_str, end_time_str))
-        records = cur.fetchall()
-    except sqlite3.Error as error:
-        await errors.log_error(
-            strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
-        )
-        raise
-
-    if not records:
-        error_message = 'No due reminders found in database.'
-        if user_id is not None: error_message = f'{error_message} User: {user_id}'
-        raise exceptions.NoDataFoundError(error_message)
-    reminders = []
-    for record in records:
-        reminder = await _dict_to_reminder(dict(record))
-        reminders.append(reminder)
-
-    return tuple(reminders)
-
-
-async def get_old_reminders(user_id: Optional[int] = None) -> Tuple[Reminder]:
-    """Gets all reminders for all users or - if the argument user_id is set - for one user that are have an end time
-    more than 20 seconds in the past.
-
-    Returns
-    -------
-    Tuple[Reminder]
-
-    Raises
-    ------
-    sqlite3.Error if something happened within the database.
-    exceptions.NoDataFoundError if no cooldown was found.
-    LookupError if something goes wrong reading the dict.
-    Also logs all errors to the database.
-    """
-    table = 'reminders'
-    function_name = 'get_old_reminders'
-    if user_id is None:
-        sql = f'SELECT * FROM {table} WHERE end_time < ?'
-    else:
-        sql = f'SELECT * FROM {table} WHERE user_id=? AND end_time < ?'
-    try:
-        cur = settings.DATABASE.cursor()
-        current_time = utils.utcnow().replace(microsecond=0)
-        end_time  = current_time - timedelta(seconds=20)
-        end_time_str = end_time.isoformat(sep=' ')
-        cur.execute(sql, (end_time_str,)) if user_id is None else cur.execute(sql, (user_id, end_time_str))
-        records = cur.fetchall()
-    except sqlite3.Error as error:
-        await errors.log_error(
-            strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
-        )
-        raise
-
-    if not records:
-        error_message = 'No old reminders found in database.'
-        if user_id is not None: error_message = f'{error_message} User: {user_id}'
-        raise exceptions.NoDataFoundError(error_message)
-    reminders = []
-    for record in records:
-        reminder = await _dict_to_reminder(dict(record))
-        reminders.append(reminder)
-
-    return tuple(reminders)
-
-
 # Write Data
 async def _delete_reminder(reminder: Reminder) -> None:
     """Deletes reminder record. Use Reminder.delete() to trigger this function.
-    Also cancels and deletes an active task for this reminder.
+    Also removes the reminder from the reminder scheduler.
 
     Raises
     ------
@@ -369,16 +321,16 @@ async def _delete_reminder(reminder: Reminder) -> None:
     sql = f'DELETE FROM {table} WHERE user_id=? AND activity=?'
     if reminder.activity == 'custom': sql = f'{sql} AND custom_id=?'
     try:
-        cur = settings.DATABASE.cursor()
         if reminder.activity == 'custom':
-            cur.execute(sql, (reminder.user_id, reminder.activity, reminder.custom_id))
+            await executor.execute(sql, (reminder.user_id, reminder.activity, reminder.custom_id))
         else:
-            cur.execute(sql, (reminder.user_id, reminder.activity))
+            await executor.execute(sql, (reminder.user_id, reminder.activity))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
         )
         raise
+    reminder_scheduler.unschedule(reminder.task_name)
 
 
 async def _update_reminder(reminder: Reminder, **kwargs) -> None:
@@ -410,13 +362,8 @@ async def _update_reminder(reminder: Reminder, **kwargs) -> None:
             strings.INTERNAL_ERROR_NO_ARGUMENTS.format(table=table, function=function_name)
         )
         raise exceptions.NoArgumentsError('You need to specify at least one keyword argument.')
-    current_time = utils.utcnow().replace(microsecond=0)
-    end_time = kwargs['end_time'] if 'end_time' in kwargs else reminder.end_time
-    time_left = end_time - current_time
-    triggered = False if time_left.total_seconds() > 15 else True
-    if 'triggered' not in kwargs: kwargs['triggered'] = triggered
+    if 'end_time' in kwargs and 'triggered' not in kwargs: kwargs['triggered'] = False
     try:
-        cur = settings.DATABASE.cursor()
         sql = f'UPDATE {table} SET'
         for kwarg in kwargs:
             sql = f'{sql} {kwarg} = :{kwarg},'
@@ -428,21 +375,21 @@ async def _update_reminder(reminder: Reminder, **kwargs) -> None:
         if reminder.activity == 'custom':
             kwargs['custom_id_old'] = reminder.custom_id
             sql = f'{sql} AND custom_id = :custom_id_old'
-        cur.execute(sql, kwargs)
+        await executor.execute(sql, kwargs)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
         )
         raise
-    if triggered: scheduled_for_tasks[reminder.task_name] = reminder
 
 
 async def insert_reminder(user_id: int, activity: str, time_left: timedelta,
                           channel_id: int, message: str, overwrite_message: Optional[bool] = True) -> Reminder:
     """Inserts a reminder record.
-    This function first checks if a reminder exists. If yes, the existing reminder will be updated instead and
-    no new record is inserted.
-    If end_time is less than 16 seconds in the future, this also creates a background task.
+    If a reminder for this user and activity exists, the existing reminder will be updated instead and no new record
+    is inserted. Custom reminders always get a new record with the lowest free custom id.
+    This is done with a single upsert statement on the unique key (user_id, activity, IFNULL(custom_id, 0)).
+    The reminder is added to the reminder scheduler.
 
     Arguments
     ---------
@@ -455,72 +402,200 @@ async def insert_reminder(user_id: int, activity: str, time_left: timedelta,
     Raises
     ------
     sqlite3.Error if something happened within the database.
+    LookupError if something goes wrong reading the dict.
     Also logs all errors to the database.
     """
     function_name = 'insert_reminder'
     table = 'reminders'
     current_time = utils.utcnow().replace(microsecond=0)
     end_time = current_time + time_left
-    custom_id = None
-    triggered = False if time_left.total_seconds() > 15 else True
+    sql = f'{_get_upsert_sql(activity == "custom", overwrite_message)} RETURNING *'
+    queries = {
+        'user_id': user_id,
+        'activity': activity,
+        'end_time': end_time,
+        'channel_id': channel_id,
+        'message': message,
+        'triggered': False,
+    }
+    try:
+        record = await executor.fetchone(sql, queries, durable=True)
+    except sqlite3.Error as error:
+        await errors.log_error(
+            strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
+        )
+        raise
+    reminder = await _dict_to_reminder(dict(record))
+    reminder_scheduler.schedule(reminder)
+
+    return reminder
+
+
+async def upsert_reminders(user_id: int, channel_id: int,
+                           items: Iterable[Tuple[str, timedelta, str]]) -> Tuple[Reminder]:
+    """Inserts or updates several reminders of a user at once, e.g. all reminders of a cooldown list.
+    All reminders are written in one transaction and the reminder scheduler is only woken once.
+    Custom reminders are not supported, use insert_reminder for those.
+
+    Arguments
+    ---------
+    items: Iterable of (activity, time_left, message). Existing reminders always get the new message.
+
+    Returns
+    -------
+    Tuple[Reminder] with all reminders of the activities in items.
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    LookupError if something goes wrong reading the dict.
+    ValueError if an item has the activity "custom".
+    Also logs all errors to the database.
+    """
+    function_name = 'upsert_reminders'
+    table = 'reminders'
+    current_time = utils.utcnow().replace(microsecond=0)
+    queries = []
+    for activity, time_left, message in items:
+        if activity == 'custom': raise ValueError('Custom reminders can\'t be upserted in bulk.')
+        queries.append(
+            {
+                'user_id': user_id,
+                'activity': activity,
+                'end_time': current_time + time_left,
+                'channel_id': channel_id,
+                'message': message,
+                'triggered': False,
+            }
+        )
+    if not queries: return ()
+    activities = tuple(set(query['activity'] for query in queries))
+    sql = _get_upsert_sql(False, True)
+    try:
+        sql_select = (
+            f'SELECT * FROM {table} WHERE user_id=? AND custom_id IS NULL '
+            f'AND activity IN ({",".join("?" * len(activities))})'
+        )
+        _, result = await executor.execute_transaction(
+            ((sql, queries, True), (sql_select, (user_id, *activities), False)), durable=True
+        )
+        records = result.rows
+    except sqlite3.Error as error:
+        await errors.log_error(
+            strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
+        )
+        raise
+    reminders = []
+    for record in records:
+        reminder = await _dict_to_reminder(dict(record))
+        reminders.append(reminder)
+    reminder_scheduler.schedule_many(reminders)
+
+    return tuple(reminders)
+
+
+async def create_unique_key() -> int:
+    """Creates the unique key (user_id, activity, IFNULL(custom_id, 0)) that insert_reminder needs.
+    The primary key can't be used for this, because custom_id is NULL for all reminders that are not custom reminders
+    and NULL values never conflict. Duplicate reminders from before the key existed are deleted first, only the newest
+    one is kept. The amount of deleted reminders is logged.
+    Does nothing if the key already exists.
+
+    Returns
+    -------
+    Amount of deleted duplicate reminders: int
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    Also logs all errors to the database.
+    """
+    table = 'reminders'
+    function_name = 'create_unique_key'
+    sql = (
+        f'DELETE FROM {table} WHERE rowid NOT IN '
+        f'(SELECT MAX(rowid) FROM {table} GROUP BY user_id, activity, IFNULL(custom_id, 0))'
+    )
+    index_sql = (
+        f'CREATE UNIQUE INDEX IF NOT EXISTS user_id_activity_custom_id '
+        f'ON {table} (user_id, activity, IFNULL(custom_id, 0))'
+    )
     try:
-        cur = settings.DATABASE.cursor()
-        if activity == 'custom':
-            sql = f'SELECT custom_id FROM {table} WHERE user_id = ? AND activity = ? ORDER BY custom_id ASC'
-            cur.execute(sql, (user_id, 'custom',))
-            record_custom_reminders = cur.fetchall()
-            if not record_custom_reminders:
-                custom_id = 1
-            else:
-                highest_custom_id = record_custom_reminders[-1]['custom_id']
-                if highest_custom_id is None:
-                    custom_id = 1
-                else:
-                    if highest_custom_id > len(record_custom_reminders):
-                        reminder_count = 1
-                        for record in record_custom_reminders:
-                            if reminder_count == record['custom_id']:
-                                custom_id = reminder_count = reminder_count + 1
-                            else:
-                                custom_id = reminder_count
-                                break
-                    else:
-                        custom_id = highest_custom_id + 1
+        record = await executor.fetchone(
+            "SELECT 1 FROM sqlite_master WHERE type='index' AND name='user_id_activity_custom_id'"
+        )
+        if record is not None: return 0
+        delete_result, _ = await executor.execute_transaction(
+            ((sql, (), False), (index_sql, (), False)), durable=True
+        )
+    except sqlite3.Error as error:
+        await errors.log_error(
+            strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
+        )
+        raise
+    deleted_count = max(delete_result.rowcount, 0)
+    logs.logger.warning(
+        f'Created unique reminder key. Deleted {deleted_count:,} duplicate reminders, kept the newest of each.'
+    )
+    return deleted_count
+
 
+async def mark_due_reminders_triggered(end_time: datetime) -> Tuple[Reminder]:
+    """Marks all reminders that are not triggered yet and end at or before end_time as triggered.
+    Uses a single statement, so the whole window is marked in one transaction.
+
+    Returns
+    -------
+    Tuple[Reminder] with the reminders that were marked. The amount of marked reminders is the length of the tuple.
+    Reminders that were deleted or moved to a later end time in the meantime are not included.
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    LookupError if something goes wrong reading the dict.
+    Also logs all errors to the database.
+    """
+    table = 'reminders'
+    function_name = 'mark_due_reminders_triggered'
+    sql = f'UPDATE {table} SET triggered=? WHERE triggered=? AND end_time<=? RETURNING *'
+    try:
+        records = await executor.fetchall(sql, (True, False, end_time.isoformat(sep=' ')))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
         )
         raise
-    reminder = None
-    if activity != 'custom':
-        try:
-            reminder = await get_reminder(user_id, activity)
-        except exceptions.NoDataFoundError:
-            pass
-    if reminder is not None:
-        if overwrite_message:
-            await reminder.update(end_time=end_time, channel_id=channel_id, message=message)
-        else:
-            await reminder.update(end_time=end_time, channel_id=channel_id)
-    else:
-        sql = (
-            f'INSERT INTO {table} (user_id, activity, end_time, channel_id, message, custom_id, triggered) '
-            f'VALUES (?, ?, ?, ?, ?, ?, ?)'
+    reminders = []
+    for record in records:
+        reminder = await _dict_to_reminder(dict(record))
+        reminders.append(reminder)
+
+    return tuple(reminders)
+
+
+async def delete_old_reminders(seconds: Optional[int] = 20) -> int:
+    """Deletes all reminders with an end time more than the given seconds in the past.
+    Uses a single statement, so all reminders are deleted in one transaction.
+
+    Returns
+    -------
+    Amount of deleted reminders: int
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    Also logs all errors to the database.
+    """
+    table = 'reminders'
+    function_name = 'delete_old_reminders'
+    sql = f'DELETE FROM {table} WHERE end_time<?'
+    try:
+        end_time = utils.utcnow().replace(microsecond=0) - timedelta(seconds=seconds)
+        result = await executor.execute(sql, (end_time.isoformat(sep=' '),))
+    except sqlite3.Error as error:
+        await errors.log_error(
+            strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
         )
-        try:
-            cur.execute(sql, (user_id, activity, end_time, channel_id, message, custom_id, triggered))
-        except sqlite3.Error as error:
-            await errors.log_error(
-                strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
-            )
-            raise
-        reminder = await get_reminder(user_id, activity, custom_id)
-
-    # Create background task if necessary
-    if triggered:
-        scheduled_for_tasks[reminder.task_name] = reminder
-    else:
-        scheduled_for_deletion[reminder.task_name] = reminder
+        raise
 
-    return reminder
\ No newline at end of file
+    return result.rowcount
\ No newline at end of file
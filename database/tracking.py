@@ -9,7 +9,7 @@ from typing import NamedTuple, Optional, Tuple
 
 from discord import utils
 
-from database import errors
+from database import errors, executor
 from resources import exceptions, settings, strings
 
 
@@ -142,9 +142,7 @@ async def get_log_entry(user_id: int, guild_id: int, command_or_drop: str, date_
     function_name = 'get_log_entry'
     sql = f'SELECT * FROM {table} WHERE user_id=? AND guild_id=? AND command_or_drop=? AND date_time=? AND type=?'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (user_id, guild_id, command_or_drop, date_time, entry_type))
-        record = cur.fetchone()
+        record = await executor.fetchone(sql, (user_id, guild_id, command_or_drop, date_time, entry_type))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -191,12 +189,10 @@ async def get_log_entries(user_id: int, command_or_drop: str, timeframe: timedel
     date_time = utils.utcnow() - timeframe
     if guild_id is not None: sql = f'{sql} AND guild_id=?'
     try:
-        cur = settings.DATABASE.cursor()
         if guild_id is None:
-            cur.execute(sql, (user_id, date_time, command_or_drop))
+            records = await executor.fetchall(sql, (user_id, date_time, command_or_drop))
         else:
-            cur.execute(sql, (user_id, date_time, command_or_drop, guild_id))
-        records = cur.fetchall()
+            records = await executor.fetchall(sql, (user_id, date_time, command_or_drop, guild_id))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -238,9 +234,7 @@ async def get_all_log_entries(user_id: int) -> Tuple[LogEntry]:
         f'SELECT * FROM {table} WHERE user_id=?'
     )
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (user_id,))
-        records = cur.fetchall()
+        records = await executor.fetchall(sql, (user_id,))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -285,9 +279,7 @@ async def get_old_log_entries(days: int) -> Tuple[LogEntry]:
     date_time = utils.utcnow() - timedelta(days=days)
     date_time = date_time.replace(hour=0, minute=0, second=0)
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (date_time, 'single'))
-        records = cur.fetchall()
+        records = await executor.fetchall(sql, (date_time, 'single'))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -326,12 +318,10 @@ async def get_log_report(user_id: int, timeframe: timedelta,
     if guild_id is not None: sql = f'{sql} AND guild_id=?'
     sql = f'{sql} GROUP BY command_or_drop'
     try:
-        cur = settings.DATABASE.cursor()
         if guild_id is None:
-            cur.execute(sql, (user_id, date_time))
+            records = await executor.fetchall(sql, (user_id, date_time), read_only=True)
         else:
-            cur.execute(sql, (user_id, date_time, guild_id))
-        records = cur.fetchall()
+            records = await executor.fetchall(sql, (user_id, date_time, guild_id), read_only=True)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -380,9 +370,8 @@ async def _delete_log_entry(log_entry: LogEntry) -> None:
     function_name = '_delete_log_entry'
     sql = f'DELETE FROM {table} WHERE user_id=? AND guild_id=? AND command_or_drop=? AND date_time=? AND type=?'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (log_entry.user_id, log_entry.guild_id, log_entry.command_or_drop, log_entry.date_time,
-                          log_entry.entry_type))
+        await executor.execute(sql, (log_entry.user_id, log_entry.guild_id, log_entry.command_or_drop,
+                                     log_entry.date_time, log_entry.entry_type))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -418,7 +407,6 @@ async def _update_log_entry(log_entry: LogEntry, **kwargs) -> None:
         )
         raise exceptions.NoArgumentsError('You need to specify at least one keyword argument.')
     try:
-        cur = settings.DATABASE.cursor()
         sql = f'UPDATE {table} SET'
         for kwarg in kwargs:
             sql = f'{sql} {kwarg} = :{kwarg},'
@@ -431,7 +419,7 @@ async def _update_log_entry(log_entry: LogEntry, **kwargs) -> None:
             f'{sql} WHERE user_id = :user_id_old AND type = :entry_type_old AND command_or_drop = :command_or_drop_old '
             f'AND date_time = :date_time_old'
         )
-        cur.execute(sql, kwargs)
+        await executor.execute(sql, kwargs)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -458,8 +446,7 @@ async def insert_log_entry(user_id: int, guild_id: int,
         f'INSERT INTO {table} (user_id, guild_id, command_or_drop, amount, date_time) VALUES (?, ?, ?, ?, ?)'
     )
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (user_id, guild_id, command_or_drop, amount, date_time))
+        await executor.execute(sql, (user_id, guild_id, command_or_drop, amount, date_time))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -497,8 +484,7 @@ async def insert_log_summary(user_id: int, guild_id: int, command_or_drop: str,
             f'INSERT INTO {table} (user_id, guild_id, command_or_drop, amount, date_time, type) VALUES (?, ?, ?, ?, ?, ?)'
         )
         try:
-            cur = settings.DATABASE.cursor()
-            cur.execute(sql, (user_id, guild_id, command_or_drop, amount, date_time, 'summary'))
+            await executor.execute(sql, (user_id, guild_id, command_or_drop, amount, date_time, 'summary'))
         except sqlite3.Error as error:
             await errors.log_error(
                 strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -523,8 +509,7 @@ async def delete_log_entries(user_id: int, guild_id: int, command_or_drop: str,
     function_name = '_delete_log_entries'
     sql = f'DELETE FROM {table} WHERE user_id=? AND guild_id=? AND command_or_drop=? AND type=? AND date_time BETWEEN ? AND ?'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (user_id, guild_id, command_or_drop, 'single', date_time_min, date_time_max))
+        await executor.execute(sql, (user_id, guild_id, command_or_drop, 'single', date_time_min, date_time_max))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -4,9 +4,9 @@
 from dataclasses import dataclass
 from datetime import datetime
 import sqlite3
-from typing import NamedTuple, Tuple
+from typing import Iterable, NamedTuple, Tuple
 
-from database import errors
+from database import errors, executor
 from resources import exceptions, settings, strings
 
 
@@ -236,9 +236,7 @@ async def get_user(user_id: int) -> User:
     function_name = 'get_user'
     sql = f'SELECT * FROM {table} WHERE user_id=?'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, (user_id,))
-        record = cur.fetchone()
+        record = await executor.fetchone(sql, (user_id,))
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -269,9 +267,7 @@ async def get_all_users() -> Tuple[User]:
     function_name = 'get_all_users'
     sql = f'SELECT * FROM {table}'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql)
-        records = cur.fetchall()
+        records = await executor.fetchall(sql)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -287,6 +283,42 @@ async def get_all_users() -> Tuple[User]:
     return tuple(users)
 
 
+async def get_users(user_ids: Iterable[int]) -> Tuple[User]:
+    """Gets the user settings of several users with as few queries as possible.
+    Users that are not in the database are left out.
+
+    Returns
+    -------
+    Tuple with User objects
+
+    Raises
+    ------
+    sqlite3.Error if something happened within the database.
+    LookupError if something goes wrong reading the dict.
+    Also logs all errors to the database.
+    """
+    table = 'users'
+    function_name = 'get_users'
+    user_ids = list(set(user_ids))
+    records = []
+    for chunk_start in range(0, len(user_ids), settings.DATABASE_MAX_VARIABLES):
+        chunk = user_ids[chunk_start:chunk_start + settings.DATABASE_MAX_VARIABLES]
+        sql = f'SELECT * FROM {table} WHERE user_id IN ({",".join("?" * len(chunk))})'
+        try:
+            records.extend(await executor.fetchall(sql, chunk))
+        except sqlite3.Error as error:
+            await errors.log_error(
+                strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
+            )
+            raise
+    users = []
+    for record in records:
+        user = await _dict_to_user(dict(record))
+        users.append(user)
+
+    return tuple(users)
+
+
 async def get_user_count() -> int:
     """Gets the amount of users in the table "users".
 
@@ -302,9 +334,7 @@ async def get_user_count() -> int:
     function_name = 'get_user_count'
     sql = f'SELECT COUNT(user_id) FROM {table}'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql)
-        record = cur.fetchone()
+        record = await executor.fetchone(sql, read_only=True)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
@@ -382,14 +412,13 @@ async def _update_user(user: User, **kwargs) -> None:
         )
         raise exceptions.NoArgumentsError('You need to specify at least one keyword argument.')
     try:
-        cur = settings.DATABASE.cursor()
         sql = f'UPDATE {table} SET'
         for kwarg in kwargs:
             sql = f'{sql} {kwarg} = :{kwarg},'
         sql = sql.strip(",")
         kwargs['user_id'] = user.user_id
         sql = f'{sql} WHERE user_id = :user_id'
-        cur.execute(sql, kwargs)
+        await executor.execute(sql, kwargs)
         if 'user_donor_tier' in kwargs and user.partner_id is not None:
             partner = await get_user(user.partner_id)
             await partner.update(partner_donor_tier=kwargs['user_donor_tier'])
@@ -424,8 +453,7 @@ async def insert_user(user_id: int) -> User:
         sql = f'{sql}?,'
     sql = f'{sql.strip(",")})'
     try:
-        cur = settings.DATABASE.cursor()
-        cur.execute(sql, values)
+        await executor.execute(sql, values, durable=True)
     except sqlite3.Error as error:
         await errors.log_error(
             strings.INTERNAL_ERROR_SQLITE3.format(error=error, table=table, function=function_name, sql=sql)
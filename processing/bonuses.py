@@ -2,16 +2,24 @@
 
 from datetime import timedelta
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import errors, reminders, users
-from resources import emojis, exceptions, functions, regex, strings
+from resources import correlation, emojis, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'buffs, bonuses and reductions', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'buffs, bonuses and reductions', regex.COMMAND_BONUSES, None, author_icon=False),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all /bonuses related actions.
 
@@ -26,8 +34,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
 
 
 
-async def create_reminders(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
-                                   user_settings: Optional[users.User]) -> bool:
+async def create_reminders(message: discord.Message, embed_data: parsing.ParsedMessage,
+                           interaction_user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Creates boost remindesr from /bonuses
 
     Returns
@@ -41,16 +49,15 @@ async def create_reminders(message: discord.Message, embed_data: Dict, interacti
     search_strings = [
         'buffs, bonuses and reductions', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if embed_data['embed_user'] is not None and interaction_user is not None:
             if interaction_user != embed_data['embed_user']:
                 return add_reaction
         embed_users = []
         if interaction_user is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_BONUSES)
-            )
-            interaction_user = user_command_message.author
+            interaction_user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if interaction_user is None: return add_reaction
         if embed_data['embed_user'] is None:
             user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
             if user_id_match:
@@ -90,6 +97,7 @@ async def create_reminders(message: discord.Message, embed_data: Dict, interacti
             else:
                 ready_commands.append(activity)
 
+        reminder_items = []
         for cooldown in cooldowns:
             cd_activity = cooldown[0]
             cd_time_left = cooldown[1]
@@ -102,12 +110,12 @@ async def create_reminders(message: discord.Message, embed_data: Dict, interacti
                         await user_settings.update(xp_gain_average=0)
                 except exceptions.NoDataFoundError:
                     await user_settings.update(xp_gain_average=0)
-            reminder: reminders.Reminder = (
-                await reminders.insert_reminder(interaction_user.id, cd_activity, cd_time_left,
-                                                message.channel.id, cd_message)
-            )
-            if not reminder.record_exists:
-                await message.channel.send(strings.MSG_ERROR)
+            reminder_items.append((cd_activity, cd_time_left, cd_message))
+        if reminder_items:
+            updated_reminders = await reminders.upsert_reminders(interaction_user.id, message.channel.id,
+                                                                 reminder_items)
+            if len(updated_reminders) < len(set(item[0] for item in reminder_items)):
+                await outbound.send(message.channel, strings.MSG_ERROR)
                 return add_reaction
             updated_reminder = True
         for activity in ready_commands:
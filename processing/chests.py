@@ -1,16 +1,26 @@
 # chests.py
 
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import reminders, users
-from resources import emojis, exceptions, functions, regex, strings
+from resources import correlation, emojis, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'chest opened!', #English
+    'chests inventory', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'chest opened!', regex.COMMAND_CHESTS, correlation.user_name_from_author),
+    correlation.Command('field1.name', 'chests inventory', regex.COMMAND_CHESTS, correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all chests related actions.
 
@@ -25,8 +35,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def call_context_helper_on_chest_open(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                              user_settings: Optional[users.User]) -> bool:
+async def call_context_helper_on_chest_open(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                            user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Call the context helper after opening a chest
 
     Returns
@@ -41,32 +51,27 @@ async def call_context_helper_on_chest_open(message: discord.Message, embed_data
     search_strings_field0 = [
         'chip', #English
     ]
-    if (any(search_string in embed_data['title'].lower() for search_string in search_strings_title)
-        and any(search_string in embed_data['field0']['value'].lower() for search_string in search_strings_field0)):
+    if (any(search_string in embed_data.lower('title') for search_string in search_strings_title)
+        and any(search_string in embed_data.lower('field0.value') for search_string in search_strings_field0)):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_CHESTS,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_context_enabled: return add_reaction
-        await message.reply(
+        await outbound.reply(
+            message,
             f"➜ {strings.SLASH_COMMANDS['chips fusion']}\n"
             f"➜ {strings.SLASH_COMMANDS['chips show']}\n"
         )
     return add_reaction
 
 
-async def create_reminder(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def create_reminder(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Creates a reminder on /chests
 
@@ -79,17 +84,11 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
     search_strings = [
         'chests inventory', #English
     ]
-    if any(search_string in embed_data['field1']['name'].lower() for search_string in search_strings) and message.components:
+    if any(search_string in embed_data.lower('field1.name') for search_string in search_strings) and message.components:
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_CHESTS,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -1,15 +1,31 @@
 # chips.py
 
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import users
-from resources import exceptions, regex, strings
+from resources import correlation, exceptions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'fusion results', #English
+    'hull chips', #English
+    'aerodynamic chips', #English
+    'attack chips', #English
+    'extension chips', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'fusion results', regex.COMMAND_CHIPS_FUSION, correlation.user_name_from_author),
+    correlation.Command('title', 'hull chips', regex.COMMAND_CHIPS, correlation.user_name_from_author),
+    correlation.Command('title', 'aerodynamic chips', regex.COMMAND_CHIPS, correlation.user_name_from_author),
+    correlation.Command('title', 'attack chips', regex.COMMAND_CHIPS, correlation.user_name_from_author),
+    correlation.Command('title', 'extension chips', regex.COMMAND_CHIPS, correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all chips related actions.
 
@@ -24,7 +40,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def call_context_helper_on_chips_fusion(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def call_context_helper_on_chips_fusion(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                              user: Optional[discord.User],
                                               user_settings: Optional[users.User]) -> bool:
     """Call the context helper after a chips fusion
 
@@ -37,24 +54,19 @@ async def call_context_helper_on_chips_fusion(message: discord.Message, embed_da
     search_strings = [
         'fusion results', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_CHIPS_FUSION,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_context_enabled: return add_reaction
-        await message.reply(
+        await outbound.reply(
+            message,
             f"➜ {strings.SLASH_COMMANDS['chips fusion']}\n"
             f"➜ {strings.SLASH_COMMANDS['chips show']}\n"
             f"➜ {strings.SLASH_COMMANDS['hive equip']}\n"
@@ -62,8 +74,8 @@ async def call_context_helper_on_chips_fusion(message: discord.Message, embed_da
     return add_reaction
 
 
-async def call_context_helper_on_chips_list(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                              user_settings: Optional[users.User]) -> bool:
+async def call_context_helper_on_chips_list(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                            user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Call the context helper after opening the chips list
 
     Returns
@@ -78,25 +90,20 @@ async def call_context_helper_on_chips_list(message: discord.Message, embed_data
         'attack chips', #English
         'extension chips', #English
     ]
-    if (any(search_string in embed_data['title'].lower() for search_string in search_strings)
+    if (any(search_string in embed_data.lower('title') for search_string in search_strings)
         and message.edited_at is None):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_CHIPS,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_context_enabled: return add_reaction
-        await message.reply(
+        await outbound.reply(
+            message,
             f"➜ {strings.SLASH_COMMANDS['chips fusion']}\n"
             f"➜ {strings.SLASH_COMMANDS['hive equip']}"
         )
@@ -2,19 +2,29 @@
 
 from datetime import timedelta
 import re
-from typing import Dict, Optional
-import unicodedata
+from typing import Optional
 
 import discord
 from datetime import timedelta
 
-from cache import messages
 from database import reminders, users
-from resources import emojis, exceptions, functions, regex
+from resources import correlation, emojis, exceptions, functions, parsing, regex
 
 
-async def process_message(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
-                          user_settings: Optional[users.User]) -> bool:
+TRIGGERS = (
+    'you can use this command again in', #English
+    '\'s cooldowns', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'you can use this command again in', None, correlation.user_name_from_author,
+                        author_icon=False),
+    correlation.Command('author.name', '\'s cooldowns', regex.COMMAND_COOLDOWNS, None, author_icon=False),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage,
+                          interaction_user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Processes the message for all cooldown related actions.
 
     Returns
@@ -28,7 +38,7 @@ async def process_message(message: discord.Message, embed_data: Dict, interactio
     return any(return_values)
 
 
-async def create_reminder_on_command_cooldown(message: discord.Message, embed_data: Dict,
+async def create_reminder_on_command_cooldown(message: discord.Message, embed_data: parsing.ParsedMessage,
                                               user: Optional[discord.User],
                                               user_settings: Optional[users.User]) -> bool:
     """Create reminder for some command when triggering a command cooldown.
@@ -43,24 +53,24 @@ async def create_reminder_on_command_cooldown(message: discord.Message, embed_da
     search_strings = [
         'you can use this command again in', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         interaction = await functions.get_interaction(message)
         if interaction is not None:
             user_command = interaction.name
         else:
-            user_command_message = (
-                await messages.find_message(message.channel.id, user_name=embed_data['author']['name'])
-            )
+            user_command_message = embed_data['command_message']
             if user_command_message is None: return add_reaction
-            if user is None: user = user_command_message.author
-            user_command = user_command_message.content    
+            if user is None:
+                user = embed_data['command_user']
+                user_settings = embed_data['command_user_settings']
+            user_command = user_command_message.content
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled: return add_reaction
-        timestring_match = re.search(r'in \*\*`(.+?)`\*\*$', embed_data['title'].lower())
+        timestring_match = re.search(r'in \*\*`(.+?)`\*\*$', embed_data.lower('title'))
         if (re.search(regex.COMMAND_CLEAN, user_command.lower() or user_command == 'clean')
             and user_settings.reminder_clean.enabled):
             activity = 'clean'
@@ -99,7 +109,8 @@ async def create_reminder_on_command_cooldown(message: discord.Message, embed_da
     return add_reaction
 
 
-async def update_reminders_in_cooldown_list(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
+async def update_reminders_in_cooldown_list(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                            interaction_user: Optional[discord.User],
                                            user_settings: Optional[users.User]) -> bool:
     """Creates reminders or deletes them for all commands in the cooldown list
 
@@ -112,16 +123,15 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
     search_strings = [
         '\'s cooldowns', #English
     ]
-    if any(search_string in embed_data['author']['name'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('author.name') for search_string in search_strings):
         if embed_data['embed_user'] is not None and interaction_user is not None:
             if interaction_user != embed_data['embed_user'] != interaction_user:
                 return add_reaction
         embed_users = []
         if interaction_user is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_COOLDOWNS)
-            )
-            interaction_user = user_command_message.author
+            interaction_user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if interaction_user is None: return add_reaction
         if embed_data['embed_user'] is None:
             user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
             if user_id_match:
@@ -141,14 +151,14 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled: return add_reaction
-        embed_field_commands = unicodedata.normalize('NFKD', embed_data['field0']['value'])
-        embed_field_quests = unicodedata.normalize('NFKD', embed_data['field1']['value'])
-        embed_field_raid = unicodedata.normalize('NFKD', embed_data['field2']['value'])
-        embed_field_tool = unicodedata.normalize('NFKD', embed_data['field3']['value'])
+        embed_field_commands = embed_data.nfkd('field0.value')
+        embed_field_quests = embed_data.nfkd('field1.value')
+        embed_field_raid = embed_data.nfkd('field2.value')
+        embed_field_tool = embed_data.nfkd('field3.value')
         cooldowns = []
         ready_commands = []
         if user_settings.reminder_clean.enabled:
-            timestring_match = re.search(r"clean\*\* • \*\*`(.+?)`\*\*", embed_field_commands.lower())
+            timestring_match = re.search(r"clean\*\* • \*\*`(.+?)`\*\*", embed_field_commands)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'clean')
                 reminder_message = user_settings.reminder_clean.message.replace('{command}', user_command)
@@ -156,7 +166,7 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('clean')
         if user_settings.reminder_fusion.enabled:
-            timestring_match = re.search(r"fusion\*\* • \*\*`(.+?)`\*\*", embed_field_commands.lower())
+            timestring_match = re.search(r"fusion\*\* • \*\*`(.+?)`\*\*", embed_field_commands)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'fusion')
                 reminder_message = user_settings.reminder_fusion.message.replace('{command}', user_command)
@@ -164,7 +174,7 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('fusion')
         if user_settings.reminder_daily.enabled:
-            timestring_match = re.search(r"daily\*\* • \*\*`(.+?)`\*\*", embed_field_commands.lower())
+            timestring_match = re.search(r"daily\*\* • \*\*`(.+?)`\*\*", embed_field_commands)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'daily')
                 reminder_message = user_settings.reminder_daily.message.replace('{command}', user_command)
@@ -172,7 +182,7 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('daily')
         if user_settings.reminder_hive_energy.enabled:
-            timestring_match = re.search(r"energy\*\* • \*\*`(.+?)`\*\*", embed_field_raid.lower())
+            timestring_match = re.search(r"energy\*\* • \*\*`(.+?)`\*\*", embed_field_raid)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'hive claim energy')
                 reminder_message = user_settings.reminder_hive_energy.message.replace('{command}', user_command)
@@ -180,7 +190,7 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('hive-energy')
         if user_settings.reminder_prune.enabled:
-            timestring_match = re.search(r"prune\*\* • \*\*`(.+?)`\*\*", embed_field_commands.lower())
+            timestring_match = re.search(r"prune\*\* • \*\*`(.+?)`\*\*", embed_field_commands)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'prune')
                 pruner_emoji = getattr(emojis, f'PRUNER_{user_settings.pruner_type.upper()}', '')
@@ -194,9 +204,9 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('prune')
         if user_settings.reminder_quests.enabled:
-            timestring_daily_match = re.search(r"daily\*\* • \*\*`(.+?)`\*\*", embed_field_quests.lower())
-            timestring_weekly_match = re.search(r"weekly\*\* • \*\*`(.+?)`\*\*", embed_field_quests.lower())
-            timestring_monthly_match = re.search(r"monthly\*\* • \*\*`(.+?)`\*\*", embed_field_quests.lower())
+            timestring_daily_match = re.search(r"daily\*\* • \*\*`(.+?)`\*\*", embed_field_quests)
+            timestring_weekly_match = re.search(r"weekly\*\* • \*\*`(.+?)`\*\*", embed_field_quests)
+            timestring_monthly_match = re.search(r"monthly\*\* • \*\*`(.+?)`\*\*", embed_field_quests)
             user_command = await functions.get_game_command(user_settings, 'quests')
             if timestring_daily_match:
                 reminder_message = (
@@ -226,7 +236,7 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('quest-monthly')
         if user_settings.reminder_research.enabled:
-            timestring_match = re.search(r"researching: \*\*`(.+?)`\*\* remaining", embed_field_tool.lower())
+            timestring_match = re.search(r"researching: \*\*`(.+?)`\*\* remaining", embed_field_tool)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'laboratory')
                 reminder_message = user_settings.reminder_research.message.replace('{command}', user_command)
@@ -234,7 +244,7 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('research')
         if user_settings.reminder_upgrade.enabled:
-            timestring_match = re.search(r"upgrading: \*\*`(.+?)`\*\* remaining", embed_field_tool.lower())
+            timestring_match = re.search(r"upgrading: \*\*`(.+?)`\*\* remaining", embed_field_tool)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'tool')
                 reminder_message = user_settings.reminder_upgrade.message.replace('{command}', user_command)
@@ -242,7 +252,7 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('upgrade')
         if user_settings.reminder_vote.enabled:
-            timestring_match = re.search(r"vote\*\* • \*\*`(.+?)`\*\*", embed_field_commands.lower())
+            timestring_match = re.search(r"vote\*\* • \*\*`(.+?)`\*\*", embed_field_commands)
             if timestring_match:
                 user_command = await functions.get_game_command(user_settings, 'vote')
                 reminder_message = user_settings.reminder_vote.message.replace('{command}', user_command)
@@ -250,16 +260,15 @@ async def update_reminders_in_cooldown_list(message: discord.Message, embed_data
             else:
                 ready_commands.append('vote')
 
+        reminder_items = []
         for cooldown in cooldowns:
             cd_activity = cooldown[0]
             cd_timestring = cooldown[1]
             cd_message = cooldown[2]
             time_left = await functions.parse_timestring_to_timedelta(cd_timestring)
             if time_left <= timedelta(seconds=1): continue
-            reminder: reminders.Reminder = (
-                await reminders.insert_reminder(interaction_user.id, cd_activity, time_left,
-                                                message.channel.id, cd_message)
-            )
+            reminder_items.append((cd_activity, time_left, cd_message))
+        await reminders.upsert_reminders(interaction_user.id, message.channel.id, reminder_items)
         for activity in ready_commands:
             try:
                 reminder: reminders.Reminder = await reminders.get_reminder(interaction_user.id, activity)
@@ -1,16 +1,24 @@
 # daily.py
 
 from datetime import timedelta
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import reminders, users
-from resources import exceptions, functions, regex
+from resources import correlation, exceptions, functions, parsing, regex
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'daily rewards', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'daily rewards', regex.COMMAND_DAILY, correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all daily related actions.
 
@@ -24,7 +32,7 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def create_reminder(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def create_reminder(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Create a reminder on /daily
 
@@ -37,17 +45,11 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
     search_strings = [
         'daily rewards', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_DAILY,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -2,16 +2,25 @@
 
 from datetime import timedelta
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import reminders, users
-from resources import emojis, exceptions, functions, regex
+from resources import correlation, emojis, exceptions, functions, outbound, parsing, regex
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'fusion results', #English
+)
+
+COMMANDS = (
+    correlation.Command('field0.name', 'fusion results', regex.COMMAND_FUSION,
+                        correlation.user_name_from_fusion_results, author_icon=False),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all fusion related actions.
 
@@ -25,8 +34,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def create_reminder(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
-                          user_settings: Optional[users.User]) -> bool:
+async def create_reminder(message: discord.Message, embed_data: parsing.ParsedMessage,
+                          interaction_user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Creates a reminder on /fusion
 
     Returns
@@ -38,22 +47,19 @@ async def create_reminder(message: discord.Message, embed_data: Dict, interactio
     search_strings = [
         'fusion results', #English
     ]
-    if any(search_string in embed_data['field0']['name'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('field0.name') for search_string in search_strings):
         user1 = interaction_user
         user1_settings = user_settings
         user2 = user2_settings = None
         fusion_users = embed_data['field0']['value'].split('\n')
-        regex_user_name = re.compile(r"> \*\*(.+?)\*\*(?:'s| got)")
-        user1_name_match = re.search(regex_user_name, fusion_users[0])
-        user2_name_match = re.search(regex_user_name, fusion_users[1])
+        user2_name_match = re.search(regex.NAME_FROM_FUSION_RESULTS, fusion_users[1])
         if user1 is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_FUSION,
-                                            user_name=user1_name_match.group(1))
-            )
-            user1 = user_command_message.author
-            if user_command_message.mentions:
-                user2 = user_command_message.mentions[0]
+            user1 = embed_data['command_user']
+            user1_settings = embed_data['command_user_settings']
+            if user1 is None: return add_reaction
+            command_mentions = await embed_data['command_message'].get_mentions(message.guild)
+            if command_mentions:
+                user2 = command_mentions[0]
         if user2 is None:
             guild_members = await functions.get_guild_member_by_name(message.guild, user2_name_match.group(1))
             if len(guild_members) == 1:
@@ -91,6 +97,6 @@ async def create_reminder(message: discord.Message, embed_data: Dict, interactio
                 )
                 if user2_settings.reactions_enabled and reminder.record_exists: add_reaction = True
 
-        if add_reaction and '** got a level **' in embed_data['field0']['value'].lower():
-            await message.add_reaction(emojis.PAN_HAPPY)
+        if add_reaction and '** got a level **' in embed_data.lower('field0.value'):
+            await outbound.add_reaction(message, emojis.PAN_HAPPY)
     return add_reaction
\ No newline at end of file
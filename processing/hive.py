@@ -1,16 +1,24 @@
 # hive.py
 
 from datetime import timedelta
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import reminders, users
-from resources import exceptions, functions, regex, strings
+from resources import correlation, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'you have claimed', #English
+)
+
+COMMANDS = (
+    correlation.Command('content', 'you have claimed', regex.COMMAND_HIVE, None, author_icon=False),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all hive related actions.
 
@@ -24,7 +32,7 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def create_reminder(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def create_reminder(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Creates a reminder on /hive claim-energy
 
@@ -37,13 +45,12 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
     search_strings = [
         'you have claimed', #English
     ]
-    if (any(search_string in message.content.lower() for search_string in search_strings)
-        and 'energy' in message.content.lower()):
+    if (any(search_string in embed_data.lower('content') for search_string in search_strings)
+        and 'energy' in embed_data.lower('content')):
         if user is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_HIVE)
-            )
-            user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -61,5 +68,5 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
         if user_settings.reactions_enabled and reminder.record_exists:
             add_reaction = True
         if user_settings.helper_context_enabled:
-            await message.reply(f"➜ {strings.SLASH_COMMANDS['raid']}")
+            await outbound.reply(message, f"➜ {strings.SLASH_COMMANDS['raid']}")
     return add_reaction
\ No newline at end of file
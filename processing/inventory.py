@@ -2,17 +2,25 @@
 
 import asyncio
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from content import rebirth
 from database import users
-from resources import exceptions, functions, regex
+from resources import correlation, exceptions, functions, parsing, regex
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    '\'s inventory', #English
+)
+
+COMMANDS = (
+    correlation.Command('author.name', '\'s inventory', regex.COMMAND_INVENTORY, None, author_icon=False),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                            user_settings: Optional[users.User]) -> bool:
     """Processes the message for all clean related actions.
 
@@ -26,8 +34,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def call_rebirth_guide(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
-                             user_settings: Optional[users.User]) -> bool:
+async def call_rebirth_guide(message: discord.Message, embed_data: parsing.ParsedMessage,
+                             interaction_user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Calls the rebirth guide if necessary
 
     Returns
@@ -39,16 +47,15 @@ async def call_rebirth_guide(message: discord.Message, embed_data: Dict, interac
     search_strings = [
         '\'s inventory', #English
     ]
-    if any(search_string in embed_data['author']['name'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('author.name') for search_string in search_strings):
         if embed_data['embed_user'] is not None and interaction_user is not None:
             if interaction_user != embed_data['embed_user']:
                 return add_reaction
         embed_users = []
-        user_command_message = (
-            await messages.find_message(message.channel.id, regex.COMMAND_INVENTORY)
-        )
-        if interaction_user is None:
-            interaction_user = user_command_message.author
+        user_command_message = embed_data['command_message']
+        if user_command_message is None: return add_reaction
+        interaction_user = embed_data['command_user']
+        user_settings = embed_data['command_user_settings']
         if embed_data['embed_user'] is None:
             user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
             if user_id_match:
@@ -59,7 +66,7 @@ async def call_rebirth_guide(message: discord.Message, embed_data: Dict, interac
         else:
             embed_users.append(embed_data['embed_user'])
         if interaction_user not in embed_users: return add_reaction
-        rebirth_guide_match = re.search(regex.COMMAND_REBIRTH_GUIDE, user_command_message.content.lower())
+        rebirth_guide_match = re.search(regex.COMMAND_REBIRTH_GUIDE, user_command_message.content)
         if not rebirth_guide_match:
             return add_reaction
         if user_settings is None:
@@ -2,17 +2,36 @@
 
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
-from cache import messages
 from database import errors, reminders, users
-from resources import exceptions, functions, regex, strings
+from resources import correlation, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'research ended!', #English
+    'you have started a research', #English
+    'researching: tier', #English
+    'you have been refund', #English
+    'you have skipped the research', #English
+    'laboratory', #English
+)
+
+COMMANDS = (
+    correlation.Command('description', 'research ended!', regex.COMMAND_LABORATORY, correlation.user_name_from_author),
+    correlation.Command('description', 'you have started a research', regex.COMMAND_LABORATORY,
+                        correlation.user_name_from_description_start),
+    correlation.Command('field0.name', 'researching: tier', regex.COMMAND_LABORATORY, None, author_icon=False),
+    correlation.Command('description', 'you have skipped the research', regex.COMMAND_LABORATORY,
+                        correlation.user_name_from_description_address),
+    correlation.Command('description', 'laboratory', regex.COMMAND_LABORATORY, None, author_icon=False),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all laboratory related actions.
 
@@ -31,7 +50,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def call_context_helper_on_research_claim(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def call_context_helper_on_research_claim(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                                user: Optional[discord.User],
                                               user_settings: Optional[users.User]) -> bool:
     """Call the context helper after claiming a research
 
@@ -44,29 +64,23 @@ async def call_context_helper_on_research_claim(message: discord.Message, embed_
     search_strings = [
         'research ended!', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_LABORATORY,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_context_enabled: return add_reaction
-        await message.reply(f"➜ {strings.SLASH_COMMANDS['tool']}")
+        await outbound.reply(message, f"➜ {strings.SLASH_COMMANDS['tool']}")
     return add_reaction
 
 
-async def create_reminder_on_start(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                   user_settings: Optional[users.User]) -> bool:
+async def create_reminder_on_start(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                   user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Creates a reminder when starting a research.
 
     Returns
@@ -78,18 +92,11 @@ async def create_reminder_on_start(message: discord.Message, embed_data: Dict, u
     search_strings = [
         'you have started a research', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name_match = re.search(regex.NAME_FROM_MESSAGE_START, embed_data['description'])
-                user_name = user_name_match.group(1)
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_LABORATORY, user_name=user_name)
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -111,7 +118,8 @@ async def create_reminder_on_start(message: discord.Message, embed_data: Dict, u
     return add_reaction
 
 
-async def create_reminder_when_active(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
+async def create_reminder_when_active(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                      interaction_user: Optional[discord.User],
                                       user_settings: Optional[users.User]) -> bool:
     """Creates a reminder for an active research.
 
@@ -124,16 +132,15 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
     search_strings = [
         'researching: tier', #English
     ]
-    if any(search_string in embed_data['field0']['name'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('field0.name') for search_string in search_strings):
         if embed_data['embed_user'] is not None and interaction_user is not None:
             if interaction_user != embed_data['embed_user'] != interaction_user:
                 return add_reaction
         embed_users = []
         if interaction_user is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_LABORATORY)
-            )
-            interaction_user = user_command_message.author
+            interaction_user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if interaction_user is None: return add_reaction
         if embed_data['embed_user'] is None:
             user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
             if user_id_match:
@@ -151,7 +158,7 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.reminder_research.enabled: return add_reaction
         user_command = await functions.get_game_command(user_settings, 'laboratory')
-        research_end_match = re.search(r'<t:(\d+?):f>', embed_data['field0']['value'].lower())
+        research_end_match = re.search(r'<t:(\d+?):f>', embed_data.lower('field0.value'))
         end_time = datetime.fromtimestamp(int(research_end_match.group(1)), timezone.utc).replace(microsecond=0)
         current_time = utils.utcnow().replace(microsecond=0)
         time_left = end_time - current_time
@@ -165,8 +172,8 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
     return add_reaction
 
 
-async def delete_reminder_on_cancel(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                    user_settings: Optional[users.User]) -> bool:
+async def delete_reminder_on_cancel(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                    user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Deletes a reminder when canceling a research.
 
     Returns
@@ -178,8 +185,8 @@ async def delete_reminder_on_cancel(message: discord.Message, embed_data: Dict,
     search_strings = [
         'you have been refund', #English
     ]
-    if (any(search_string in embed_data['description'].lower() for search_string in search_strings)
-        and 'nugget' in embed_data['description'].lower()):
+    if (any(search_string in embed_data.lower('description') for search_string in search_strings)
+        and 'nugget' in embed_data.lower('description')):
         if user is None: user = message.mentions[0]
         if user_settings is None:
             try:
@@ -196,8 +203,8 @@ async def delete_reminder_on_cancel(message: discord.Message, embed_data: Dict,
     return add_reaction
 
 
-async def delete_reminder_on_skip(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                  user_settings: Optional[users.User]) -> bool:
+async def delete_reminder_on_skip(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                  user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Deletes a reminder when skipping a research.
 
     Returns
@@ -209,18 +216,11 @@ async def delete_reminder_on_skip(message: discord.Message, embed_data: Dict, us
     search_strings = [
         'you have skipped the research', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name_match = re.search(r"^\*\*(.+?)\*\*, ", embed_data['description'])
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_LABORATORY,
-                                                user_name=user_name_match.group(1))
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -236,8 +236,8 @@ async def delete_reminder_on_skip(message: discord.Message, embed_data: Dict, us
     return add_reaction
 
 
-async def store_research_time(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
-                              user_settings: Optional[users.User]) -> bool:
+async def store_research_time(message: discord.Message, embed_data: parsing.ParsedMessage,
+                              interaction_user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Extracts and stores the time required for the next research.
 
     Returns
@@ -250,10 +250,9 @@ async def store_research_time(message: discord.Message, embed_data: Dict, intera
                 return False
         embed_users = []
         if interaction_user is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_LABORATORY)
-            )
-            interaction_user = user_command_message.author
+            interaction_user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if interaction_user is None: return False
         if embed_data['embed_user'] is None:
             user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
             if user_id_match:
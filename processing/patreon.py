@@ -1,15 +1,23 @@
 # patreon.py
 
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import users
-from resources import exceptions, regex, strings
+from resources import correlation, exceptions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'patreon and donations', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'patreon and donations', regex.COMMAND_PATREON, correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all /use related actions.
 
@@ -23,8 +31,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def update_donor_tier_on_patreon(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                       user_settings: Optional[users.User]) -> bool:
+async def update_donor_tier_on_patreon(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                       user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Update donor tier when opening the patreon message.
 
     Returns
@@ -36,17 +44,11 @@ async def update_donor_tier_on_patreon(message: discord.Message, embed_data: Dic
     search_strings = [
         'patreon and donations', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_PATREON,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -56,13 +58,14 @@ async def update_donor_tier_on_patreon(message: discord.Message, embed_data: Dic
         donor_tier = 0
         donor_tier_name = 'Non-donator'
         for index, name in enumerate(list(strings.DONOR_TIERS_EMOJIS.keys())):
-            if name.lower() in embed_data['field0']['name'].lower():
+            if name.lower() in embed_data.lower('field0.name'):
                 donor_tier = index
                 donor_tier_name = name
                 break
         if user_settings.donor_tier != donor_tier:
             await user_settings.update(donor_tier=donor_tier)
-            await message.reply(
+            await outbound.reply(
+                message,
                 f'Bzzt! I changed your donor tier setting to '
                 f'{strings.DONOR_TIERS_EMOJIS[donor_tier_name]} `{donor_tier_name}`!'
             )
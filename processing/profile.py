@@ -2,17 +2,25 @@
 
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
-from cache import messages
 from database import errors, reminders, users
-from resources import emojis, exceptions, functions, regex, strings
+from resources import correlation, emojis, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    '\'s tree', #English
+)
+
+COMMANDS = (
+    correlation.Command('author.name', '\'s tree', regex.COMMAND_PROFILE_STATS, None, author_icon=False),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all profile or stats related actions.
 
@@ -27,7 +35,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
 
 
 
-async def create_reminders_from_stats(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
+async def create_reminders_from_stats(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                      interaction_user: Optional[discord.User],
                                    user_settings: Optional[users.User]) -> bool:
     """Creates research and upgrade remindesr from "tree stats"
 
@@ -42,16 +51,15 @@ async def create_reminders_from_stats(message: discord.Message, embed_data: Dict
     search_strings = [
         '\'s tree', #English
     ]
-    if any(search_string in embed_data['author']['name'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('author.name') for search_string in search_strings):
         if embed_data['embed_user'] is not None and interaction_user is not None:
             if interaction_user != embed_data['embed_user']:
                 return add_reaction
         embed_users = []
         if interaction_user is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_PROFILE_STATS)
-            )
-            interaction_user = user_command_message.author
+            interaction_user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if interaction_user is None: return add_reaction
         if embed_data['embed_user'] is None:
             user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
             if user_id_match:
@@ -126,8 +134,8 @@ async def create_reminders_from_stats(message: discord.Message, embed_data: Dict
         await user_settings.update(level=level, rebirth=rebirth, xp=xp, xp_target=xp_target)
 
         # Sweet apple boost
-        if 'boost active' in embed_data['description'].lower():
-            boost_end_match = re.search(r'<t:(\d+?):r>', embed_data['description'].lower())
+        if 'boost active' in embed_data.lower('description'):
+            boost_end_match = re.search(r'<t:(\d+?):r>', embed_data.lower('description'))
             activity = 'sweet-apple'
             if boost_end_match:
                 end_time = datetime.fromtimestamp(int(boost_end_match.group(1)), timezone.utc).replace(microsecond=0)
@@ -145,7 +153,7 @@ async def create_reminders_from_stats(message: discord.Message, embed_data: Dict
         # Research & Upgrade cooldowns
         if embed_data['field3']['value'] != '':
             if user_settings.reminder_research.enabled:
-                timestring_match = re.search(r"researching: `(.+?)` remaining", embed_data['field3']['value'].lower())
+                timestring_match = re.search(r"researching: `(.+?)` remaining", embed_data.lower('field3.value'))
                 if timestring_match:
                     user_command = await functions.get_game_command(user_settings, 'laboratory')
                     reminder_message = user_settings.reminder_research.message.replace('{command}', user_command)
@@ -155,7 +163,7 @@ async def create_reminders_from_stats(message: discord.Message, embed_data: Dict
                 else:
                     ready_commands.append('research')
             if user_settings.reminder_upgrade.enabled:
-                timestring_match = re.search(r"upgrading: `(.+?)` remaining", embed_data['field3']['value'].lower())
+                timestring_match = re.search(r"upgrading: `(.+?)` remaining", embed_data.lower('field3.value'))
                 if timestring_match:
                     user_command = await functions.get_game_command(user_settings, 'tool')
                     reminder_message = user_settings.reminder_upgrade.message.replace('{command}', user_command)
@@ -165,6 +173,7 @@ async def create_reminders_from_stats(message: discord.Message, embed_data: Dict
                 else:
                     ready_commands.append('upgrade')
 
+        reminder_items = []
         for cooldown in cooldowns:
             cd_activity = cooldown[0]
             cd_time_left = cooldown[1]
@@ -177,12 +186,12 @@ async def create_reminders_from_stats(message: discord.Message, embed_data: Dict
                         await user_settings.update(xp_gain_average=0)
                 except exceptions.NoDataFoundError:
                     await user_settings.update(xp_gain_average=0)
-            reminder: reminders.Reminder = (
-                await reminders.insert_reminder(interaction_user.id, cd_activity, cd_time_left,
-                                                message.channel.id, cd_message)
-            )
-            if not reminder.record_exists:
-                await message.channel.send(strings.MSG_ERROR)
+            reminder_items.append((cd_activity, cd_time_left, cd_message))
+        if reminder_items:
+            updated_reminders = await reminders.upsert_reminders(interaction_user.id, message.channel.id,
+                                                                 reminder_items)
+            if len(updated_reminders) < len(set(item[0] for item in reminder_items)):
+                await outbound.send(message.channel, strings.MSG_ERROR)
                 return add_reaction
             updated_reminder = True
         for activity in ready_commands:
@@ -4,17 +4,26 @@ from datetime import timedelta
 from math import ceil, floor
 import random
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
-from cache import messages
 from database import reminders, tracking, users
-from resources import emojis, exceptions, functions, regex, strings
+from resources import correlation, emojis, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'you have pruned your tree', #English
+)
+
+COMMANDS = (
+    correlation.Command('content', 'you have pruned your tree', regex.COMMAND_PRUNE,
+                        correlation.user_name_from_content_start),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all prune related actions.
 
@@ -28,7 +37,7 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def create_reminder(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def create_reminder(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Creates a reminder when using /prune. Also adds an entry to the tracking log and updates the pruner type.
 
@@ -41,18 +50,11 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
     search_strings = [
         'you have pruned your tree', #English
     ]
-    if any(search_string in message.content.lower() for search_string in search_strings) and not message.embeds:
+    if any(search_string in embed_data.lower('content') for search_string in search_strings) and not message.embeds:
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name_match = re.search(regex.NAME_FROM_MESSAGE_START, message.content)
-                user_name = user_name_match.group(1)
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_PRUNE, user_name=user_name)
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -63,11 +65,11 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
             current_time = utils.utcnow().replace(microsecond=0)
             await tracking.insert_log_entry(user.id, message.guild.id, 'prune', current_time)
             league_beta = None
-            nugget_wooden_match = re.search(r'woodennugget:\d+>\s*\*\*(.+?)\*\*', message.content.lower())
-            nugget_copper_match = re.search(r'coppernugget:\d+>\s*\*\*(.+?)\*\*', message.content.lower())
-            nugget_silver_match = re.search(r'silvernugget:\d+>\s*\*\*(.+?)\*\*', message.content.lower())
-            nugget_golden_match = re.search(r'goldennugget:\d+>\s*\*\*(.+?)\*\*', message.content.lower())
-            nugget_diamond_match = re.search(r'diamondnugget:\d+>\s*\*\*(.+?)\*\*', message.content.lower())
+            nugget_wooden_match = re.search(r'woodennugget:\d+>\s*\*\*(.+?)\*\*', embed_data.lower('content'))
+            nugget_copper_match = re.search(r'coppernugget:\d+>\s*\*\*(.+?)\*\*', embed_data.lower('content'))
+            nugget_silver_match = re.search(r'silvernugget:\d+>\s*\*\*(.+?)\*\*', embed_data.lower('content'))
+            nugget_golden_match = re.search(r'goldennugget:\d+>\s*\*\*(.+?)\*\*', embed_data.lower('content'))
+            nugget_diamond_match = re.search(r'diamondnugget:\d+>\s*\*\*(.+?)\*\*', embed_data.lower('content'))
             if nugget_wooden_match:
                 nugget_wooden_amount = int(re.sub('\D', '', nugget_wooden_match.group(1)))
                 league_beta = True if nugget_wooden_amount > 1 else False
@@ -115,11 +117,11 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
             )
         if user_settings.reactions_enabled:
             if reminder.record_exists: add_reaction = True
-            if 'goldennugget' in message.content.lower() or 'diamondnugget' in message.content.lower():
-                await message.add_reaction(emojis.PAN_WOOHOO)
+            if 'goldennugget' in embed_data.lower('content') or 'diamondnugget' in embed_data.lower('content'):
+                await outbound.add_reaction(message, emojis.PAN_WOOHOO)
         message_content = embed = None
         if user_settings.level > 0 and user_settings.xp_target > 0:
-            xp_gain_match = re.search(r'got \*\*(.+?)\*\* <', message.content.lower())
+            xp_gain_match = re.search(r'got \*\*(.+?)\*\* <', embed_data.lower('content'))
             xp_gain = int(re.sub('\D', '', xp_gain_match.group(1)))
             if user_settings.league_beta: xp_gain = ceil(xp_gain * 1.33)
             if user_settings.xp_gain_average > 0:
@@ -202,5 +204,5 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
                     footer = f'{footer} • Ready for rebirth'
                 embed.set_footer(text = footer)
             if embed is not None or message_content is not None:
-                await message.channel.send(content=message_content, embed=embed)
+                await outbound.send(message.channel, content=message_content, embed=embed)
     return add_reaction
\ No newline at end of file
@@ -2,17 +2,30 @@
 
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
-from cache import messages
 from database import errors, reminders, users
-from resources import exceptions, functions, regex
+from resources import correlation, exceptions, functions, parsing, regex
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'tree quests', #English
+    'quest started!', #English
+    '\'s quest', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'tree quests', regex.COMMAND_QUESTS, correlation.user_name_from_author),
+    correlation.Command('title', 'quest started!', regex.COMMAND_QUESTS,
+                        correlation.user_name_from_description_address),
+    correlation.Command('author.name', '\'s quest', regex.COMMAND_QUESTS, correlation.user_name_from_author_possessive),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all quest related actions.
 
@@ -28,8 +41,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def create_reminder_on_overview(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                      user_settings: Optional[users.User]) -> bool:
+async def create_reminder_on_overview(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                      user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Creates a reminder when using /quests with no quest active.
 
     Returns
@@ -41,17 +54,11 @@ async def create_reminder_on_overview(message: discord.Message, embed_data: Dict
     search_strings = [
         'tree quests', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_QUESTS,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -60,6 +67,7 @@ async def create_reminder_on_overview(message: discord.Message, embed_data: Dict
         if not user_settings.bot_enabled or not user_settings.reminder_quests.enabled: return add_reaction
         user_command = await functions.get_game_command(user_settings, 'quests')
         regex_quest = re.compile(r'^(.+?) \| (.+?)$')
+        reminder_items = []
         for button in message.components[0].children:
             quest_match = re.search(regex_quest, button.label)
             if not quest_match: continue
@@ -72,16 +80,14 @@ async def create_reminder_on_overview(message: discord.Message, embed_data: Dict
             )
             time_left = await functions.parse_timestring_to_timedelta(quest_match.group(2).lower())
             if time_left < timedelta(0): continue
-            reminder: reminders.Reminder = (
-                await reminders.insert_reminder(user.id, activity, time_left,
-                                                message.channel.id, reminder_message)
-            )
-            if user_settings.reactions_enabled and reminder.record_exists: add_reaction = True
+            reminder_items.append((activity, time_left, reminder_message))
+        updated_reminders = await reminders.upsert_reminders(user.id, message.channel.id, reminder_items)
+        if user_settings.reactions_enabled and updated_reminders: add_reaction = True
     return add_reaction
 
 
-async def create_reminder_on_start(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                   user_settings: Optional[users.User]) -> bool:
+async def create_reminder_on_start(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                   user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Creates a reminder when starting a quest
 
     Returns
@@ -93,19 +99,11 @@ async def create_reminder_on_start(message: discord.Message, embed_data: Dict, u
     search_strings = [
         'quest started!', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name_match = re.search(r"^\*\*(.+?)\*\*, ", embed_data['description'])
-                user_name = user_name_match.group(1)
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_QUESTS,
-                                                user_name=user_name)
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -113,7 +111,7 @@ async def create_reminder_on_start(message: discord.Message, embed_data: Dict, u
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.reminder_quests.enabled: return add_reaction
         user_command = await functions.get_game_command(user_settings, 'quests')
-        quest_type_match = re.search(r'the (.+?) quest', embed_data['description'].lower())
+        quest_type_match = re.search(r'the (.+?) quest', embed_data.lower('description'))
         quest_type = quest_type_match.group(1).lower()
         activity = f'quest-{quest_type}'
         time_left = await functions.calculate_time_left_from_cooldown(message, user_settings, activity)
@@ -130,8 +128,8 @@ async def create_reminder_on_start(message: discord.Message, embed_data: Dict, u
     return add_reaction
 
 
-async def create_reminder_when_active(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                      user_settings: Optional[users.User]) -> bool:
+async def create_reminder_when_active(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                      user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Creates a reminder when using /quests with an active quest.
 
     Returns
@@ -143,19 +141,11 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
     search_strings = [
         '\'s quest', #English
     ]
-    if any(search_string in embed_data['author']['name'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('author.name') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name_match = re.search(regex.USERNAME_FROM_EMBED_AUTHOR, embed_data['author']['name'])
-                user_name = user_name_match.group(1)
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_QUESTS,
-                                                user_name=user_name)
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -163,16 +153,13 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.reminder_quests.enabled: return add_reaction
         user_command = await functions.get_game_command(user_settings, 'quests')
-        quest_type_match = re.search(r'> (.+?) quest', embed_data['description'].lower())
+        quest_type_match = re.search(r'> (.+?) quest', embed_data.lower('description'))
         quest_start_field = ''
-        for value in embed_data.values():
-            if isinstance(value, dict):
-                try:
-                    if '<t:' in value['value']:
-                        quest_start_field = value['value']
-                        break
-                except KeyError:
-                    continue
+        for field_no in range(6):
+            field_value = embed_data.get(f'field{field_no}.value')
+            if '<t:' in field_value:
+                quest_start_field = field_value
+                break
         quest_start_match = re.search(r'<t:(\d+?):d>', quest_start_field.lower())
         quest_type = quest_type_match.group(1).lower()
         activity = f'quest-{quest_type}'
@@ -1,16 +1,26 @@
 # raid.py
 
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import users
-from resources import exceptions, regex, strings
+from resources import correlation, exceptions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'raid successful!', #English
+    'raid failed!', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'raid successful!', regex.COMMAND_RAID, correlation.user_name_from_author),
+    correlation.Command('title', 'raid failed!', regex.COMMAND_RAID, correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all raid related actions.
 
@@ -24,7 +34,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def call_context_helper_on_raid_rewards(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def call_context_helper_on_raid_rewards(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                              user: Optional[discord.User],
                                               user_settings: Optional[users.User]) -> bool:
     """Call the context helper for a chest reward from raid
 
@@ -38,18 +49,11 @@ async def call_context_helper_on_raid_rewards(message: discord.Message, embed_da
         'raid successful!', #English
         'raid failed!', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings_title):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings_title):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name = embed_data['author']['name']
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_RAID, user_name=user_name)
-                )
-                if user_command_message is None: return add_reaction
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -57,7 +61,7 @@ async def call_context_helper_on_raid_rewards(message: discord.Message, embed_da
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_context_enabled: return add_reaction
         answer = f"➜ {strings.SLASH_COMMANDS['raid']}"
-        if 'chest' in embed_data['field0']['value'].lower():
+        if 'chest' in embed_data.lower('field0.value'):
             answer = f"➜ {strings.SLASH_COMMANDS['chests']}\n{answer}"
-        await message.reply(answer)
+        await outbound.reply(message, answer)
     return add_reaction
\ No newline at end of file
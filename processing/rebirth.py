@@ -1,15 +1,25 @@
 # rebirth.py
 
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import users
-from resources import exceptions, regex, strings
+from resources import correlation, exceptions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'are you sure you want to rebirth?', #English
+    'the rebirth has been canceled!', #English
+)
+
+COMMANDS = (
+    correlation.Command('description', 'are you sure you want to rebirth?', regex.COMMAND_REBIRTH,
+                        correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all rebirth related actions.
 
@@ -24,8 +34,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def update_rebirth_on_summary(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                          user_settings: Optional[users.User]) -> bool:
+async def update_rebirth_on_summary(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                    user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Increase rebirth count on rebirth summary message
 
     Returns
@@ -37,17 +47,11 @@ async def update_rebirth_on_summary(message: discord.Message, embed_data: Dict,
     search_strings = [
         'are you sure you want to rebirth?', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_REBIRTH,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -56,14 +60,15 @@ async def update_rebirth_on_summary(message: discord.Message, embed_data: Dict,
         if not user_settings.bot_enabled and not user_settings.helper_prune_enabled: return add_reaction
         await user_settings.update(rebirth=user_settings.rebirth + 1, 
                                    xp_prune_count=0)
-        await message.reply(
+        await outbound.reply(
+            message,
             f'➜ Use {strings.SLASH_COMMANDS["profile"]} to to start XP tracking after rebirthing!'
         )
     return add_reaction
 
 
-async def update_rebirth_on_cancel(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                          user_settings: Optional[users.User]) -> bool:
+async def update_rebirth_on_cancel(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                   user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Decrease rebirth count on rebirth cancel message
 
     Returns
@@ -75,7 +80,7 @@ async def update_rebirth_on_cancel(message: discord.Message, embed_data: Dict, u
     search_strings = [
         'the rebirth has been canceled!', #English
     ]
-    if any(search_string in message.content.lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('content') for search_string in search_strings):
         if user is None:
             user = message.mentions[0]
         if user_settings is None:
@@ -2,17 +2,25 @@
 
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
-from cache import messages
 from database import reminders, users
-from resources import exceptions, functions, regex, strings
+from resources import correlation, exceptions, functions, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'boost activated!', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'boost activated!', regex.COMMAND_SHOP, correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all /shop related actions.
 
@@ -26,8 +34,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def create_reminder_on_buying_boost(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                         user_settings: Optional[users.User]) -> bool:
+async def create_reminder_on_buying_boost(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                          user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Create a reminder when a boost is bought.
 
     Returns
@@ -39,34 +47,26 @@ async def create_reminder_on_buying_boost(message: discord.Message, embed_data:
     search_strings = [
         'boost activated!', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_SHOP,
-                                                user_name=embed_data['author']['name'])
-                )
-                if user_command_message is not None:
-                    user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None:
+                embed_users = await functions.get_guild_member_by_name(message.guild, embed_data['author']['name'])
+                if len(embed_users) == 1:
+                    user = embed_users[0]
                 else:
-                    embed_users = await functions.get_guild_member_by_name(message.guild, embed_data['author']['name'])
-                    if len(embed_users) == 1:
-                        user = embed_users[0]
-                    else:
-                        return add_reaction
+                    return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.reminder_boosts.enabled: return add_reaction
-        boost_name_match = re.search(r'bought a \*\*(.+?)\*\*!', embed_data['description'].lower()) 
+        boost_name_match = re.search(r'bought a \*\*(.+?)\*\*!', embed_data.lower('description')) 
         boost_name = boost_name_match.group(1)
         activity = strings.ACTIVITIES_NAME_BOOSTS[boost_name]
-        boost_end_match = re.search(r'<t:(\d+?):r>', embed_data['description'].lower())
+        boost_end_match = re.search(r'<t:(\d+?):r>', embed_data.lower('description'))
         end_time = datetime.fromtimestamp(int(boost_end_match.group(1)), timezone.utc).replace(microsecond=0)
         current_time = utils.utcnow().replace(microsecond=0)
         time_left = end_time - current_time
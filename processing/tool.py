@@ -2,17 +2,31 @@
 
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
-from cache import messages
 from database import reminders, users
-from resources import exceptions, functions, regex, strings
+from resources import correlation, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'upgrade ended!', #English
+    'upgrading to level', #English
+    'you have been refund', #English
+    'you have skipped the upgrade', #English
+)
+
+COMMANDS = (
+    correlation.Command('description', 'upgrade ended!', regex.COMMAND_TOOL, correlation.user_name_from_author),
+    correlation.Command('description', 'upgrading to level', regex.COMMAND_TOOL, None, author_icon=False),
+    correlation.Command('description', 'you have skipped the upgrade', regex.COMMAND_TOOL,
+                        correlation.user_name_from_description_address),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all tool related actions.
 
@@ -29,7 +43,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def call_context_helper_on_upgrade_claim(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def call_context_helper_on_upgrade_claim(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                               user: Optional[discord.User],
                                               user_settings: Optional[users.User]) -> bool:
     """Call the context helper after claiming n upgrade
 
@@ -42,34 +57,29 @@ async def call_context_helper_on_upgrade_claim(message: discord.Message, embed_d
     search_strings = [
         'upgrade ended!', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_TOOL,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_context_enabled: return add_reaction
-        level_match = re.search(r'level (\d+?) tier', embed_data['title'].lower())
+        level_match = re.search(r'level (\d+?) tier', embed_data.lower('title'))
         level = int(level_match.group(1))
         if level == 10:
             command = strings.SLASH_COMMANDS['laboratory']
         else:
             command = strings.SLASH_COMMANDS['tool']
-        await message.reply(f"➜ {command}")
+        await outbound.reply(message, f"➜ {command}")
     return add_reaction
 
 
-async def create_reminder_when_active(message: discord.Message, embed_data: Dict, interaction_user: Optional[discord.User],
+async def create_reminder_when_active(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                      interaction_user: Optional[discord.User],
                                    user_settings: Optional[users.User]) -> bool:
     """Creates a reminder when having an upgrade active. This also includes starting an upgrade.
 
@@ -82,16 +92,15 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
     search_strings = [
         'upgrading to level', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         if embed_data['embed_user'] is not None and interaction_user is not None:
             if interaction_user != embed_data['embed_user'] != interaction_user:
                 return add_reaction
         embed_users = []
         if interaction_user is None:
-            user_command_message = (
-                await messages.find_message(message.channel.id, regex.COMMAND_TOOL)
-            )
-            interaction_user = user_command_message.author
+            interaction_user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if interaction_user is None: return add_reaction
         if embed_data['embed_user'] is None:
             user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
             if user_id_match:
@@ -109,7 +118,7 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.reminder_upgrade.enabled: return add_reaction
         user_command = await functions.get_game_command(user_settings, 'tool')
-        upgrade_end_match = re.search(r'<t:(\d+?):f>', embed_data['field0']['value'].lower())
+        upgrade_end_match = re.search(r'<t:(\d+?):f>', embed_data.lower('field0.value'))
         end_time = datetime.fromtimestamp(int(upgrade_end_match.group(1)), timezone.utc).replace(microsecond=0)
         current_time = utils.utcnow().replace(microsecond=0)
         time_left = end_time - current_time
@@ -123,8 +132,8 @@ async def create_reminder_when_active(message: discord.Message, embed_data: Dict
     return add_reaction
 
 
-async def delete_reminder_on_cancel(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                    user_settings: Optional[users.User]) -> bool:
+async def delete_reminder_on_cancel(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                    user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Deletes a reminder when canceling an upgrade.
 
     Returns
@@ -136,8 +145,8 @@ async def delete_reminder_on_cancel(message: discord.Message, embed_data: Dict,
     search_strings = [
         'you have been refund', #English
     ]
-    if (any(search_string in embed_data['description'].lower() for search_string in search_strings)
-        and 'coin' in embed_data['description'].lower()):
+    if (any(search_string in embed_data.lower('description') for search_string in search_strings)
+        and 'coin' in embed_data.lower('description')):
         if user is None: user = message.mentions[0]
         if user_settings is None:
             try:
@@ -154,8 +163,8 @@ async def delete_reminder_on_cancel(message: discord.Message, embed_data: Dict,
     return add_reaction
 
 
-async def delete_reminder_on_skip(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                  user_settings: Optional[users.User]) -> bool:
+async def delete_reminder_on_skip(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                  user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Deletes a reminder when skipping an upgrade.
 
     Returns
@@ -167,26 +176,18 @@ async def delete_reminder_on_skip(message: discord.Message, embed_data: Dict, us
     search_strings = [
         'you have skipped the upgrade', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name_match = re.search(r"^\*\*(.+?)\*\*, ", embed_data['description'])
-                user_name = user_name_match.group(1)
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_TOOL,
-                                                user_name=user_name)
-                )
-                if user_command_message is not None:
-                    user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None:
+                user_name = correlation.user_name_from_description_address(embed_data)
+                if user_name is None: return add_reaction
+                embed_users = await functions.get_guild_member_by_name(message.guild, user_name)
+                if len(embed_users) == 1:
+                    user = embed_users[0]
                 else:
-                    embed_users = await functions.get_guild_member_by_name(message.guild, user_name)
-                    if len(embed_users) == 1:
-                        user = embed_users[0]
-                    else:
-                        return add_reaction
+                    return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
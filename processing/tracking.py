@@ -2,16 +2,23 @@
 """Contains commands related to command tracking"""
 
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
 from database import users, tracking
-from resources import exceptions, functions
+from resources import exceptions, functions, parsing
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'captcha', #English
+)
+
+COMMANDS = ()
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all tracking related actions.
 
@@ -26,7 +33,7 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def track_captcha(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def track_captcha(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                         user_settings: Optional[users.User]) -> bool:
     """Tracks captchas
 
@@ -38,7 +45,7 @@ async def track_captcha(message: discord.Message, embed_data: Dict, user: Option
     search_strings_title = [
         'captcha', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings_title):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings_title):
         captcha_solved = False
         for component in message.components[0].children:
             if component.style == discord.ButtonStyle.success:
@@ -50,7 +57,7 @@ async def track_captcha(message: discord.Message, embed_data: Dict, user: Option
                 user = embed_data['embed_user']
                 user_settings = embed_data['embed_user_settings']
             else:
-                user_name_match = re.search(r'hey \*\*(.+?)\*\*!', embed_data['description'].lower())
+                user_name_match = re.search(r'hey \*\*(.+?)\*\*!', embed_data.lower('description'))
                 user_name = user_name_match.group(1)
                 guild_members = await functions.get_guild_member_by_name(message.guild, user_name)
                 user = guild_members[0]
@@ -65,7 +72,7 @@ async def track_captcha(message: discord.Message, embed_data: Dict, user: Option
     return False
 
 
-async def track_rebirth(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def track_rebirth(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                         ser_settings: Optional[users.User]) -> bool:
     """Tracks rebirth
 
@@ -2,17 +2,34 @@
 
 from datetime import datetime, timedelta, timezone
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 from discord import utils
 
-from cache import messages
 from database import reminders, users
-from resources import emojis, exceptions, regex, strings
+from resources import correlation, emojis, exceptions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'you drank', #English
+    'insecticide active!', #English
+    'you have thrown a sweet apple to your tree!', #English
+    'your tree has been hydrated!', #English
+)
+
+COMMANDS = (
+    correlation.Command('title', 'energy drink', regex.COMMAND_USE_ENERGY_DRINK, correlation.user_name_from_author),
+    correlation.Command('title', 'insecticide active!', regex.COMMAND_USE_INSECTICIDE,
+                        correlation.user_name_from_author),
+    correlation.Command('title', 'you have thrown a sweet apple to your tree!', regex.COMMAND_USE_SWEET_APPLE,
+                        correlation.user_name_from_author),
+    correlation.Command('title', 'your tree has been hydrated!', regex.COMMAND_USE_SWEET_APPLE,
+                        correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all /use related actions.
 
@@ -29,7 +46,8 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def call_context_helper_on_energy_drink(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def call_context_helper_on_energy_drink(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                              user: Optional[discord.User],
                                               user_settings: Optional[users.User]) -> bool:
     """Call the context helper when using an energy drink
 
@@ -45,30 +63,24 @@ async def call_context_helper_on_energy_drink(message: discord.Message, embed_da
     search_strings_2 = [
         'energy drink', #English
     ]
-    if (any(search_string in embed_data['title'].lower() for search_string in search_strings_1)
-        and any(search_string in embed_data['title'].lower() for search_string in search_strings_2)):
+    if (any(search_string in embed_data.lower('title') for search_string in search_strings_1)
+        and any(search_string in embed_data.lower('title') for search_string in search_strings_2)):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_name = embed_data['author']['name']
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_USE_ENERGY_DRINK, user_name=user_name)
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_context_enabled: return add_reaction
-        await message.reply(f"➜ {strings.SLASH_COMMANDS['raid']}")
+        await outbound.reply(message, f"➜ {strings.SLASH_COMMANDS['raid']}")
     return add_reaction
 
 
-async def create_reminder_on_insecticide(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                         user_settings: Optional[users.User]) -> bool:
+async def create_reminder_on_insecticide(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                         user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Create a reminder when an insecticide is used.
 
     Returns
@@ -80,24 +92,18 @@ async def create_reminder_on_insecticide(message: discord.Message, embed_data: D
     search_strings = [
         'insecticide active!', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_USE_INSECTICIDE,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.reminder_boosts.enabled: return add_reaction
-        boost_end_match = re.search(r'<t:(\d+?):r>', embed_data['description'].lower())
+        boost_end_match = re.search(r'<t:(\d+?):r>', embed_data.lower('description'))
         end_time = datetime.fromtimestamp(int(boost_end_match.group(1)), timezone.utc).replace(microsecond=0)
         current_time = utils.utcnow().replace(microsecond=0)
         time_left = end_time - current_time
@@ -115,8 +121,8 @@ async def create_reminder_on_insecticide(message: discord.Message, embed_data: D
     return add_reaction
 
 
-async def create_reminder_on_sweet_apple(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                         user_settings: Optional[users.User]) -> bool:
+async def create_reminder_on_sweet_apple(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                         user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Create a reminder when a sweet apple is used.
 
     Returns
@@ -128,24 +134,18 @@ async def create_reminder_on_sweet_apple(message: discord.Message, embed_data: D
     search_strings = [
         'you have thrown a sweet apple to your tree!', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_USE_SWEET_APPLE,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.reminder_boosts.enabled: return add_reaction
-        boost_end_match = re.search(r'<t:(\d+?):r>', embed_data['description'].lower())
+        boost_end_match = re.search(r'<t:(\d+?):r>', embed_data.lower('description'))
         end_time = datetime.fromtimestamp(int(boost_end_match.group(1)), timezone.utc).replace(microsecond=0)
         current_time = utils.utcnow().replace(microsecond=0)
         time_left = end_time - current_time
@@ -169,8 +169,8 @@ async def create_reminder_on_sweet_apple(message: discord.Message, embed_data: D
     return add_reaction
 
 
-async def update_xp_on_water_bottle(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
-                                    user_settings: Optional[users.User]) -> bool:
+async def update_xp_on_water_bottle(message: discord.Message, embed_data: parsing.ParsedMessage,
+                                    user: Optional[discord.User], user_settings: Optional[users.User]) -> bool:
     """Update XP when a water bottle is used.
 
     Returns
@@ -182,24 +182,18 @@ async def update_xp_on_water_bottle(message: discord.Message, embed_data: Dict,
     search_strings = [
         'your tree has been hydrated!', #English
     ]
-    if any(search_string in embed_data['title'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('title') for search_string in search_strings):
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_USE_SWEET_APPLE,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
             except exceptions.FirstTimeUserError:
                 return add_reaction
         if not user_settings.bot_enabled or not user_settings.helper_prune_enabled: return add_reaction
-        xp_gain_end_match = re.search(r'gained \*\*(.+?)\*\* exp', embed_data['description'].lower())
+        xp_gain_end_match = re.search(r'gained \*\*(.+?)\*\* exp', embed_data.lower('description'))
         xp_gain = int(re.sub('\D', '', xp_gain_end_match.group(1)))
         if user_settings.xp_target == 0 or user_settings.level == 0: return add_reaction
         new_xp = user_settings.xp + xp_gain
@@ -2,16 +2,24 @@
 
 from datetime import timedelta
 import re
-from typing import Dict, Optional
+from typing import Optional
 
 import discord
 
-from cache import messages
 from database import reminders, users
-from resources import exceptions, functions, regex, strings
+from resources import correlation, exceptions, functions, outbound, parsing, regex, strings
 
 
-async def process_message(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+TRIGGERS = (
+    'click here to vote', #English
+)
+
+COMMANDS = (
+    correlation.Command('description', 'click here to vote', regex.COMMAND_VOTE, correlation.user_name_from_author),
+)
+
+
+async def process_message(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Processes the message for all vote related actions.
 
@@ -25,7 +33,7 @@ async def process_message(message: discord.Message, embed_data: Dict, user: Opti
     return any(return_values)
 
 
-async def create_reminder(message: discord.Message, embed_data: Dict, user: Optional[discord.User],
+async def create_reminder(message: discord.Message, embed_data: parsing.ParsedMessage, user: Optional[discord.User],
                           user_settings: Optional[users.User]) -> bool:
     """Create a reminder on /daily
 
@@ -38,18 +46,12 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
     search_strings = [
         'click here to vote', #English
     ]
-    if any(search_string in embed_data['description'].lower() for search_string in search_strings):
+    if any(search_string in embed_data.lower('description') for search_string in search_strings):
         reminder = None
         if user is None:
-            if embed_data['embed_user'] is not None:
-                user = embed_data['embed_user']
-                user_settings = embed_data['embed_user_settings']
-            else:
-                user_command_message = (
-                    await messages.find_message(message.channel.id, regex.COMMAND_VOTE,
-                                                user_name=embed_data['author']['name'])
-                )
-                user = user_command_message.author
+            user = embed_data['command_user']
+            user_settings = embed_data['command_user_settings']
+            if user is None: return add_reaction
         if user_settings is None:
             try:
                 user_settings: users.User = await users.get_user(user.id)
@@ -60,7 +62,7 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
             streak_match = re.search(r'\*\*(\d)\*\*/7', embed_data['field1']['value'])
             if streak_match:
                 await user_settings.update(streak_vote=int(streak_match.group(1)))
-        if 'cooldown ready!' in embed_data['title'].lower():
+        if 'cooldown ready!' in embed_data.lower('title'):
             if reminder is None:
                 try:
                     reminder = await reminders.get_reminder(user.id, 'vote')
@@ -91,7 +93,7 @@ async def create_reminder(message: discord.Message, embed_data: Dict, user: Opti
                     f"➜ {strings.SLASH_COMMANDS['hive claim honey']}"
                 )
                 if reminder is None:
-                    await message.reply(answer)
+                    await outbound.reply(message, answer)
                 elif reminder.triggered:
-                    await message.reply(answer)
+                    await outbound.reply(message, answer)
     return add_reaction
\ No newline at end of file
@@ -0,0 +1,158 @@
+# correlation.py
+"""Resolves the user that sent the command a Tree message answers. Used by the detection before any processor runs."""
+
+import re
+from types import ModuleType
+from typing import Callable, Dict, Iterable, NamedTuple, Optional
+
+import discord
+
+from cache import messages
+from database import users
+from resources import exceptions, parsing, regex
+
+
+# Containers
+class Command(NamedTuple):
+    """Object that describes how to find the command of a Tree message in the message cache.
+    Every processing module lists the commands that cause its messages in its COMMANDS tuple. The first one that
+    matches a message is used for that module.
+
+    Arguments
+    ---------
+    key, search_string: The Tree message matches if search_string is in the lowercase text of key.
+    command_regex: Regex the command has to match. If None, the newest command of the user is used.
+    get_user_name: Function that returns the name of the command author from the parsed message. If None, the newest
+    matching command of any user is used.
+    author_icon: If True, the user in the embed author icon is the command author. Set this to False for embeds that
+    can show other users (e.g. profiles) or if the command message itself is needed.
+    """
+    key: str
+    search_string: str
+    command_regex: Optional[re.Pattern]
+    get_user_name: Optional[Callable[[parsing.ParsedMessage], Optional[str]]] = None
+    author_icon: bool = True
+
+
+# --- User name extraction ---
+def user_name_from_author(embed_data: parsing.ParsedMessage) -> Optional[str]:
+    """Returns the embed author name"""
+    return embed_data['author']['name']
+
+
+def user_name_from_author_possessive(embed_data: parsing.ParsedMessage) -> Optional[str]:
+    """Returns the user name from an embed author like "Name's quests" """
+    user_name_match = re.search(regex.USERNAME_FROM_EMBED_AUTHOR, embed_data['author']['name'])
+    return user_name_match.group(1) if user_name_match else None
+
+
+def user_name_from_content_start(embed_data: parsing.ParsedMessage) -> Optional[str]:
+    """Returns the user name from a message content like "**Name** did something" """
+    user_name_match = re.search(regex.NAME_FROM_MESSAGE_START, embed_data['content'])
+    return user_name_match.group(1) if user_name_match else None
+
+
+def user_name_from_description_start(embed_data: parsing.ParsedMessage) -> Optional[str]:
+    """Returns the user name from an embed description like "**Name** did something" """
+    user_name_match = re.search(regex.NAME_FROM_MESSAGE_START, embed_data['description'])
+    return user_name_match.group(1) if user_name_match else None
+
+
+def user_name_from_description_address(embed_data: parsing.ParsedMessage) -> Optional[str]:
+    """Returns the user name from an embed description like "**Name**, you did something" """
+    user_name_match = re.search(regex.NAME_FROM_MESSAGE_ADDRESS, embed_data['description'])
+    return user_name_match.group(1) if user_name_match else None
+
+
+def user_name_from_fusion_results(embed_data: parsing.ParsedMessage) -> Optional[str]:
+    """Returns the name of the first user in the fusion results"""
+    user_name_match = re.search(regex.NAME_FROM_FUSION_RESULTS, embed_data['field0']['value'].split('\n')[0])
+    return user_name_match.group(1) if user_name_match else None
+
+
+# --- Correlation ---
+async def correlate_message(message: discord.Message, embed_data: parsing.ParsedMessage,
+                            interaction_user: Optional[discord.User],
+                            module_commands: Dict[ModuleType, Iterable[Command]], wait: bool = True
+                            ) -> Dict[ModuleType, parsing.ParsedMessage]:
+    """Resolves the users of a Tree message and stores them in the parsed message.
+
+    The embed user is taken from the author icon. The command user is resolved in this order:
+    1. The interaction user (from the message or the referenced message)
+    2. The embed user, if the command that matches the message allows it
+    3. The author of the newest cached command that matches the command that matches the message
+    If the command user was found in the message cache, the cached message is stored as well. If wait is True and the
+    command isn't cached yet, it is waited for (see cache.messages.find_message). The cache is only searched if the
+    command user isn't known otherwise, so messages with an interaction user or a usable embed user never wait.
+
+    Every module uses the first of its commands that matches the message. If the matching commands of all modules
+    look up the command user the same way, the command user is only resolved once and all modules share the parsed
+    message. Otherwise, the command user is resolved per lookup and each module gets a copy of the parsed message with
+    the result of its own lookup. Modules without a matching command get the result of the first lookup.
+
+    Returns
+    -------
+    Dict with the parsed message of every module
+    """
+    user_id_match = re.search(regex.USER_ID_FROM_ICON_URL, embed_data['author']['icon_url'])
+    if user_id_match:
+        embed_data['embed_user'] = message.guild.get_member(int(user_id_match.group(1)))
+    module_embed_data = {module: embed_data for module in module_commands}
+    if interaction_user is not None:
+        embed_data['command_user'] = interaction_user
+        return module_embed_data
+    module_lookups = {}
+    for module, commands in module_commands.items():
+        for command in commands:
+            if command.search_string in embed_data.lower(command.key):
+                module_lookups[module] = (command.command_regex, command.get_user_name, command.author_icon)
+                break
+    lookups = list(dict.fromkeys(module_lookups.values()))
+    if not lookups: return module_embed_data
+    lookup_embed_data = {}
+    for lookup in lookups:
+        lookup_embed_data[lookup] = embed_data if not lookup_embed_data else embed_data.copy()
+        await resolve_command_user(message, lookup_embed_data[lookup], *lookup, wait=wait)
+    for module, lookup in module_lookups.items():
+        module_embed_data[module] = lookup_embed_data[lookup]
+    return module_embed_data
+
+
+async def resolve_command_user(message: discord.Message, embed_data: parsing.ParsedMessage,
+                               command_regex: Optional[re.Pattern],
+                               get_user_name: Optional[Callable[[parsing.ParsedMessage], Optional[str]]],
+                               author_icon: bool, wait: bool = True) -> None:
+    """Resolves the command user with the lookup of a command and stores it in the parsed message"""
+    if author_icon and embed_data['embed_user'] is not None:
+        embed_data['command_user'] = embed_data['embed_user']
+        return
+    user_name = get_user_name(embed_data) if get_user_name is not None else None
+    if user_name is None and command_regex is None: return
+    command_message = await messages.find_message(message.channel.id, command_regex, user_name=user_name,
+                                                  timeout=None if wait else 0)
+    if command_message is None: return
+    command_user = await command_message.get_author(message.guild)
+    if command_user is None: return
+    embed_data['command_user'] = command_user
+    embed_data['command_message'] = command_message
+
+
+async def load_user_settings(embed_data: parsing.ParsedMessage) -> None:
+    """Loads the settings of the command user and the embed user into the parsed message.
+    Each user is only loaded once. Settings are None if the user isn't registered.
+    """
+    if embed_data['command_user'] is not None:
+        embed_data['command_user_settings'] = await get_user_settings(embed_data['command_user'])
+    if embed_data['embed_user'] is not None:
+        if embed_data['embed_user'] == embed_data['command_user']:
+            embed_data['embed_user_settings'] = embed_data['command_user_settings']
+        else:
+            embed_data['embed_user_settings'] = await get_user_settings(embed_data['embed_user'])
+
+
+async def get_user_settings(user: discord.User) -> Optional[users.User]:
+    """Returns the settings of a user. Returns None if the user isn't registered."""
+    try:
+        return await users.get_user(user.id)
+    except exceptions.FirstTimeUserError:
+        return None
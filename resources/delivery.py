@@ -0,0 +1,129 @@
+# delivery.py
+"""Collects how late reminders are delivered. Reported by /dev reminder-stats and logged regularly by cogs.tasks."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+
+# Upper bounds of the histogram buckets in seconds. Everything above the last bound goes into an overflow bucket.
+HISTOGRAM_BOUNDS = (0.25, 0.5, 1, 1.5, 2, 3, 5, 10, 15, 30, 60, 120, 300, 600)
+
+
+# Containers
+class LatencyHistogram():
+    """Histogram of latencies in seconds with the buckets in HISTOGRAM_BOUNDS"""
+    __slots__ = ('counts', 'total')
+
+    def __init__(self) -> None:
+        self.counts: List[int] = [0] * (len(HISTOGRAM_BOUNDS) + 1)
+        self.total = 0
+
+    def add(self, seconds: float) -> None:
+        """Counts a latency"""
+        for index, bound in enumerate(HISTOGRAM_BOUNDS):
+            if seconds <= bound: break
+        else:
+            index = len(HISTOGRAM_BOUNDS)
+        self.counts[index] += 1
+        self.total += 1
+
+    def merge(self, other: 'LatencyHistogram') -> None:
+        """Adds the counts of another histogram"""
+        for index, bucket_count in enumerate(other.counts):
+            self.counts[index] += bucket_count
+        self.total += other.total
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Returns the upper bound of the bucket that contains the percentile.
+        Returns None if the histogram is empty and infinity if the percentile is in the overflow bucket."""
+        if self.total == 0: return None
+        rank = self.total * percent / 100
+        count = 0
+        for index, bucket_count in enumerate(self.counts):
+            count += bucket_count
+            if count >= rank:
+                return HISTOGRAM_BOUNDS[index] if index < len(HISTOGRAM_BOUNDS) else float('inf')
+        return float('inf')
+
+
+@dataclass()
+class ActivityStats():
+    """Delivery statistics of an activity.
+
+    Arguments
+    ---------
+    dispatch_latency: Time from the end time to the start of the delivery
+    send_latency: Time from the end time until the reminder message was sent
+    sent: Amount of delivered reminders
+    missed: Amount of reminders that weren't delivered because the channel or the user was gone or they were too old
+    failed: Amount of reminders that weren't delivered because of an error
+    """
+    dispatch_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    send_latency: LatencyHistogram = field(default_factory=LatencyHistogram)
+    sent: int = 0
+    missed: int = 0
+    failed: int = 0
+
+
+_STATS: Dict[str, ActivityStats] = {}
+
+
+def _get_activity_stats(activity: str) -> ActivityStats:
+    activity_stats = _STATS.get(activity, None)
+    if activity_stats is None:
+        activity_stats = _STATS[activity] = ActivityStats()
+    return activity_stats
+
+
+# Functions
+async def record_delivery(activity: str, end_time: datetime, dispatched_at: datetime,
+                          completed_at: datetime) -> None:
+    """Records a delivered reminder"""
+    activity_stats = _get_activity_stats(activity)
+    activity_stats.dispatch_latency.add(max((dispatched_at - end_time).total_seconds(), 0))
+    activity_stats.send_latency.add(max((completed_at - end_time).total_seconds(), 0))
+    activity_stats.sent += 1
+
+
+async def record_missed(activity: str, amount: int = 1) -> None:
+    """Records reminders that weren't delivered because the channel or the user was gone or they were too old"""
+    _get_activity_stats(activity).missed += amount
+
+
+async def record_failed(activity: str, amount: int = 1) -> None:
+    """Records reminders that weren't delivered because of an error"""
+    _get_activity_stats(activity).failed += amount
+
+
+async def get_report() -> str:
+    """Returns the delivery statistics since startup, one line per activity and a total line.
+    Latencies are p50/p95/p99 of the time from the end time until the message was sent. The p95 of the time until the
+    delivery started shows how much of that is spent before the message is handed to Discord.
+    """
+    def format_latency(seconds: Optional[float]) -> str:
+        if seconds is None: return '-'
+        if seconds == float('inf'): return f'>{HISTOGRAM_BOUNDS[-1]:g}s'
+        return f'≤{seconds:g}s'
+
+    total_stats = ActivityStats()
+    lines = []
+    for activity, activity_stats in sorted(_STATS.items()):
+        total_stats.dispatch_latency.merge(activity_stats.dispatch_latency)
+        total_stats.send_latency.merge(activity_stats.send_latency)
+        total_stats.sent += activity_stats.sent
+        total_stats.missed += activity_stats.missed
+        total_stats.failed += activity_stats.failed
+        lines.append((activity, activity_stats))
+    lines.append(('total', total_stats))
+    report = ''
+    for activity, activity_stats in lines:
+        latency = activity_stats.send_latency
+        report = (
+            f'{report}\n{activity}: {activity_stats.sent:,} sent • '
+            f'p50 {format_latency(latency.percentile(50))} • p95 {format_latency(latency.percentile(95))} • '
+            f'p99 {format_latency(latency.percentile(99))} • '
+            f'dispatch p95 {format_latency(activity_stats.dispatch_latency.percentile(95))} • '
+            f'{activity_stats.missed:,} missed • {activity_stats.failed:,} failed'
+        )
+    return report.strip()
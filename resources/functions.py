@@ -9,18 +9,21 @@ import discord
 from discord.ext import commands
 from discord import utils
 
+from cache import interactions
 from database import cooldowns, errors, reminders, users
-from resources import emojis, exceptions, functions, regex, settings, strings, views
+from resources import emojis, exceptions, functions, outbound, regex, settings, strings, views
 
 
 # --- Get discord data ---
 async def get_interaction(message: discord.Message) -> discord.Interaction:
-    """Returns the interaction object if the message was triggered by a slash command. Returns None if no user was found."""
+    """Returns the interaction object if the message was triggered by a slash command. Returns None if no user was found.
+    Referenced messages that are not in the discord cache are looked up in the interaction cache first.
+    """
     if message.reference is not None:
         if message.reference.cached_message is not None:
             message = message.reference.cached_message
         else:
-            message = await message.channel.fetch_message(message.reference.message_id)
+            return await interactions.get_message_interaction(message.channel, message.reference.message_id)
     return message.interaction
 
 
@@ -65,7 +68,7 @@ async def add_logo_reaction(message: discord.Message) -> None:
         if reaction.emoji == emojis.LOGO:
             reaction_exists = True
             break
-    if not reaction_exists: await message.add_reaction(emojis.LOGO)
+    if not reaction_exists: await outbound.add_reaction(message, emojis.LOGO)
         
 
 async def add_reminder_reaction(message: discord.Message, reminder: reminders.Reminder,  user_settings: users.User) -> None:
@@ -74,14 +77,14 @@ async def add_reminder_reaction(message: discord.Message, reminder: reminders.Re
         await add_logo_reaction(message)
     elif not reminder.record_exists:
         if settings.DEBUG_MODE or message.guild.id in settings.DEV_GUILDS:
-            await message.add_reaction(emojis.WARNING)
-            await message.channel.send(strings.MSG_ERROR)
+            await outbound.add_reaction(message, emojis.WARNING)
+            await outbound.send(message.channel, strings.MSG_ERROR)
 
 
 async def add_warning_reaction(message: discord.Message) -> None:
     """Adds a warning reaction if debug mode is on or the guild is a dev guild"""
     if settings.DEBUG_MODE or message.guild.id in settings.DEV_GUILDS:
-        await message.add_reaction(emojis.WARNING)
+        await outbound.add_reaction(message, emojis.WARNING)
 
 
 # --- Regex ---
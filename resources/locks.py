@@ -0,0 +1,66 @@
+# locks.py
+"""Contains keyed locks that serialize work for the same key (e.g. a user) while other keys run in parallel"""
+
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator, Dict, Hashable, Iterable, List
+
+
+class KeyedLock():
+    """Asyncio locks per key.
+
+    Tasks that use the same key run one after another in the order they requested the lock. A lock is created on first
+    use and evicted as soon as no task holds or waits for it, so idle keys don't use any memory.
+    The lock is owned by the task that acquired it and is reentrant for that task only. Acquiring a key that the
+    current task already holds does nothing, so functions can lock a key without knowing if a caller already did.
+    Other tasks, including tasks the owner created (e.g. with asyncio.gather), wait until the owner releases the key.
+    """
+    __slots__ = ('_locks', 'name')
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._locks: Dict[Hashable, List] = {} # key: [lock, amount of tasks that hold or wait for the lock, owner task]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+    @asynccontextmanager
+    async def __call__(self, key: Hashable) -> AsyncIterator[bool]:
+        """Locks the key for the duration of the context.
+
+        Returns
+        -------
+        True if the lock was acquired, False if the current task already held it.
+        """
+        task = asyncio.current_task()
+        entry = self._locks.get(key, None)
+        if entry is not None and entry[2] is task:
+            yield False
+            return
+        if entry is None:
+            entry = self._locks[key] = [asyncio.Lock(), 0, None]
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                entry[2] = task
+                try:
+                    yield True
+                finally:
+                    entry[2] = None
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0: del self._locks[key]
+
+    @asynccontextmanager
+    async def lock_many(self, keys: Iterable[Hashable]) -> AsyncIterator[None]:
+        """Locks several keys for the duration of the context. None keys are ignored.
+        The keys are always locked in sorted order to prevent deadlocks.
+        """
+        async with AsyncExitStack() as stack:
+            for key in sorted(set(key for key in keys if key is not None)):
+                await stack.enter_async_context(self(key))
+            yield
+
+
+# Serializes all work that reads and updates the settings of a user. Key is the user ID.
+user_locks = KeyedLock('user_locks')
@@ -0,0 +1,243 @@
+# outbound.py
+"""Contains the dispatcher that all messages and reactions the bot sends go through.
+
+Requests are rate limited with token buckets that are modeled on the Discord limits, one bucket for all requests and
+one per channel and route (messages and reactions are limited separately). Requests with a higher priority are always
+sent first. If too many requests of a priority are waiting, new requests of that priority are dropped instead of
+delaying everything else.
+
+The helper functions don't wait for the request to be sent unless they are called with wait=True. This way,
+processors don't hold the user locks while their replies and reactions wait for the rate limit.
+"""
+
+import asyncio
+from collections import deque
+import functools
+import time
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Set, Tuple
+
+import discord
+
+from resources import logs, settings
+
+
+# Priorities, highest first
+PRIORITY_REMINDER = 0
+PRIORITY_HELPER = 1
+PRIORITY_REACTION = 2
+PRIORITY_NAMES = ('reminders', 'helper replies', 'reactions')
+
+# Routes with separate channel rate limits
+ROUTE_MESSAGES = 'messages'
+ROUTE_REACTIONS = 'reactions'
+
+
+# Containers
+class OutboundRequest(NamedTuple):
+    """Object that represents a request that waits in the dispatcher queue"""
+    channel_id: int
+    route: str
+    call: Callable[[], Awaitable[Any]]
+    future: asyncio.Future
+
+
+class TokenBucket():
+    """Token bucket that allows capacity requests at once and refills with rate tokens per second"""
+    __slots__ = ('capacity', 'rate', 'tokens', 'updated_at')
+
+    def __init__(self, rate: float, capacity: float) -> None:
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def is_full(self, now: float) -> bool:
+        """Returns True if the bucket wasn't used for long enough to be full again"""
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+    def take(self, now: float) -> None:
+        """Uses a token. Only call this if wait_time returned 0."""
+        self._refill(now)
+        self.tokens -= 1
+
+    def wait_time(self, now: float) -> float:
+        """Returns the seconds until a token is available"""
+        self._refill(now)
+        return 0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class OutboundDispatcher():
+    """Queue for all outbound requests.
+
+    Requests are sent in priority order as soon as the global bucket and the bucket of their channel allow it. A
+    request that has to wait for its channel doesn't block requests for other channels.
+    Under backpressure (more than the queue limit of a priority is waiting in that priority), new requests of that
+    priority are dropped. Reminders have no queue limit and are never dropped.
+    """
+    __slots__ = ('dropped', '_channel_buckets', '_global_bucket', '_queues', '_running', '_task', '_wake')
+
+    def __init__(self) -> None:
+        self.dropped: List[int] = [0] * len(PRIORITY_NAMES)
+        self._channel_buckets: Dict[Tuple[int, str], TokenBucket] = {}
+        self._global_bucket = TokenBucket(settings.OUTBOUND_GLOBAL_RATE, settings.OUTBOUND_GLOBAL_RATE)
+        self._queues: Tuple[Deque[OutboundRequest], ...] = tuple(deque() for _ in PRIORITY_NAMES)
+        self._running: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return sum(len(queue) for queue in self._queues)
+
+    def _queue(self, channel_id: int, route: str, priority: int,
+               call: Callable[[], Awaitable[Any]]) -> Optional[asyncio.Future]:
+        """Queues a request. Returns the future of the request or None if the request was dropped."""
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        queue_limit = settings.OUTBOUND_QUEUE_LIMITS[priority]
+        if queue_limit is not None and len(self._queues[priority]) >= queue_limit:
+            self.dropped[priority] += 1
+            return None
+        request = OutboundRequest(channel_id, route, call, asyncio.get_running_loop().create_future())
+        self._queues[priority].append(request)
+        self._wake.set()
+        return request.future
+
+    async def submit(self, channel_id: int, route: str, priority: int, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Queues a request and waits until it was sent.
+
+        Arguments
+        ---------
+        channel_id: ID of the channel the request goes to
+        route: One of the ROUTE constants
+        priority: One of the PRIORITY constants
+        call: Function without arguments that makes the API call
+
+        Returns
+        -------
+        The return value of call. None if the request was dropped.
+
+        Raises
+        ------
+        All exceptions that call raises.
+        """
+        future = self._queue(channel_id, route, priority, call)
+        return None if future is None else await future
+
+    def dispatch(self, channel_id: int, route: str, priority: int, call: Callable[[], Awaitable[Any]]) -> None:
+        """Queues a request without waiting for it. Errors are logged, missing permissions are ignored.
+        See submit() for the arguments."""
+        future = self._queue(channel_id, route, priority, call)
+        if future is not None: future.add_done_callback(_log_dispatch_error)
+
+    def _get_channel_bucket(self, channel_id: int, route: str) -> TokenBucket:
+        bucket = self._channel_buckets.get((channel_id, route), None)
+        if bucket is None:
+            if route == ROUTE_REACTIONS:
+                bucket = TokenBucket(settings.OUTBOUND_REACTION_RATE, settings.OUTBOUND_REACTION_BURST)
+            else:
+                bucket = TokenBucket(settings.OUTBOUND_CHANNEL_MESSAGES / settings.OUTBOUND_CHANNEL_PERIOD,
+                                     settings.OUTBOUND_CHANNEL_MESSAGES)
+            self._channel_buckets[(channel_id, route)] = bucket
+        return bucket
+
+    def _pop_next(self, now: float) -> Tuple[Optional[OutboundRequest], Optional[float]]:
+        """Removes and returns the request with the highest priority whose channel has a token.
+        If no request can be sent, returns the seconds until the next channel has a token instead.
+        """
+        min_wait_time = None
+        for queue in self._queues:
+            index = 0
+            while index < len(queue):
+                request = queue[index]
+                if request.future.done(): # Caller was cancelled
+                    del queue[index]
+                    continue
+                wait_time = self._get_channel_bucket(request.channel_id, request.route).wait_time(now)
+                if wait_time == 0:
+                    del queue[index]
+                    return request, None
+                if min_wait_time is None or wait_time < min_wait_time: min_wait_time = wait_time
+                index += 1
+        return None, min_wait_time
+
+    async def _run(self) -> None:
+        """Sends queued requests as fast as the buckets allow"""
+        while True:
+            self._wake.clear()
+            now = time.monotonic()
+            wait_time = self._global_bucket.wait_time(now)
+            if wait_time == 0:
+                request, wait_time = self._pop_next(now)
+                if request is not None:
+                    self._global_bucket.take(now)
+                    self._get_channel_bucket(request.channel_id, request.route).take(now)
+                    task = asyncio.get_running_loop().create_task(self._send(request))
+                    self._running.add(task)
+                    task.add_done_callback(self._running.discard)
+                    continue
+                if wait_time is None:
+                    self._channel_buckets = {
+                        bucket_key: bucket for bucket_key, bucket in self._channel_buckets.items()
+                        if not bucket.is_full(now)
+                    }
+            try:
+                await asyncio.wait_for(self._wake.wait(), wait_time)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _send(self, request: OutboundRequest) -> None:
+        """Makes the API call of a request and hands the result to the caller.
+        If the call is cancelled, the future of the request is cancelled as well, so the caller doesn't wait forever.
+        """
+        try:
+            result = await request.call()
+        except Exception as error:
+            if not request.future.done(): request.future.set_exception(error)
+        else:
+            if not request.future.done(): request.future.set_result(result)
+        finally:
+            if not request.future.done(): request.future.cancel()
+
+
+def _log_dispatch_error(future: asyncio.Future) -> None:
+    """Logs the error of a request nobody waits for"""
+    if future.cancelled(): return
+    error = future.exception()
+    if error is None or isinstance(error, discord.errors.Forbidden): return
+    logs.logger.error(f'Error sending a request: {error}')
+
+
+# Dispatcher for all outbound requests of the bot
+dispatcher = OutboundDispatcher()
+
+
+async def send(channel: discord.abc.Messageable, *args, priority: int = PRIORITY_HELPER, wait: bool = False,
+               **kwargs) -> Any:
+    """Sends a message to a channel through the dispatcher.
+    Returns the message if wait is True, None if the message was dropped or wait is False."""
+    call = functools.partial(channel.send, *args, **kwargs)
+    if not wait: return dispatcher.dispatch(channel.id, ROUTE_MESSAGES, priority, call)
+    return await dispatcher.submit(channel.id, ROUTE_MESSAGES, priority, call)
+
+
+async def reply(message: discord.Message, *args, priority: int = PRIORITY_HELPER, wait: bool = False,
+                **kwargs) -> Any:
+    """Replies to a message through the dispatcher.
+    Returns the reply if wait is True, None if the reply was dropped or wait is False."""
+    call = functools.partial(message.reply, *args, **kwargs)
+    if not wait: return dispatcher.dispatch(message.channel.id, ROUTE_MESSAGES, priority, call)
+    return await dispatcher.submit(message.channel.id, ROUTE_MESSAGES, priority, call)
+
+
+async def add_reaction(message: discord.Message, emoji: Any, priority: int = PRIORITY_REACTION,
+                       wait: bool = False) -> None:
+    """Adds a reaction to a message through the dispatcher. The reaction is dropped under backpressure."""
+    call = functools.partial(message.add_reaction, emoji)
+    if not wait: return dispatcher.dispatch(message.channel.id, ROUTE_REACTIONS, priority, call)
+    await dispatcher.submit(message.channel.id, ROUTE_REACTIONS, priority, call)
@@ -0,0 +1,190 @@
+# parsing.py
+"""Contains the parsed representation of Tree messages that is handed to all processors"""
+
+from typing import Any, Optional, Tuple
+import unicodedata
+
+import discord
+
+
+# All text keys of a parsed message. Embed keys of sections are written as "section.key".
+EMBED_KEYS = (
+    'author.icon_url', 'author.name', 'description',
+    'field0.name', 'field0.value', 'field1.name', 'field1.value', 'field2.name', 'field2.value',
+    'field3.name', 'field3.value', 'field4.name', 'field4.value', 'field5.name', 'field5.value',
+    'footer.icon_url', 'footer.text', 'title',
+)
+# Keys of the users that are resolved by the detection. These are the only keys that can be set.
+USER_KEYS = ('command_message', 'command_user', 'command_user_settings', 'embed_user', 'embed_user_settings')
+_SECTION_KEYS = {
+    'author': {'icon_url': 'author.icon_url', 'name': 'author.name'},
+    'footer': {'icon_url': 'footer.icon_url', 'text': 'footer.text'},
+    **{f'field{field_no}': {'name': f'field{field_no}.name', 'value': f'field{field_no}.value'}
+       for field_no in range(6)},
+}
+
+
+class EmbedSection():
+    """Part of a parsed message with sub keys (author, footer, fields).
+    Behaves like the sub dicts that parse_embed used to return.
+    """
+    __slots__ = ('_keys', '_parsed_message')
+
+    def __init__(self, parsed_message: 'ParsedMessage', name: str) -> None:
+        self._keys = _SECTION_KEYS[name]
+        self._parsed_message = parsed_message
+
+    def __getitem__(self, key: str) -> str:
+        return self._parsed_message.get(self._keys[key])
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, EmbedSection):
+            return all(self[key] == other[key] for key in self._keys)
+        if isinstance(other, dict):
+            return other.keys() == self._keys.keys() and all(self[key] == other[key] for key in self._keys)
+        return NotImplemented
+
+    def lower(self, key: str) -> str:
+        """Returns the lowercase text of a sub key"""
+        return self._parsed_message.lower(self._keys[key])
+
+    def nfkd(self, key: str) -> str:
+        """Returns the lowercase NFKD normalized text of a sub key"""
+        return self._parsed_message.nfkd(self._keys[key])
+
+
+class ParsedMessage():
+    """Parsed text of a Tree message.
+
+    Texts are read from the message and its first embed on first access. Lowercase and NFKD normalized versions are
+    also created on first access and cached afterwards.
+    All keys of the old embed_data dict are still supported, e.g. embed_data['field0']['name'].
+    All texts are guaranteed to exist and are an empty string if not set in the message.
+    The users the detection resolves for the message are stored under USER_KEYS, e.g. embed_data['command_user'].
+
+    Text keys
+    ---------
+    content, title, description, author.icon_url, author.name, field0.name - field5.name,
+    field0.value - field5.value, footer.icon_url, footer.text
+    """
+    __slots__ = ('command_message', 'command_user', 'command_user_settings', 'embed_user', 'embed_user_settings',
+                 'message', '_embed', '_fingerprint', '_lower', '_nfkd', '_sections', '_texts')
+
+    def __init__(self, message: discord.Message) -> None:
+        self.message = message
+        self.command_message = None # cache.messages.CachedMessage
+        self.command_user: Optional[discord.User] = None
+        self.command_user_settings = None
+        self.embed_user: Optional[discord.Member] = None
+        self.embed_user_settings = None
+        self._embed = message.embeds[0] if message.embeds else None
+        self._fingerprint = None
+        self._lower = None
+        self._nfkd = None
+        self._sections = None
+        self._texts = None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in _SECTION_KEYS:
+            if self._sections is None: self._sections = {}
+            section = self._sections.get(key, None)
+            if section is None:
+                section = self._sections[key] = EmbedSection(self, key)
+            return section
+        if key in USER_KEYS:
+            return getattr(self, key)
+        return self.get(key)
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key not in USER_KEYS:
+            raise KeyError(f'Key "{key}" can not be set.')
+        setattr(self, key, value)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, ParsedMessage): return NotImplemented
+        return self.embed_texts() == other.embed_texts()
+
+    __hash__ = None
+
+    def copy(self) -> 'ParsedMessage':
+        """Returns a parsed message of the same message with its own users. The texts are shared with this one."""
+        if self._texts is None: self._texts = {}
+        if self._lower is None: self._lower = {}
+        if self._nfkd is None: self._nfkd = {}
+        parsed_message = ParsedMessage(self.message)
+        parsed_message._fingerprint = self._fingerprint
+        parsed_message._lower = self._lower
+        parsed_message._nfkd = self._nfkd
+        parsed_message._texts = self._texts
+        for key in USER_KEYS:
+            setattr(parsed_message, key, getattr(self, key))
+        return parsed_message
+
+    def get(self, key: str) -> str:
+        """Returns the text of a key"""
+        if self._texts is None: self._texts = {}
+        text = self._texts.get(key, None)
+        if text is None:
+            text = self._texts[key] = self._read(key)
+        return text
+
+    def lower(self, key: str) -> str:
+        """Returns the lowercase text of a key"""
+        if self._lower is None: self._lower = {}
+        text = self._lower.get(key, None)
+        if text is None:
+            text = self._lower[key] = self.get(key).lower()
+        return text
+
+    def nfkd(self, key: str) -> str:
+        """Returns the lowercase NFKD normalized text of a key"""
+        if self._nfkd is None: self._nfkd = {}
+        text = self._nfkd.get(key, None)
+        if text is None:
+            text = self._nfkd[key] = unicodedata.normalize('NFKD', self.get(key)).lower()
+        return text
+
+    def fingerprint(self) -> int:
+        """Returns a hash of the content, the embed texts and the components of the message.
+        Two parsed messages with the same fingerprint look the same to all processors.
+        """
+        if self._fingerprint is None:
+            components = tuple(
+                tuple(
+                    (component.type, getattr(component, 'custom_id', None), getattr(component, 'label', None),
+                     getattr(component, 'style', None), getattr(component, 'disabled', None))
+                    for component in getattr(row, 'children', ())
+                )
+                for row in self.message.components
+            )
+            self._fingerprint = hash((self.get('content'), self.embed_texts(), components))
+        return self._fingerprint
+
+    def embed_texts(self) -> Tuple[str, ...]:
+        """Returns all embed texts in the order of EMBED_KEYS"""
+        return tuple(self.get(key) for key in EMBED_KEYS)
+
+    def _read(self, key: str) -> str:
+        """Reads the text of a key from the message"""
+        if key == 'content':
+            return self.message.content if self.message.content is not None else ''
+        embed = self._embed
+        if embed is None: return ''
+        if key == 'title':
+            return embed.title if embed.title is not None else ''
+        if key == 'description':
+            return embed.description if embed.description is not None else ''
+        section, _, sub_key = key.partition('.')
+        if section not in _SECTION_KEYS or sub_key not in _SECTION_KEYS[section]:
+            raise KeyError(f'Unknown key "{key}".')
+        if section == 'author':
+            if not embed.author: return ''
+            value = getattr(embed.author, sub_key)
+        elif section == 'footer':
+            if embed.footer is None: return ''
+            value = getattr(embed.footer, sub_key)
+        else:
+            field_no = int(section[5:])
+            if field_no >= len(embed.fields): return ''
+            value = getattr(embed.fields[field_no], sub_key)
+        return value if value is not None else ''
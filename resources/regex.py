@@ -8,6 +8,8 @@ USER_ID_FROM_ICON_URL = re.compile(r"avatars\/(.+?)\/")
 USERNAME_FROM_EMBED_AUTHOR = re.compile(r"^(.+?)'s")
 NAME_FROM_MESSAGE = re.compile(r"\s\*\*(.+?)\*\*\s")
 NAME_FROM_MESSAGE_START = re.compile(r"^\*\*(.+?)\*\*\s")
+NAME_FROM_MESSAGE_ADDRESS = re.compile(r"^\*\*(.+?)\*\*, ")
+NAME_FROM_FUSION_RESULTS = re.compile(r"> \*\*(.+?)\*\*(?:'s| got)")
 
 
 # --- User command detection ---
@@ -0,0 +1,171 @@
+# scheduler.py
+"""Contains the scheduler that fires reminders at their end time"""
+
+import asyncio
+import heapq
+import itertools
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from discord import utils
+
+from resources import logs
+
+
+class ReminderScheduler():
+    """Single timer for all reminders.
+
+    Scheduled reminders are kept in a min-heap ordered by end time. The scheduler sleeps until the earliest end time
+    and is woken early if a reminder is scheduled or unscheduled at the head of the heap, so there is no polling and
+    no task per reminder.
+    Reminders are identified by their task name. Scheduling a reminder again replaces the old entry. Replaced and
+    unscheduled entries stay in the heap as empty entries until they reach the top or the heap is compacted.
+
+    When reminders are due, all of them are handed to the callback at once in a short-lived task.
+    If another reminder ends within window seconds after the earliest end time, the scheduler waits until the end of
+    that window, so reminders that end close to each other are handed over together. A reminder that ends alone is
+    handed over at its end time.
+    """
+    __slots__ = ('_callback', '_counter', '_entries', '_heap', '_running', '_task', '_wake', 'window')
+
+    def __init__(self, window: float = 0) -> None:
+        self.window = window
+        self._callback: Optional[Callable[[List[Any]], Awaitable[None]]] = None
+        self._counter = itertools.count()
+        self._entries: Dict[str, List] = {} # task_name: [end timestamp, counter, task_name, reminder]
+        self._heap: List[List] = []
+        self._running: Set[asyncio.Task] = set()
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def schedule(self, reminder: Any) -> None:
+        """Schedules a reminder or replaces the scheduled reminder with the same task name.
+        Triggered reminders are unscheduled instead."""
+        if self._push(reminder): self._wake_up()
+
+    def schedule_many(self, reminders: Iterable[Any]) -> None:
+        """Schedules several reminders like schedule(). Wakes the scheduler at most once."""
+        wake_up = False
+        for reminder in reminders:
+            if self._push(reminder): wake_up = True
+        if wake_up: self._wake_up()
+
+    def unschedule(self, task_name: str) -> None:
+        """Removes a reminder from the schedule if it is scheduled"""
+        if self._remove(task_name): self._wake_up()
+
+    def get_upcoming(self, seconds: float) -> List[Any]:
+        """Returns all scheduled reminders that are due within the next seconds, without removing them.
+        Only the part of the heap that ends before that time is visited."""
+        until = utils.utcnow().timestamp() + seconds
+        upcoming_reminders = []
+        indexes = [0] if self._heap else []
+        while indexes:
+            index = indexes.pop()
+            entry = self._heap[index]
+            if entry[0] > until: continue
+            if entry[3] is not None: upcoming_reminders.append(entry[3])
+            indexes.extend(child for child in (2 * index + 1, 2 * index + 2) if child < len(self._heap))
+        return upcoming_reminders
+
+    def _push(self, reminder: Any) -> bool:
+        """Adds or replaces the entry of a reminder. Returns True if the head of the heap changed or the new entry ends
+        within the window of the head."""
+        if reminder.triggered: return self._remove(reminder.task_name)
+        old_entry = self._entries.pop(reminder.task_name, None)
+        if old_entry is not None: old_entry[3] = None
+        entry = [reminder.end_time.timestamp(), next(self._counter), reminder.task_name, reminder]
+        self._entries[reminder.task_name] = entry
+        heapq.heappush(self._heap, entry)
+        head_changed = (
+            self._heap[0] is entry or old_entry is not None and self._heap[0] is old_entry
+            or self.window > 0 and entry[0] <= self._heap[0][0] + self.window
+        )
+        if len(self._heap) > 2 * len(self._entries) + 64: self._compact()
+        return head_changed
+
+    def _remove(self, task_name: str) -> bool:
+        """Empties the entry of a reminder. Returns True if the entry was the head of the heap."""
+        entry = self._entries.pop(task_name, None)
+        if entry is None: return False
+        entry[3] = None
+        return self._heap[0] is entry
+
+    def start(self, callback: Callable[[List[Any]], Awaitable[None]]) -> None:
+        """Starts the scheduler. Does nothing if it is already running."""
+        self._callback = callback
+        if self._task is not None and not self._task.done(): return
+        if self._wake is None: self._wake = asyncio.Event()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    def stop(self) -> None:
+        """Stops the scheduler. Scheduled reminders are kept."""
+        if self._task is not None: self._task.cancel()
+        self._task = None
+
+    def _wake_up(self) -> None:
+        if self._wake is not None: self._wake.set()
+
+    def _compact(self) -> None:
+        """Removes all empty entries from the heap"""
+        self._heap = [entry for entry in self._heap if entry[3] is not None]
+        heapq.heapify(self._heap)
+
+    def _get_fire_time(self) -> Optional[float]:
+        """Returns the timestamp at which the due reminders are fired. Returns None if nothing is scheduled.
+        This is the end of the window of the earliest reminder if another reminder ends within that window, otherwise
+        the end time of the earliest reminder. Only the part of the heap that ends within the window is visited.
+        """
+        while self._heap and self._heap[0][3] is None: heapq.heappop(self._heap)
+        if not self._heap: return None
+        head_time = self._heap[0][0]
+        if self.window <= 0: return head_time
+        until = head_time + self.window
+        indexes = [child for child in (1, 2) if child < len(self._heap)]
+        while indexes:
+            index = indexes.pop()
+            entry = self._heap[index]
+            if entry[0] > until: continue
+            if entry[3] is not None: return until
+            indexes.extend(child for child in (2 * index + 1, 2 * index + 2) if child < len(self._heap))
+        return head_time
+
+    def _pop_due(self) -> List[Any]:
+        """Removes and returns all reminders that are due, once the fire time is reached (see _get_fire_time)"""
+        now = utils.utcnow().timestamp()
+        fire_time = self._get_fire_time()
+        if fire_time is None or fire_time > now: return []
+        due_reminders = []
+        while self._heap and (self._heap[0][3] is None or self._heap[0][0] <= now):
+            entry = heapq.heappop(self._heap)
+            reminder = entry[3]
+            if reminder is None: continue
+            del self._entries[entry[2]]
+            due_reminders.append(reminder)
+        return due_reminders
+
+    async def _run(self) -> None:
+        """Sleeps until the next reminder is due and fires all due reminders"""
+        while True:
+            self._wake.clear()
+            due_reminders = self._pop_due()
+            if due_reminders: self._fire(due_reminders)
+            fire_time = self._get_fire_time()
+            timeout = fire_time - utils.utcnow().timestamp() if fire_time is not None else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, due_reminders: List[Any]) -> None:
+        """Runs the callback for the due reminders"""
+        task = asyncio.get_running_loop().create_task(self._callback(due_reminders))
+        self._running.add(task)
+        task.add_done_callback(self._task_done)
+
+    def _task_done(self, task: asyncio.Task) -> None:
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logs.logger.error(f'Error in reminder callback: {task.exception()}')
@@ -18,11 +18,14 @@ ENV_VARIABLE_MISSING = (
 BOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 DB_FILE = os.path.join(BOT_DIR, 'database/maya_db.db')
 if os.path.isfile(DB_FILE):
-    DATABASE = sqlite3.connect(DB_FILE, isolation_level=None, detect_types=sqlite3.PARSE_DECLTYPES)
+    # The connection is only used by the database thread in database.executor
+    DATABASE = sqlite3.connect(DB_FILE, isolation_level=None, detect_types=sqlite3.PARSE_DECLTYPES,
+                               check_same_thread=False)
 else:
     print(f'Database {DB_FILE} does not exist. Please follow the setup instructions in the README first.')
     sys.exit()
 DATABASE.row_factory = sqlite3.Row
+DATABASE.execute('PRAGMA journal_mode=WAL') # Lets the read pool in database.executor read while the bot writes
 LOG_FILE = os.path.join(BOT_DIR, 'logs/discord.log')
 IMG_LOGO = os.path.join(BOT_DIR, 'images/maya.png')
 VERSION_FILE = os.path.join(BOT_DIR, 'VERSION')
@@ -99,4 +102,38 @@ TESTY_ID = 1050765002950332456 # Miriel's test bot to test triggers
 DEFAULT_PREFIX = 'maya '
 EMBED_COLOR = 0xFFBB01
 ABORT_TIMEOUT = 60
-INTERACTION_TIMEOUT = 300
\ No newline at end of file
+INTERACTION_TIMEOUT = 300
+
+
+MESSAGE_CACHE_CHANNEL_SIZE = 50 # Amount of user commands kept per channel with recent Tree activity
+MESSAGE_CACHE_COLD_CHANNEL_SIZE = 5 # Amount of user commands kept per channel without recent Tree activity
+MESSAGE_CACHE_ACTIVITY_HALF_LIFE = 1800 # Seconds after which the Tree activity score of a channel is halved
+MESSAGE_CACHE_ACTIVITY_MIN_SCORE = 0.25 # Minimum Tree activity score of a channel to get the full cache size
+MESSAGE_CACHE_MAX_BYTES = 32 * 1024 * 1024 # Approximate memory budget of the message cache
+MESSAGE_CACHE_WAIT_TIMEOUT = 0.5 # Seconds find_message waits for a command that isn't cached yet
+MESSAGE_CACHE_EXPIRY_INTERVAL = 15 # Seconds between the expiry runs of the message cache
+MESSAGE_CACHE_EXPIRY_SLICE = 100 # Channels cleaned up per expiry slice before yielding to the event loop
+HANDLED_MESSAGES_CACHE_SIZE = 1000 # Amount of Tree messages whose last state is kept to skip unchanged edits
+INTERACTION_CACHE_SIZE = 5000 # Amount of message interactions kept to resolve message references
+INTERACTION_CACHE_TTL = 900 # Seconds a cached message interaction stays valid
+REMINDER_COALESCE_WINDOW = 1 # Seconds reminders ending close to each other are held back to be sent together (makes
+# them up to this late). Reminders that end alone are sent on time.
+REMINDER_MESSAGE_MAX_LENGTH = 1900 # Maximum length of a reminder message, kept below the Discord limit of 2000
+OUTBOUND_GLOBAL_RATE = 50 # Requests per second the bot sends to Discord in total
+OUTBOUND_CHANNEL_MESSAGES = 5 # Messages the bot can send to a single channel per period, all at once if needed
+OUTBOUND_CHANNEL_PERIOD = 5 # Seconds of the channel message limit
+OUTBOUND_REACTION_RATE = 4 # Reactions per second the bot adds in a single channel
+OUTBOUND_REACTION_BURST = 1 # Reactions the bot can add in a single channel at once
+OUTBOUND_QUEUE_LIMITS = (None, 200, 50) # Waiting reminders, helper replies and reactions after which new ones of the same priority are dropped
+REMINDER_STATS_LOG_INTERVAL = 60 # Minutes between the log entries with the reminder delivery statistics
+REMINDER_CATCH_UP_HORIZON = 3600 # Seconds after which overdue reminders are not sent anymore after a restart
+REMINDER_CATCH_UP_BATCH_SIZE = 10 # Channels whose overdue reminders are sent at once after a restart
+REMINDER_CATCH_UP_BATCH_DELAY = 1 # Seconds between the batches of overdue reminders
+REMINDER_PREFETCH_INTERVAL = 10 # Seconds between lookups of the recipients of upcoming reminders
+REMINDER_PREFETCH_WINDOW = 30 # Seconds ahead that reminder recipients are looked up
+REMINDER_PREFETCH_TTL = 60 # Seconds that looked up reminder recipients are cached
+DATABASE_MAX_VARIABLES = 500 # Maximum amount of variables in one SQL statement
+DATABASE_READ_POOL_SIZE = 2 # Read-only connections for heavy reads, 0 runs them on the database thread
+DATABASE_GROUP_COMMIT = False # Commits writes together instead of one by one, see database.executor
+DATABASE_GROUP_COMMIT_INTERVAL = 0.005 # Seconds after which a group commit transaction is committed
+DATABASE_GROUP_COMMIT_SIZE = 100 # Requests after which a group commit transaction is committed
\ No newline at end of file
@@ -0,0 +1,39 @@
+# triggers.py
+"""Contains the trigger index used to decide which processors have to look at a message"""
+
+from typing import Dict, FrozenSet, Hashable, Iterable, Tuple
+
+
+class TriggerIndex():
+    """Index of trigger strings from several owners (e.g. processor modules).
+
+    The index is built once. All triggers are lowercased and deduplicated, and each trigger stores every owner that
+    registered it. Triggers that contain other triggers also carry the owners of those contained triggers, so a single
+    hit can resolve several owners at once.
+    """
+    __slots__ = ('_triggers',)
+
+    def __init__(self, triggers: Dict[Hashable, Iterable[str]]) -> None:
+        owners: Dict[str, set] = {}
+        for owner, owner_triggers in triggers.items():
+            for trigger in owner_triggers:
+                owners.setdefault(trigger.lower(), set()).add(owner)
+        index = []
+        for trigger in sorted(owners, key=len, reverse=True):
+            trigger_owners = set(owners[trigger])
+            for other_trigger, other_owners in owners.items():
+                if other_trigger != trigger and other_trigger in trigger:
+                    trigger_owners |= other_owners
+            index.append((trigger, frozenset(trigger_owners)))
+        self._triggers: Tuple[Tuple[str, FrozenSet[Hashable]], ...] = tuple(index)
+
+    def search(self, text: str) -> FrozenSet[Hashable]:
+        """Returns all owners with at least one trigger in the text. The text has to be lowercase already.
+
+        Longer triggers are checked first. Once all owners of a trigger have been found, the trigger is skipped.
+        """
+        found = set()
+        for trigger, trigger_owners in self._triggers:
+            if trigger_owners <= found: continue
+            if trigger in text: found |= trigger_owners
+        return frozenset(found)